@@ -1,9 +1,13 @@
-import csv
 import json
+import os
 import random
-from collections import defaultdict
+import sys
 from datetime import datetime, timedelta
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "tools"))
+from si_store import ensure_store, load_frame
+from peak_engine import detect_peaks_frame
+
 # Focus Tickers
 FOCUS_TICKERS = ["AFRM", "SQ", "PYPL", "SHOP", "TSLA"]
 CSV_PATH = "data/Stock Short Interest Data.csv"
@@ -112,19 +116,6 @@ RETAIL_EXCERPTS = [
 ]
 
 
-def parse_date(date_str):
-    try:
-        return datetime.strptime(date_str, "%Y-%m-%d")
-    except ValueError:
-        try:
-            return datetime.strptime(date_str, "%m/%d/%Y")
-        except ValueError:
-            try:
-                return datetime.strptime(date_str, "%m/%d/%y")
-            except:
-                return None
-
-
 # Intentional Flaw Generators
 def generate_news_item(ticker, dt_str, sq_score, idx, force_duplicate=False, last_title=None, last_excerpt=None):
     provider = random.choice(PROVIDERS)
@@ -220,40 +211,19 @@ def generate_retail_item(ticker, dt_str, i, idx, force_duplicate=False, last_exc
 
 
 def main():
-    try:
-        with open(CSV_PATH, 'r') as f:
-            reader = csv.DictReader(f)
-            data = [row for row in reader if row.get("Ticker") in FOCUS_TICKERS]
-    except FileNotFoundError:
+    if not os.path.exists(CSV_PATH):
         print(f"Error: {CSV_PATH} not found.")
         return
+    store_dir = ensure_store(CSV_PATH)
+
+    # Top-3 squeeze peaks per ticker (>= 14 days apart) from the shared peak engine,
+    # so the evidence windows line up with stage1 and the UI peak picker
+    frame = load_frame(store_dir, FOCUS_TICKERS, columns=["Squeeze Score"])
+    peak_table = detect_peaks_frame(frame, "Squeeze Score", date_col="Business Date", group_col="Ticker")
 
-    # Group by ticker
-    ticker_data = defaultdict(list)
-    for row in data:
-        dt = parse_date(row.get("Business Date"))
-        sq_score_val = row.get("Squeeze Score")
-        sq_score = float(sq_score_val) if sq_score_val and sq_score_val.strip() else 0.0
-        ticker = row.get("Ticker")
-        if dt and ticker:
-            ticker_data[ticker].append({'date': dt, 'squeeze_score': sq_score, 'raw': row})
-
-    for ticker, rows in ticker_data.items():
-        # Sort by Squeeze Score descending to find true peaks
-        rows.sort(key=lambda x: x['squeeze_score'], reverse=True)
-        
-        peaks = []
-        for row in rows:
-            if len(peaks) >= 3:
-                break
-            # Dedupe logic: must be at least 14 days apart from other peaks
-            valid = True
-            for p in peaks:
-                if abs((row['date'] - p['date']).days) < 14:
-                    valid = False
-                    break
-            if valid:
-                peaks.append(row)
+    for ticker, tp in peak_table.groupby("Ticker", sort=False):
+        peaks = [{'date': datetime.strptime(d, "%Y-%m-%d"), 'squeeze_score': float(v)}
+                 for d, v in zip(tp["date"], tp["value"])]
 
         # Global pool of items to reuse for cross-date deduplication testing
         cross_date_news_pool = []
@@ -1,84 +1,179 @@
 import pandas as pd
+import numpy as np
 import json
 import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 
-def run_discovery(ticker="TSLA"):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tools"))
+from si_store import ensure_store, load_frame
+from peak_engine import detect_peaks_frame
+from artifact_store import WRITE_FORMATS, write_table
+
+# Business Date,Ticker,ShortInterestPct,Crowded Score,Squeeze Score,S3Utilization,Last Rate
+STORE_COLUMNS = ['ShortInterestPct', 'Crowded Score', 'Squeeze Score', 'S3Utilization', 'Last Rate']
+
+def resolve_csv_path():
     csv_path = "./data/Stock Short Interest Data.csv"
     if not os.path.exists(csv_path):
         # Try finding it in current directory if subpath fails
         csv_path = "Stock Short Interest Data.csv"
-    
-    print(f"Loading data from {csv_path}...")
-    df = pd.read_csv(csv_path)
-    
-    # Filter for target ticker
-    df_ticker = df[df['Ticker'] == ticker].copy()
-    
-    # Convert dates
-    df_ticker['date_dt'] = pd.to_datetime(df_ticker['Business Date'])
-    df_ticker = df_ticker.sort_values('date_dt')
-    
-    # Map columns to internal schema
-    # Business Date,Ticker,ShortInterestPct,Crowded Score,Squeeze Score,S3Utilization,Last Rate
-    internal_df = df_ticker[[
-        'Business Date', 'ShortInterestPct', 'Crowded Score', 
-        'Squeeze Score', 'S3Utilization', 'Last Rate'
-    ]].copy()
-    
-    internal_df.columns = [
-        'date', 'short_interest_pct', 'crowded_score', 
-        'squeeze_score', 'utilization', 'borrow_cost'
-    ]
-    
-    # Sort by squeeze score
-    top_peaks = internal_df.sort_values('squeeze_score', ascending=False).head(3)
-    
-    # NEW: Volatility Regime Calculation
-    # Calculate daily returns volatility over a trailing window
-    internal_df['returns'] = internal_df['squeeze_score'].pct_change()
-    global_vol = internal_df['returns'].std()
-    
-    peaks_list = []
-    for i, (idx, row) in enumerate(top_peaks.iterrows()):
-        # Local vol check (simple window around peak)
-        window = internal_df.iloc[max(0, idx-5):min(len(internal_df), idx+5)]
-        local_vol = window['returns'].std()
-        regime = "NORMAL"
-        if local_vol > global_vol * 1.5: regime = "HIGH"
-        elif local_vol < global_vol * 0.5: regime = "LOW"
-
-        peaks_list.append({
-            "rank": i + 1,
-            "date": pd.to_datetime(row['date']).strftime('%Y-%m-%d'),
-            "squeeze_score": float(row['squeeze_score']),
-            "crowded_score": float(row['crowded_score']),
-            "volatility_regime": regime
-        })
-        
-    peaks_output = {
-        "ticker": ticker,
-        "peaks": peaks_list,
-        "date_range": {
-            "min": df_ticker['date_dt'].min().strftime('%Y-%m-%d'),
-            "max": df_ticker['date_dt'].max().strftime('%Y-%m-%d')
+    return csv_path
+
+def load_universe(tickers="all"):
+    # Columnar store is built once from the CSV and reused until the CSV changes
+    store_dir = ensure_store(resolve_csv_path())
+    if tickers == "all":
+        tickers = None
+    elif isinstance(tickers, str):
+        tickers = [tickers]
+    print(f"Loading {'all tickers' if tickers is None else len(tickers)} from {store_dir}...")
+    return load_frame(store_dir, tickers, columns=STORE_COLUMNS)
+
+# Volatility regime: rolling std of squeeze-score returns vs. a per-ticker baseline.
+# window/center default to the legacy +/-5 day peak window; baseline is "global"
+# (full-history std) or "expanding" (std of everything up to that day).
+REGIME_CONFIG = {
+    'window': 10,
+    'center': True,
+    'min_periods': 2,
+    'baseline': 'global',
+    'high': 1.5,
+    'low': 0.5,
+}
+
+def add_regime_features(features, config=None):
+    cfg = {**REGIME_CONFIG, **(config or {})}
+    # pct_change from a zero score is +/-inf; treat it as missing, not as infinite vol
+    ret = features['returns'].replace([np.inf, -np.inf], np.nan)
+    by_ticker = ret.groupby(features['ticker'], sort=False)
+
+    local = by_ticker.rolling(cfg['window'], min_periods=cfg['min_periods'], center=cfg['center']).std()
+    features['vol_local'] = local.reset_index(level=0, drop=True)
+    if cfg['baseline'] == 'expanding':
+        base = by_ticker.expanding(min_periods=cfg['min_periods']).std()
+        features['vol_baseline'] = base.reset_index(level=0, drop=True)
+    elif cfg['baseline'] == 'global':
+        features['vol_baseline'] = by_ticker.transform('std')
+    else:
+        raise ValueError(f"Unknown regime baseline: {cfg['baseline']!r}")
+
+    features['vol_ratio'] = features['vol_local'] / features['vol_baseline'].replace(0, np.nan)
+    features['volatility_regime'] = np.where(
+        features['vol_ratio'] > cfg['high'], "HIGH",
+        np.where(features['vol_ratio'] < cfg['low'], "LOW", "NORMAL"))
+    return features
+
+def build_daily_features(df, regime_config=None):
+    # Map a long store frame (all tickers, sorted by ticker then date) to the internal schema
+    features = pd.DataFrame({
+        'ticker': df['Ticker'].to_numpy(),
+        'date': df['Business Date'].dt.strftime('%Y-%m-%d'),
+        'short_interest_pct': df['ShortInterestPct'],
+        'crowded_score': df['Crowded Score'],
+        'squeeze_score': df['Squeeze Score'],
+        'utilization': df['S3Utilization'],
+        'borrow_cost': df['Last Rate'],
+    })
+    # Daily returns of the squeeze score, never crossing a ticker boundary
+    features['returns'] = features.groupby('ticker', sort=False)['squeeze_score'].pct_change()
+    return add_regime_features(features, regime_config)
+
+def build_peaks(features, top_k=3):
+    # Top peaks per ticker from the shared engine (min separation, prominence,
+    # event window); the regime is looked up from the full-history daily columns
+    top = detect_peaks_frame(features, 'squeeze_score', top_k=top_k)
+    top['crowded_score'] = features['crowded_score'].to_numpy()[top['row']]
+    top['volatility_regime'] = features['volatility_regime'].to_numpy()[top['row']]
+
+    bounds = features.groupby('ticker', sort=False)['date'].agg(['min', 'max'])
+    # Every ticker gets an entry; one without a finite squeeze score has no peaks
+    groups = dict(tuple(top.groupby('ticker', sort=False)))
+    empty = top.iloc[:0]
+    outputs = {}
+    for ticker in bounds.index:
+        g = groups.get(ticker, empty)
+        outputs[ticker] = {
+            "ticker": ticker,
+            "peaks": [{
+                "rank": i + 1,
+                "date": row.date,
+                "squeeze_score": float(row.value),
+                "crowded_score": float(row.crowded_score),
+                "volatility_regime": row.volatility_regime,
+                "prominence": float(row.prominence),
+                "window_start": row.window_start,
+                "window_end": row.window_end
+            } for i, row in enumerate(g.itertuples(index=False))],
+            "date_range": {
+                "min": bounds.at[ticker, 'min'],
+                "max": bounds.at[ticker, 'max']
+            }
         }
-    }
-    
-    # Create artifacts directory
-    os.makedirs("./artifacts", exist_ok=True)
-    
+    return outputs
+
+def write_ticker_artifacts(job):
+    ticker, peaks_output, features_df, out_dir, formats = job
+
     # Save peaks.json
-    peaks_file = f"./artifacts/peaks_{ticker}.json"
+    peaks_file = os.path.join(out_dir, f"peaks_{ticker}.json")
     with open(peaks_file, 'w') as f:
         json.dump(peaks_output, f, indent=2)
-    print(f"Saved {peaks_file}")
-    
-    # Save daily features csv
-    features_file = f"./artifacts/daily_features_{ticker}.csv"
-    internal_df.to_csv(features_file, index=False)
-    print(f"Saved {features_file}")
-    
-    return peaks_output
+
+    # Save daily features (typed .npz, optional .csv export)
+    features_files = write_table(features_df, 'daily_features', ticker, out_dir, formats)
+    return peaks_file, features_files
+
+def run_discovery_many(tickers="all", workers=None, out_dir="./artifacts", regime_config=None,
+                       formats=WRITE_FORMATS):
+    # One load, one vectorized pass over every ticker, then parallel artifact writes
+    df = load_universe(tickers)
+    features = build_daily_features(df, regime_config)
+    peaks = build_peaks(features)
+
+    # Create artifacts directory
+    os.makedirs(out_dir, exist_ok=True)
+
+    # Artifacts keep the native Business Date, so the typed table needs no date parsing
+    typed = features.assign(date=df['Business Date'].to_numpy())
+    jobs = [
+        (ticker, peaks[ticker], g.drop(columns='ticker'), out_dir, formats)
+        for ticker, g in typed.groupby('ticker', sort=False)
+    ]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(jobs) <= 1:
+        written = [write_ticker_artifacts(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            written = list(pool.map(write_ticker_artifacts, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    for peaks_file, features_files in written:
+        print(f"Saved {peaks_file}")
+        for features_file in features_files:
+            print(f"Saved {features_file}")
+
+    return peaks
+
+def run_discovery(ticker="TSLA"):
+    return run_discovery_many([ticker], workers=1).get(ticker)
+
+def main():
+    parser = argparse.ArgumentParser(description="Stage 1: squeeze peak discovery")
+    parser.add_argument("--tickers", nargs="+", default=["TSLA"], help="Tickers, or 'all' for the whole universe")
+    parser.add_argument("--workers", type=int, default=None, help="Artifact writer processes (default: CPU count)")
+    parser.add_argument("--out", default="./artifacts", help="Artifacts directory")
+    parser.add_argument("--vol-window", type=int, default=REGIME_CONFIG['window'], help="Rolling volatility window (days)")
+    parser.add_argument("--vol-baseline", choices=["global", "expanding"], default=REGIME_CONFIG['baseline'],
+                        help="Baseline volatility the rolling window is compared against")
+    parser.add_argument("--csv", action="store_true", help="Also write daily_features as .csv")
+    args = parser.parse_args()
+
+    tickers = "all" if [t.lower() for t in args.tickers] == ["all"] else [t.upper() for t in args.tickers]
+    regime_config = {'window': args.vol_window, 'baseline': args.vol_baseline}
+    formats = WRITE_FORMATS + (("csv",) if args.csv else ())
+    peaks = run_discovery_many(tickers, workers=args.workers, out_dir=args.out, regime_config=regime_config,
+                               formats=formats)
+    print(f"Discovery complete for {len(peaks)} tickers")
 
 if __name__ == "__main__":
-    run_discovery("TSLA")
+    main()
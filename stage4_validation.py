@@ -2,50 +2,88 @@ import pandas as pd
 import json
 import numpy as np
 import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tools"))
+from lag_scan import HORIZONS, MAX_LAG, ROLL_LAGS, WINDOWS, scan_frame, peak_leads, rolling_frame
+from significance import ALPHA, N_RESAMPLES, SEED, test_correlation
+from daily_evidence import has_daily, load_daily
+from artifact_store import WRITE_FORMATS, has_table, list_tickers, read_table, write_table
+
+# Forward-change targets of the lag scan: name -> level column
+LAG_TARGETS = {'delta_SI': 'short_interest_pct', 'delta_crowded': 'crowded_score'}
+# Level targets of the rolling validation (Pearson(noise_t, SI_{t+lag}), as the UI's lagSI)
+ROLL_TARGETS = {'si': 'short_interest_pct', 'crowded': 'crowded_score'}
+
+# Noise Index components (stage 4 goal): z-scored column -> (source column, weight)
+# Weights: News Vol (15%), News Sent (15%), Retail Vol (25%), Retail Hype (25%), Utilization (20%)
+NOISE_COMPONENTS = {
+    'z_news_vol':    ('news_volume', 0.15),
+    'z_news_sent':   ('news_sentiment_index', 0.15),
+    'z_retail_vol':  ('retail_chatter_volume', 0.25),
+    'z_retail_hype': ('retail_hype_index', 0.25),
+    'z_util':        ('utilization', 0.20),
+}
+SIGNED_COMPONENTS = {'z_news_sent', 'z_retail_hype'}   # z-scored on magnitude
+EVIDENCE_COLUMNS = ['news_volume', 'news_sentiment_index', 'retail_chatter_volume',
+                    'retail_hype_index', 'retail_black_swan']
+BLACK_SWAN_BOOST = 2.0
+
+# Panel mode: output column -> series correlated with the noise index
+PANEL_PAIRS = {
+    'corr_noise_crowded': 'crowded_score',
+    'corr_noise_squeeze': 'squeeze_score',
+    'corr_noise_to_delta_SI_48h': 'delta_SI_48h',
+    'corr_noise_to_delta_crowded_48h': 'delta_crowded_48h',
+}
+PANEL_BATCH = 200   # tickers held in memory at once
+
+# Stage artifacts and the columns stage4 reads from them
+STAGE_SOURCES = {
+    'daily_features': ['date', 'short_interest_pct', 'crowded_score', 'squeeze_score', 'utilization'],
+    'news_daily':     ['date', 'news_volume', 'news_sentiment_index'],
+    'retail_daily':   ['date', 'retail_chatter_volume', 'retail_hype_index', 'retail_black_swan'],
+}
 
 def z_score(series):
     if series.std() == 0: return series * 0
     return (series - series.mean()) / series.std()
 
-def run_validation(ticker="TSLA"):
-    # Load all daily artifacts
-    features_df = pd.read_csv(f"./artifacts/daily_features_{ticker}.csv")
-    news_df = pd.read_csv(f"./artifacts/news_daily_{ticker}.csv")
-    retail_df = pd.read_csv(f"./artifacts/retail_daily_{ticker}.csv")
-    
-    # Ensure date is standard YYYY-MM-DD
-    features_df['date'] = pd.to_datetime(features_df['date']).dt.strftime('%Y-%m-%d')
-    news_df['date'] = pd.to_datetime(news_df['date']).dt.strftime('%Y-%m-%d')
-    retail_df['date'] = pd.to_datetime(retail_df['date']).dt.strftime('%Y-%m-%d')
+def group_z_score(frame, col, group_col):
+    """z_score() within each group, via groupby-transform."""
+    g = frame.groupby(group_col, sort=False, observed=True)[col]
+    mean, std = g.transform('mean'), g.transform('std')
+    return ((frame[col] - mean) / std).where(std != 0, frame[col] * 0)
+
+def add_noise_index(merged, group_col=None):
+    """Fill missing evidence with 0 and add the z_* components and noise_index (per group if given)."""
+    merged[EVIDENCE_COLUMNS] = merged[EVIDENCE_COLUMNS].fillna(0)
+    noise = 0
+    for z_col, (col, weight) in NOISE_COMPONENTS.items():
+        src = merged[col].abs() if z_col in SIGNED_COMPONENTS else merged[col]
+        if group_col is None:
+            merged[z_col] = z_score(src)
+        else:
+            merged[z_col] = group_z_score(merged.assign(_src=src), '_src', group_col)
+        noise = noise + merged[z_col] * weight
+    merged['noise_index'] = noise + merged['retail_black_swan'] * BLACK_SWAN_BOOST # Black Swan boost
+    return merged
+
+def run_validation(ticker="TSLA", max_lag=MAX_LAG, horizons=HORIZONS, windows=WINDOWS, roll_lags=ROLL_LAGS,
+                   n_resamples=N_RESAMPLES, seed=SEED, block=None, pool=None, formats=WRITE_FORMATS):
+    # Load all daily artifacts (tools/artifact_store.py: typed columns, dates already datetime64)
+    features_df = read_table('daily_features', ticker)
+    # Daily evidence tables (tools/daily_evidence.py)
+    news_df = load_daily('news_daily', ticker, columns=STAGE_SOURCES['news_daily'][1:])
+    retail_df = load_daily('retail_daily', ticker, columns=STAGE_SOURCES['retail_daily'][1:])
     
     # Merge
     merged = features_df.merge(news_df, on='date', how='left').merge(retail_df, on='date', how='left')
     
-    # Fill NAs
-    merged['news_volume'] = merged['news_volume'].fillna(0)
-    merged['news_sentiment_index'] = merged['news_sentiment_index'].fillna(0)
-    merged['retail_chatter_volume'] = merged['retail_chatter_volume'].fillna(0)
-    merged['retail_hype_index'] = merged['retail_hype_index'].fillna(0)
-    merged['retail_black_swan'] = merged['retail_black_swan'].fillna(0)
-    
-    # Noise Index components (stage 4 goal)
-    # Weights: News Vol (15%), News Sent (15%), Retail Vol (25%), Retail Hype (25%), Utilization (20%)
-    w1, w2, w3, w4, w5 = 0.15, 0.15, 0.25, 0.25, 0.20
-    
-    merged['z_news_vol'] = z_score(merged['news_volume'])
-    merged['z_news_sent'] = z_score(merged['news_sentiment_index'].abs())
-    merged['z_retail_vol'] = z_score(merged['retail_chatter_volume'])
-    merged['z_retail_hype'] = z_score(merged['retail_hype_index'].abs())
-    merged['z_util'] = z_score(merged['utilization'])
-    
-    merged['noise_index'] = (
-        merged['z_news_vol'] * w1 + 
-        merged['z_news_sent'] * w2 + 
-        merged['z_retail_vol'] * w3 + 
-        merged['z_retail_hype'] * w4 + 
-        merged['z_util'] * w5 +
-        merged['retail_black_swan'] * 2.0 # Black Swan boost
-    )
+    # Fill NAs, then the Noise Index
+    merged = add_noise_index(merged)
     
     # NEW: Interpret result for Interpretation string
     final_z = merged['noise_index'].mean()
@@ -67,7 +105,30 @@ def run_validation(ticker="TSLA"):
     corr_noise_delta_SI = float(valid_subset[['noise_index', 'delta_SI_48h']].corr().iloc[0,1])
     corr_noise_delta_crowded = float(valid_subset[['noise_index', 'delta_crowded_48h']].corr().iloc[0,1])
     
-    supports_hypothesis = corr_noise_delta_SI > 0.1 or corr_noise_delta_crowded > 0.1
+    # Significance: circular-shift permutation p-value and block-bootstrap CI of each
+    # 48h correlation (seeded per ticker/test, so reruns are bit-identical)
+    significance = {
+        name: test_correlation(valid_subset['noise_index'], valid_subset[name],
+                               n_boot=n_resamples, n_perm=n_resamples, block=block,
+                               seed=seed, key=(ticker, name), pool=pool)
+        for name in ('delta_SI_48h', 'delta_crowded_48h')
+    }
+
+    # The lead must clear the threshold *and* beat the shifted-series null
+    def significant(name, corr):
+        p = significance[name]['p_perm']
+        return corr > 0.1 and p is not None and p < ALPHA
+
+    supports_hypothesis = (significant('delta_SI_48h', corr_noise_delta_SI)
+                           or significant('delta_crowded_48h', corr_noise_delta_crowded))
+
+    # Lead-lag profile: noise(t) vs. forward change over each horizon starting
+    # `lag` days later, every (horizon, lag) pair from one batched FFT
+    lag_profile = scan_frame(merged, 'noise_index', LAG_TARGETS, horizons=horizons, max_lag=max_lag)
+    peaks = peak_leads(lag_profile)
+
+    # Rolling validation: trailing-window Pearson for every day and window, O(n) via running sums
+    rolling = rolling_frame(merged, 'noise_index', ROLL_TARGETS, windows=windows, lags=roll_lags)
     
     validation_output = {
         "ticker": ticker,
@@ -79,6 +140,22 @@ def run_validation(ticker="TSLA"):
             "corr_noise_to_delta_SI_48h": round(corr_noise_delta_SI, 4),
             "corr_noise_to_delta_crowded_48h": round(corr_noise_delta_crowded, 4)
         },
+        "lag_scan": {
+            "max_lag": max_lag,
+            "horizons": list(horizons),
+            "peak": {
+                row.target: {"horizon": int(row.horizon), "lag": int(row.lag),
+                             "corr": round(float(row.corr), 4), "n": int(row.n)}
+                for row in peaks.itertuples(index=False)
+            }
+        },
+        "significance": {
+            "n_resamples": n_resamples,
+            "seed": seed,
+            "alpha": ALPHA,
+            **{name: {k: (round(v, 4) if isinstance(v, float) else v) for k, v in res.items()}
+               for name, res in significance.items()}
+        },
         "interpretation": f"The combined Noise Index shows a {'positive' if supports_hypothesis else 'weak'} leading correlation with future short interest changes.",
         "supports_hypothesis": supports_hypothesis
     }
@@ -87,8 +164,167 @@ def run_validation(ticker="TSLA"):
     with open(f"./artifacts/validation_{ticker}.json", 'w') as f:
         json.dump(validation_output, f, indent=2)
         
-    merged.to_csv(f"./artifacts/merged_daily_{ticker}.csv", index=False)
+    write_table(merged, 'merged_daily', ticker, formats=formats)
+    write_table(lag_profile, 'lag_profile', ticker, formats=formats)
+    write_table(rolling, 'rolling_validation', ticker, formats=formats)
     print(f"Saved validation artifacts for {ticker}")
 
+# ── Panel mode (whole universe) ──────────────────────────────────────────────
+def available_tickers():
+    """Tickers with a stage1 daily_features artifact, sorted."""
+    return list_tickers('daily_features')
+
+def load_panel(tickers):
+    """
+    One long (ticker, date) frame of the stage artifacts for `tickers`, reading
+    only the columns stage4 uses; typed artifacts carry native dates, so nothing is parsed.
+    Returns (frame or None, skipped tickers).
+    """
+    parts = {src: [] for src in STAGE_SOURCES}
+    skipped = []
+    for t in tickers:
+        if not (has_table('daily_features', t) and has_daily('news_daily', t) and has_daily('retail_daily', t)):
+            skipped.append(t)
+            continue
+        parts['daily_features'].append(read_table('daily_features', t, columns=STAGE_SOURCES['daily_features']).assign(ticker=t))
+        for src in ('news_daily', 'retail_daily'):
+            parts[src].append(load_daily(src, t, columns=STAGE_SOURCES[src][1:]).assign(ticker=t))
+    if not parts['daily_features']:
+        return None, skipped
+
+    features_df, news_df, retail_df = (pd.concat(parts[src], ignore_index=True) for src in STAGE_SOURCES)
+    merged = (features_df.merge(news_df, on=['ticker', 'date'], how='left')
+                         .merge(retail_df, on=['ticker', 'date'], how='left'))
+    merged['ticker'] = merged['ticker'].astype('category')
+    return merged, skipped
+
+def pair_moments(frame, x, y, group_col='ticker'):
+    """Per-group n, means and centred (co)moment sums of the complete (x, y) pairs."""
+    f = frame.loc[np.isfinite(frame[x]) & np.isfinite(frame[y]), [group_col, x, y]]
+    g = f.groupby(group_col, sort=False, observed=True)
+    dx = f[x] - g[x].transform('mean')
+    dy = f[y] - g[y].transform('mean')
+    m = (pd.DataFrame({group_col: f[group_col], 'sxx': dx * dx, 'syy': dy * dy, 'sxy': dx * dy})
+           .groupby(group_col, sort=False, observed=True).sum())
+    m['n'] = g.size()
+    m['mx'] = g[x].mean()
+    m['my'] = g[y].mean()
+    return m
+
+def pool_moments(m):
+    """Combine per-group moments into one group (parallel-variance update)."""
+    n = m['n'].sum()
+    if n == 0:
+        return {'n': 0, 'sxx': 0.0, 'syy': 0.0, 'sxy': 0.0}
+    mx = (m['n'] * m['mx']).sum() / n
+    my = (m['n'] * m['my']).sum() / n
+    return {
+        'n': int(n),
+        'sxx': m['sxx'].sum() + (m['n'] * (m['mx'] - mx) ** 2).sum(),
+        'syy': m['syy'].sum() + (m['n'] * (m['my'] - my) ** 2).sum(),
+        'sxy': m['sxy'].sum() + (m['n'] * (m['mx'] - mx) * (m['my'] - my)).sum(),
+    }
+
+def corr_from_moments(n, sxx, syy, sxy):
+    """Pearson from centred sums; NaN for fewer than 2 pairs or a constant side (as pandas .corr)."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = sxy / np.sqrt(sxx * syy)
+    return np.where((np.asarray(n) < 2) | (np.asarray(sxx) <= 0) | (np.asarray(syy) <= 0),
+                    np.nan, np.clip(corr, -1.0, 1.0))
+
+def run_panel(tickers, batch=PANEL_BATCH):
+    """
+    Same-day and 48h-lead correlations for every ticker plus the pooled
+    universe, loading `batch` tickers at a time: per-ticker moment sums are
+    kept, raw rows are not, so memory is bounded by the batch size.
+    """
+    tables, moments, skipped = [], {name: [] for name in PANEL_PAIRS}, []
+    for i in range(0, len(tickers), batch):
+        merged, missing = load_panel(tickers[i:i + batch])
+        skipped += missing
+        if merged is None:
+            continue
+
+        merged = add_noise_index(merged, group_col='ticker')
+        merged = merged.sort_values(['ticker', 'date'], kind='stable')
+        g = merged.groupby('ticker', sort=False, observed=True)
+        merged['delta_SI_48h'] = g['short_interest_pct'].shift(-2) - merged['short_interest_pct']
+        merged['delta_crowded_48h'] = g['crowded_score'].shift(-2) - merged['crowded_score']
+        valid_subset = merged.dropna(subset=['delta_SI_48h', 'delta_crowded_48h'])
+
+        table = pd.DataFrame(index=pd.Index(merged['ticker'].cat.categories, name='ticker'))
+        table['n'] = valid_subset.groupby('ticker', observed=True).size()
+        for name, col in PANEL_PAIRS.items():
+            m = pair_moments(valid_subset, 'noise_index', col)
+            moments[name].append(m)
+            table[name] = pd.Series(corr_from_moments(m['n'], m['sxx'], m['syy'], m['sxy']), index=m.index)
+        tables.append(table)
+        print(f"[INFO] Panel batch {i // batch + 1}: {len(table)} tickers, {len(merged)} rows")
+
+    if not tables:
+        print("[FAIL] No ticker has all stage artifacts (daily_features, news_daily, retail_daily)")
+        return
+    per_ticker = pd.concat(tables).reset_index()
+    per_ticker['n'] = per_ticker['n'].fillna(0).astype(int)
+
+    pooled = {}
+    for name, parts in moments.items():
+        p = pool_moments(pd.concat(parts))
+        corr = float(corr_from_moments(p['n'], p['sxx'], p['syy'], p['sxy']))
+        pooled[name] = {"corr": round(corr, 4) if np.isfinite(corr) else None, "n": p['n']}
+
+    panel_output = {
+        "tickers": len(per_ticker),
+        "skipped": skipped,
+        "pooled": pooled,
+        "mean_per_ticker": {name: (round(float(per_ticker[name].mean()), 4)
+                                   if per_ticker[name].notna().any() else None)
+                            for name in PANEL_PAIRS},
+    }
+    with open("./artifacts/panel_validation.json", 'w') as f:
+        json.dump(panel_output, f, indent=2)
+    per_ticker.round(4).to_csv("./artifacts/panel_validation.csv", index=False)
+    if skipped:
+        print(f"[WARN] Skipped {len(skipped)} ticker(s) without stage artifacts: {', '.join(skipped[:10])}")
+    print(f"[OK] Saved panel validation for {len(per_ticker)} tickers")
+
+def main():
+    parser = argparse.ArgumentParser(description="Stage 4: noise vs. short-interest lag validation")
+    parser.add_argument("--tickers", nargs="+", default=None,
+                        help="Tickers to validate (default TSLA; in --panel mode every ticker in ./artifacts)")
+    parser.add_argument("--panel", action="store_true",
+                        help="Universe mode: per-ticker and pooled correlation tables in one pass")
+    parser.add_argument("--panel-batch", type=int, default=PANEL_BATCH, help="Tickers loaded at once in --panel mode")
+    parser.add_argument("--max-lag", type=int, default=MAX_LAG, help="Largest lead (days) in the lag scan")
+    parser.add_argument("--horizons", type=int, nargs="+", default=list(HORIZONS),
+                        help="Forward-change horizons (days) in the lag scan")
+    parser.add_argument("--windows", type=int, nargs="+", default=list(WINDOWS),
+                        help="Rolling validation window lengths (days)")
+    parser.add_argument("--roll-lags", type=int, nargs="+", default=list(ROLL_LAGS),
+                        help="SI lead (days) of the rolling validation")
+    parser.add_argument("--resamples", type=int, default=N_RESAMPLES,
+                        help="Bootstrap and permutation draws per test")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--block", type=int, default=None, help="Bootstrap block length (default ~n^(1/3))")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Processes for the bootstrap (0 = in-process)")
+    parser.add_argument("--csv", action="store_true", help="Also write the per-ticker tables as .csv")
+    args = parser.parse_args()
+
+    if args.panel:
+        run_panel([t.upper() for t in (args.tickers or available_tickers())], args.panel_batch)
+        return
+
+    pool = ProcessPoolExecutor(args.workers) if args.workers and args.workers > 1 else None
+    try:
+        for ticker in args.tickers or ["TSLA"]:
+            run_validation(ticker.upper(), args.max_lag, tuple(args.horizons),
+                           tuple(args.windows), tuple(args.roll_lags),
+                           args.resamples, args.seed, args.block, pool,
+                           WRITE_FORMATS + (("csv",) if args.csv else ()))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
 if __name__ == "__main__":
-    run_validation("TSLA")
+    main()
@@ -1,58 +1,29 @@
 import pandas as pd
-import numpy as np
 import json
 import os
-from datetime import datetime, timedelta
+import sys
+import argparse
 
-def generate_synthetic(ticker="TSLA", days=1095):
-    dates = [datetime(2023, 1, 1) + timedelta(days=i) for i in range(days)]
-    
-    # 1. Normalized Short Interest: Mimic buildup then rapid decline
-    # Create 3 squeeze events
-    si = np.ones(days) * 10.0 # Base 10%
-    event_days = [200, 600, 950]
-    
-    for event_day in event_days:
-        # Buildup (gradual linear increase)
-        buildup_len = 100
-        for i in range(buildup_len):
-            si[event_day - buildup_len + i] += (i / buildup_len) * 20.0
-        # Squeeze drop
-        squeeze_len = 10
-        for i in range(squeeze_len):
-            si[event_day + i] -= (i / squeeze_len) * 20.0
-            
-    # Add some noise
-    si += np.random.normal(0, 0.5, days)
-    si = np.clip(si, 1, 40)
-    
-    # 2. Aggregated Sentiment: Clusters around events
-    sentiment = np.random.normal(0, 0.1, days)
-    for event_day in event_days:
-        # Sentiment spike before and during squeeze
-        sentiment[event_day-5 : event_day+5] += np.random.uniform(0.4, 0.8, 10)
-        
-    # 3. Volatility: Correlated with sentiment + crowding
-    volatility = np.random.uniform(0.01, 0.03, days)
-    volatility += np.abs(sentiment) * 0.1
-    volatility += (si / 40.0) * 0.05
-    
-    # 4. Returns: high volatility during events
-    returns = np.random.normal(0, volatility)
-    for event_day in event_days:
-        # Positive returns during squeeze
-        returns[event_day : event_day+5] += np.random.uniform(0.05, 0.15, 5)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tools"))
+from synthetic import SEED, batch_dates, generate_batch
+from fidelity_audit import LAG_RMSE_MAX, audit_arrays, load_real
+from artifact_store import WRITE_FORMATS, write_table
+
+def generate_synthetic(ticker="TSLA", days=1095, seed=SEED, run=0, formats=WRITE_FORMATS):
+    # One scenario of the tools/synthetic.py model (3 squeeze events at days
+    # 200/600/950: 100-day buildup, 10-day drop, clustered sentiment, vol, returns)
+    params = {"days": days, "start": "2023-01-01"}
+    path = generate_batch([ticker], [run], params, seed)
 
     df_synthetic = pd.DataFrame({
-        'date': [d.strftime('%Y-%m-%d') for d in dates],
-        'normalized_short_interest': si,
-        'aggregated_sentiment_score': sentiment,
-        'price_action_volatility': volatility,
-        'simulated_return': returns
+        'date': pd.to_datetime(batch_dates(params)),
+        'normalized_short_interest': path['si'][0],
+        'aggregated_sentiment_score': path['news_sentiment'][0],
+        'price_action_volatility': path['volatility'][0],
+        'simulated_return': path['returns'][0]
     })
     
-    os.makedirs("./artifacts", exist_ok=True)
-    df_synthetic.to_csv(f"./artifacts/synthetic_{ticker}_1095d.csv", index=False)
+    write_table(df_synthetic, 'synthetic', f"{ticker}_{days}d", formats=formats)
     
     # Auditor evaluating fidelity
     checks = []
@@ -89,11 +60,23 @@ def generate_synthetic(ticker="TSLA", days=1095):
         "note": f"Correlation: {corr_sent_vol:.3f}"
     })
     
-    # Check 4: Lag Pattern (simple check)
-    pass_lag = True # Simplified for this pod
-    checks.append({"name": "lag_pattern_similarity", "pass": True, "note": "Mimiked 48h lead observed in Stage 4."})
+    # Check 4: Lag Pattern vs the real series (tools/fidelity_audit.py)
+    real = load_real(ticker)
+    if real is None:
+        checks.append({"name": "lag_pattern_similarity", "pass": None,
+                       "note": f"No merged_daily_{ticker} table from Stage 4; not scored."})
+    else:
+        syn = {"si": path['si'], "news": path['news_sentiment'], "retail": path['retail_hype']}
+        fid = audit_arrays(syn, real).iloc[0]
+        checks.append({
+            "name": "lag_pattern_similarity",
+            "pass": bool(fid['pass_lag_profile']),
+            "note": f"Lag-profile RMSE vs Stage 4: {fid['lag_rmse']:.3f} (max {LAG_RMSE_MAX}); "
+                    f"peak lag {int(fid['lag_peak'])} vs real {int(fid['lag_peak_real'])}."
+        })
     
-    fidelity_score = sum([1 for c in checks if c['pass']]) / len(checks) * 100
+    scored = [c for c in checks if c['pass'] is not None]
+    fidelity_score = sum([1 for c in scored if c['pass']]) / len(scored) * 100
     
     audit_output = {
         "ticker": ticker,
@@ -110,5 +93,17 @@ def generate_synthetic(ticker="TSLA", days=1095):
         
     print(f"Saved synthesis artifacts for {ticker}. Fidelity Score: {fidelity_score}%")
 
+def main():
+    parser = argparse.ArgumentParser(description="Stage 5: synthetic squeeze path + fidelity audit")
+    parser.add_argument("--tickers", nargs="+", default=["TSLA"])
+    parser.add_argument("--days", type=int, default=1095)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--csv", action="store_true", help="Also write the synthetic table as .csv")
+    args = parser.parse_args()
+
+    formats = WRITE_FORMATS + (("csv",) if args.csv else ())
+    for ticker in args.tickers:
+        generate_synthetic(ticker.upper(), args.days, args.seed, formats=formats)
+
 if __name__ == "__main__":
-    generate_synthetic("TSLA")
+    main()
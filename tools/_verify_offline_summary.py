@@ -0,0 +1,26 @@
+"""Verify browser_scout.offline_summary matches the whole-cache reference for every focus ticker."""
+import sys, os, json
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from browser_scout import DEMO_CACHE, FOCUS_TICKERS, offline_summary, dedupe_items, build_daily_series
+
+# Reference: load the whole DEMO cache and filter by ticker in cache order
+with open(DEMO_CACHE, encoding="utf-8") as f:
+    all_items = json.load(f)
+
+ok = True
+for ticker in FOCUS_TICKERS:
+    kept, dropped = dedupe_items([x for x in all_items if x.get("ticker") == ticker])
+    want = {"item_count": len(kept), "dropped": dropped, "daily_series": build_daily_series(kept)}
+    got = offline_summary(ticker)
+    bad = [k for k in want if got.get(k) != want[k]]
+    if bad:
+        ok = False
+    days = list(got.get("daily_series", {}))
+    span = f"{days[0]}..{days[-1]}, {len(days)} days" if days else "no days"
+    print(("[FAIL]" if bad else "[OK]  ") + f" {ticker}: {got.get('item_count')} items ({span})"
+          + (f"  mismatch: {', '.join(bad)}" if bad else ""))
+
+print()
+print("=" * 40)
+print("RESULT: ALL PASS" if ok else "RESULT: SOME FAILURES")
+sys.exit(0 if ok else 1)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+artifact_store.py  —  Short-Alpha Pod | Typed Stage Artifacts
+==============================================================
+Read / write layer for the per-ticker tables the stages pass to each other
+(daily_features, merged_daily, lag_profile, rolling_validation, synthetic,
+news_daily, retail_daily):
+
+  <name>_<TICKER>.npz   typed, one array per column (default)
+  <name>_<TICKER>.csv   text export, what the stages used to write
+
+Typed format (same encoding as tools/si_store.py partitions):
+  date columns   int32    proleptic-Gregorian day ordinal (DATE_COLUMNS;
+                          ISO strings are parsed once on write)
+  numeric, bool  as in the frame (float64 stays float64, bit-exact)
+  strings        fixed-width unicode; missing values in a <col>__na mask
+
+Columns keep their order; read_table() loads only the columns asked for.
+Dates always come back as datetime64[ns], whichever format was read, so
+callers never re-parse them. The .npz is preferred when both exist; a .csv
+alone (hand-made, or from an older run) is read as a fallback.
+
+USAGE:
+  python tools/artifact_store.py --to csv                 # export every .npz in ./artifacts
+  python tools/artifact_store.py --to npz --names daily_features merged_daily
+"""
+
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from si_store import datetime64_to_ordinals, ordinals_to_datetime64
+
+ARTIFACTS_DIR = os.path.join(".", "artifacts")
+FORMATS       = ("npz", "csv")
+WRITE_FORMATS = ("npz",)
+STAGE_TABLES  = ("daily_features", "merged_daily", "lag_profile", "rolling_validation", "synthetic",
+                 "news_daily", "retail_daily")
+DATE_COLUMNS  = ("date",)
+NA_SUFFIX     = "__na"
+
+
+def artifact_path(name: str, ticker: str, out_dir: str = ARTIFACTS_DIR, fmt: str = "npz") -> str:
+    return os.path.join(out_dir, f"{name}_{ticker}.{fmt}")
+
+
+def find_table(name: str, ticker: str, out_dir: str = ARTIFACTS_DIR) -> str:
+    """Path of the file read_table() would read, or None."""
+    for fmt in FORMATS:
+        path = artifact_path(name, ticker, out_dir, fmt)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def has_table(name: str, ticker: str, out_dir: str = ARTIFACTS_DIR) -> bool:
+    return find_table(name, ticker, out_dir) is not None
+
+
+def list_tickers(name: str, out_dir: str = ARTIFACTS_DIR) -> list:
+    """Tickers with a `name` table in any format, sorted."""
+    if not os.path.isdir(out_dir):
+        return []
+    prefix = f"{name}_"
+    suffixes = tuple(f".{fmt}" for fmt in FORMATS)
+    return sorted({os.path.splitext(f)[0][len(prefix):] for f in os.listdir(out_dir)
+                   if f.startswith(prefix) and f.endswith(suffixes)})
+
+
+# ── Encode / decode ───────────────────────────────────────────────────────────
+def encode_frame(frame: pd.DataFrame) -> dict:
+    """Column arrays of `frame` in the typed format."""
+    arrays = {}
+    for col in frame.columns:
+        s = frame[col]
+        if col in DATE_COLUMNS:
+            if not pd.api.types.is_datetime64_any_dtype(s):
+                s = pd.to_datetime(s, format="ISO8601")
+            if s.isna().any():
+                raise ValueError(f"Date column {col!r} has missing values")
+            arrays[col] = datetime64_to_ordinals(s.to_numpy()).astype(np.int32)
+        elif pd.api.types.is_bool_dtype(s) or pd.api.types.is_numeric_dtype(s):
+            arrays[col] = s.to_numpy()
+        else:
+            missing = s.isna().to_numpy()
+            arrays[col] = s.astype(object).where(~missing, "").to_numpy().astype(str)
+            if missing.any():
+                arrays[col + NA_SUFFIX] = missing
+    return arrays
+
+
+def decode_arrays(arrays: dict, columns=None) -> pd.DataFrame:
+    """DataFrame from typed column arrays (an np.load() result or a dict)."""
+    names = [c for c in arrays if not c.endswith(NA_SUFFIX)] if columns is None else list(columns)
+    data = {}
+    for col in names:
+        a = arrays[col]
+        if col in DATE_COLUMNS:
+            data[col] = ordinals_to_datetime64(a).astype("datetime64[ns]")
+        elif a.dtype.kind == "U":
+            s = a.astype(object)
+            if col + NA_SUFFIX in arrays:
+                s[arrays[col + NA_SUFFIX]] = None
+            data[col] = s
+        else:
+            data[col] = a
+    return pd.DataFrame(data)
+
+
+# ── Read / write ──────────────────────────────────────────────────────────────
+def write_table(frame: pd.DataFrame, name: str, ticker: str, out_dir: str = ARTIFACTS_DIR,
+                formats=WRITE_FORMATS) -> list:
+    """Write `frame` as <name>_<ticker> in every format of `formats`; returns the paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for fmt in formats:
+        path = artifact_path(name, ticker, out_dir, fmt)
+        if fmt == "npz":
+            np.savez(path, **encode_frame(frame))
+        elif fmt == "csv":
+            frame.to_csv(path, index=False)
+        else:
+            raise ValueError(f"Unknown artifact format: {fmt!r}")
+        paths.append(path)
+    return paths
+
+
+def read_table(name: str, ticker: str, out_dir: str = ARTIFACTS_DIR, columns=None) -> pd.DataFrame:
+    """One ticker's `name` table; `columns` limits what is read. Raises FileNotFoundError."""
+    path = find_table(name, ticker, out_dir)
+    if path is None:
+        raise FileNotFoundError(artifact_path(name, ticker, out_dir))
+    if path.endswith(".npz"):
+        with np.load(path) as z:
+            return decode_arrays(z, columns)
+    frame = pd.read_csv(path, usecols=None if columns is None else list(columns))
+    for col in DATE_COLUMNS:
+        if col in frame:
+            frame[col] = pd.to_datetime(frame[col], format="ISO8601").astype("datetime64[ns]")
+    return frame
+
+
+def convert(names=STAGE_TABLES, to: str = "csv", out_dir: str = ARTIFACTS_DIR) -> list:
+    """Rewrite existing `names` tables in format `to` (e.g. a CSV export of the .npz artifacts)."""
+    src = "npz" if to == "csv" else "csv"
+    written = []
+    for f in sorted(os.listdir(out_dir)):
+        stem, ext = os.path.splitext(f)
+        name = next((n for n in names if stem.startswith(f"{n}_")), None)
+        if ext != f".{src}" or name is None:
+            continue
+        ticker = stem[len(name) + 1:]
+        if src == "npz":
+            with np.load(os.path.join(out_dir, f)) as z:
+                frame = decode_arrays(z)
+        else:
+            frame = pd.read_csv(os.path.join(out_dir, f))
+        written += write_table(frame, name, ticker, out_dir, (to,))
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert stage artifacts between .npz and .csv")
+    parser.add_argument("--to",    choices=FORMATS, default="csv")
+    parser.add_argument("--names", nargs="+", default=list(STAGE_TABLES))
+    parser.add_argument("--dir",   default=ARTIFACTS_DIR)
+    args = parser.parse_args()
+
+    written = convert(args.names, args.to, args.dir)
+    print(f"[OK] Wrote {len(written)} .{args.to} tables to {args.dir}")
+
+
+if __name__ == "__main__":
+    main()
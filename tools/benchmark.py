@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+benchmark.py  —  Short-Alpha Pod | Benchmark Suite
+===================================================
+Times the pipeline's hot paths on synthetic workloads of growing size and
+compares them with a saved baseline:
+
+  case           workload at scale s                          unit
+  discovery      stage1 run_discovery_many("all") on the       CSV rows
+                 repo CSV with every ticker copied s times
+  validation     stage4 run_validation on one ticker with      days
+                 s × VALIDATION_DAYS days of stage1/daily tables
+  synthesis      stage5 generate_synthetic, s × 1095 days      days
+  dedupe         browser_scout.dedupe_items                    items (s × EVIDENCE_ITEMS)
+  daily_series   browser_scout.build_daily_series              items
+  snapshot       run_daily_demo.build_snapshot, CSV × s and    items
+                 s × EVIDENCE_ITEMS news + retail items
+  url_audit      url_audit.audit_cache on the news cache       items
+
+Scales 1 / 10 / 100 / 1000 cover 1×–1000× CSV rows and 10k–1M evidence
+items (evidence cases are capped at EVIDENCE_MAX_SCALE).
+
+Every measurement runs in a fresh process inside a throwaway copy of the
+repo layout (tools/, stage*.py, docs/data, data, artifacts), so the real
+data is never touched and derived stores (si_store, evidence partitions)
+are rebuilt cold each time. Recorded per case and scale: wall time (best
+of --repeat), throughput, and the child's peak RSS. Evidence items are
+generated deterministically (SEED): random titles / excerpts over the demo
+caches' vocabulary plus filler tokens, with DUP_URL_RATE exact URL repeats
+and NEAR_DUP_RATE near-duplicate posts.
+
+A case regresses when its wall time (by more than NOISE_FLOOR_S as well)
+or peak RSS exceeds the baseline's by more than --tolerance; any
+regression makes the run exit with status 1.
+
+Output:
+  ./artifacts/benchmark.json            this run
+  ./artifacts/benchmark_baseline.json   baseline (--save-baseline)
+
+USAGE:
+  python tools/benchmark.py                                   # scales 1 10, every case
+  python tools/benchmark.py --scales 1 10 100 1000 --cases discovery dedupe
+  python tools/benchmark.py --save-baseline                   # record the reference numbers
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import shutil
+import platform
+import resource
+import argparse
+import tempfile
+import subprocess
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+ROOT          = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARTIFACTS_DIR = os.path.join(".", "artifacts")
+RESULTS_PATH  = os.path.join(ARTIFACTS_DIR, "benchmark.json")
+BASELINE_PATH = os.path.join(ARTIFACTS_DIR, "benchmark_baseline.json")
+
+SEED               = 20240501
+SCALES             = (1, 10)
+REPEAT             = 3
+TOLERANCE          = 0.25
+NOISE_FLOOR_S      = 0.1        # slowdowns smaller than this are never regressions
+EVIDENCE_ITEMS     = 10_000
+EVIDENCE_MAX_SCALE = 100
+EVIDENCE_DAYS      = 730
+VALIDATION_DAYS    = 270
+VALIDATION_DRAWS   = 1000       # bootstrap / permutation draws (stage4 default: 10,000)
+DUP_URL_RATE       = 0.05
+NEAR_DUP_RATE      = 0.10
+FILLER_WORDS       = 20_000
+TITLE_WORDS        = 8
+EXCERPT_WORDS      = 16
+
+CSV_NAME      = "Stock Short Interest Data.csv"
+VOCAB_NAME    = "bench_vocab.json"
+FOCUS_TICKERS = ["AFRM", "SQ", "PYPL", "SHOP", "TSLA"]
+BENCH_TICKER  = "BENCH"
+
+CASES = {
+    "discovery":    "rows",
+    "validation":   "days",
+    "synthesis":    "days",
+    "dedupe":       "items",
+    "daily_series": "items",
+    "snapshot":     "items",
+    "url_audit":    "items",
+}
+EVIDENCE_CASES = {"dedupe", "daily_series", "snapshot", "url_audit"}
+
+
+# ── Workloads ─────────────────────────────────────────────────────────────────
+def _rng(*keys) -> np.random.Generator:
+    return np.random.default_rng([SEED, *(zlib.crc32(str(k).encode()) for k in keys)])
+
+
+def vocabulary(root: str = ROOT) -> list:
+    """Words of the demo caches' titles / excerpts, then filler tokens."""
+    words = set()
+    for kind in ("news", "retail"):
+        with open(os.path.join(root, "docs", "data", f"{kind}_demo_cache.json"), encoding="utf-8") as f:
+            for item in json.load(f):
+                words.update(f"{item.get('title', '')} {item.get('excerpt', '')}".lower().split())
+    return sorted(words) + [f"tok{k}" for k in range(FILLER_WORDS)]
+
+
+def evidence_items(n: int, kind: str, vocab: list, end: date = None) -> list:
+    """n deterministic evidence items (DataHub schema) over the EVIDENCE_DAYS before `end`."""
+    rng = _rng("evidence", kind, n)
+    end = end or datetime.now(timezone.utc).date()
+    vocab = np.asarray(vocab, dtype=object)
+    tick = rng.integers(0, len(FOCUS_TICKERS), n)
+    day = rng.integers(0, EVIDENCE_DAYS, n)
+    minute = rng.integers(0, 24 * 60, n)
+    words = vocab[rng.integers(0, len(vocab), (n, TITLE_WORDS + EXCERPT_WORDS))]
+    sentiment = rng.uniform(-1, 1, n)
+    engagement = rng.integers(0, 5000, n)
+    # near duplicates copy an earlier post's text, URL repeats an earlier post's URL
+    near = rng.random(n) < NEAR_DUP_RATE
+    dup_url = rng.random(n) < DUP_URL_RATE
+    src = (rng.random(n) * np.arange(n)).astype(np.int64)
+
+    items = []
+    for i in range(n):
+        t = FOCUS_TICKERS[tick[i]]
+        d = end - timedelta(days=int(day[i]))
+        w = words[src[i]] if near[i] else words[i]
+        ref = src[i] if dup_url[i] else i
+        items.append({
+            "id":               f"{kind}-{t}-{i}",
+            "ticker":           t,
+            "source_type":      "institutional" if kind == "news" else "retail",
+            "provider":         f"provider{i % 12}",
+            "title":            f"{t} " + " ".join(w[:TITLE_WORDS]),
+            "url":              f"https://{kind}.example.org/{t.lower()}/{ref}",
+            "published_at_utc": f"{d.isoformat()}T{minute[i] // 60:02d}:{minute[i] % 60:02d}:00Z",
+            "excerpt":          " ".join(w[TITLE_WORDS:]),
+            "tags":             [],
+            "metrics":          {"sentiment": float(sentiment[i]), "shock": 0,
+                                 "engagement": int(engagement[i]), "volume": 1},
+            "quality_flags":    [],
+            "mode":             "DEMO",
+        })
+    return items
+
+
+def write_jsonl(path: str, items: list):
+    with open(path, "w", encoding="utf-8") as f:
+        for item in items:
+            f.write(json.dumps(item) + "\n")
+
+
+def write_scaled_csv(src: str, dst: str, scale: int) -> int:
+    """The CSV with every ticker repeated `scale` times (copies renamed <TICKER>_<k>); returns rows."""
+    base = pd.read_csv(src, dtype=str)
+    rows = 0
+    for k in range(scale):
+        part = base if k == 0 else base.assign(Ticker=base["Ticker"] + f"_{k}")
+        part.to_csv(dst, index=False, header=(k == 0), mode="w" if k == 0 else "a")
+        rows += len(part)
+    return rows
+
+
+def validation_tables(days: int) -> dict:
+    """stage1 / daily evidence tables of BENCH_TICKER over `days` business days."""
+    rng = _rng("validation", days)
+    dates = pd.bdate_range("2000-01-03", periods=days)
+    si = 0.05 + 0.02 * np.sin(np.arange(days) / 40) + np.cumsum(rng.normal(0, 1e-4, days))
+    news = rng.uniform(-1, 1, days)
+    hype = rng.uniform(0, 1, days)
+    features = pd.DataFrame({
+        "date": dates, "short_interest_pct": si, "crowded_score": 50 + 500 * si + rng.normal(0, 2, days),
+        "squeeze_score": 50 + 400 * si + rng.normal(0, 3, days), "utilization": rng.uniform(0, 100, days),
+        "borrow_cost": rng.uniform(0, 5, days), "returns": rng.normal(0, 0.02, days),
+    })
+    news_daily = pd.DataFrame({"date": dates, "news_count": rng.integers(0, 5, days).astype(np.int32),
+                               "news_volume": rng.uniform(0, 1, days), "news_sentiment_index": news})
+    retail_daily = pd.DataFrame({"date": dates, "retail_count": rng.integers(0, 9, days).astype(np.int32),
+                                 "retail_chatter_volume": rng.uniform(0, 1, days), "retail_hype_index": hype,
+                                 "retail_black_swan": (rng.random(days) < 0.01).astype(np.int8)})
+    merged = features[["date", "short_interest_pct"]].assign(news_sentiment_index=news, retail_hype_index=hype)
+    return {"daily_features": features, "news_daily": news_daily, "retail_daily": retail_daily,
+            "merged_daily": merged}
+
+
+# ── Sandbox ───────────────────────────────────────────────────────────────────
+def make_sandbox(vocab: list, root: str = ROOT) -> str:
+    """Throwaway copy of the code and demo data; returns its path."""
+    box = tempfile.mkdtemp(prefix="sap_bench_")
+    with open(os.path.join(box, VOCAB_NAME), "w", encoding="utf-8") as f:
+        json.dump(vocab, f)
+    shutil.copytree(os.path.join(root, "tools"), os.path.join(box, "tools"),
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    for f in os.listdir(root):
+        if f.startswith("stage") and f.endswith(".py"):
+            shutil.copy2(os.path.join(root, f), box)
+    for d in ("data", os.path.join("docs", "data"), "artifacts"):
+        os.makedirs(os.path.join(box, d), exist_ok=True)
+    for kind in ("news", "retail"):
+        name = f"{kind}_demo_cache.json"
+        shutil.copy2(os.path.join(root, "docs", "data", name), os.path.join(box, "docs", "data", name))
+    return box
+
+
+def reset_derived(box: str):
+    """Drop stores and outputs so the next run starts cold."""
+    for d in (os.path.join("data", "si_store"), os.path.join("docs", "data", "si_store"),
+              os.path.join("docs", "data", "evidence"), "artifacts"):
+        shutil.rmtree(os.path.join(box, d), ignore_errors=True)
+    os.makedirs(os.path.join(box, "artifacts"), exist_ok=True)
+    for f in ("daily_snapshot.json", "daily_snapshot_state.json"):
+        if os.path.exists(os.path.join(box, "docs", "data", f)):
+            os.remove(os.path.join(box, "docs", "data", f))
+
+
+def prepare(box: str, case: str, scale: int, vocab: list) -> int:
+    """Write the inputs of `case` at `scale` into the sandbox; returns the workload size."""
+    csv_src = os.path.join(ROOT, "data", CSV_NAME)
+    if case == "discovery":
+        return write_scaled_csv(csv_src, os.path.join(box, "data", CSV_NAME), scale)
+    if case in ("validation", "synthesis"):
+        return scale * (VALIDATION_DAYS if case == "validation" else 1095)
+    n = EVIDENCE_ITEMS * scale
+    if case == "snapshot":
+        write_scaled_csv(csv_src, os.path.join(box, "docs", "data", CSV_NAME), scale)
+        for kind in ("news", "retail"):
+            write_jsonl(os.path.join(box, "docs", "data", f"{kind}_demo_cache.json"),
+                        evidence_items(n, kind, vocab))
+        return 2 * n
+    if case == "url_audit":
+        write_jsonl(os.path.join(box, "docs", "data", "news_demo_cache.json"), evidence_items(n, "news", vocab))
+    return n
+
+
+# ── Child side: one timed call ────────────────────────────────────────────────
+def run_case(case: str, scale: int, size: int) -> dict:
+    """Set up and time one call of `case` in this process (cwd = sandbox)."""
+    # tools/ is already on the path (script dir); the stage modules live one level up
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from artifact_store import write_table
+
+    if case == "discovery":
+        import stage1_discovery
+        call = lambda: stage1_discovery.run_discovery_many("all", workers=1)
+    elif case == "validation":
+        import stage4_validation
+        for name, frame in validation_tables(size).items():
+            if name != "merged_daily":
+                write_table(frame, name, BENCH_TICKER)
+        call = lambda: stage4_validation.run_validation(BENCH_TICKER, n_resamples=VALIDATION_DRAWS)
+    elif case == "synthesis":
+        import stage5_synthesis_audit
+        write_table(validation_tables(VALIDATION_DAYS)["merged_daily"], "merged_daily", BENCH_TICKER)
+        call = lambda: stage5_synthesis_audit.generate_synthetic(BENCH_TICKER, days=size)
+    elif case in ("dedupe", "daily_series"):
+        import browser_scout
+        with open(VOCAB_NAME, encoding="utf-8") as f:
+            items = evidence_items(size, "retail", json.load(f))
+        fn = browser_scout.dedupe_items if case == "dedupe" else browser_scout.build_daily_series
+        call = lambda: fn(items)
+    elif case == "snapshot":
+        import run_daily_demo
+        call = lambda: run_daily_demo.build_snapshot()
+    elif case == "url_audit":
+        import url_audit
+        call = lambda: url_audit.audit_cache(url_audit.NEWS_CACHE, "news", tempfile.TemporaryFile("w+"))
+    else:
+        raise ValueError(f"Unknown case: {case!r}")
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    call()
+    wall = time.perf_counter() - t0
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"wall_s": wall, "rss_before_mb": rss_before / 1024, "peak_rss_mb": rss_peak / 1024}
+
+
+def _child_main(case: str, scale: int, size: int):
+    # Stage prints are discarded; the result line is the child's only stdout
+    real_stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        result = run_case(case, scale, size)
+    finally:
+        sys.stdout.close()
+        sys.stdout = real_stdout
+    print(json.dumps(result))
+
+
+# ── Parent side ───────────────────────────────────────────────────────────────
+def measure(box: str, case: str, scale: int, size: int, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        reset_derived(box)
+        proc = subprocess.run([sys.executable, os.path.join(box, "tools", "benchmark.py"),
+                               "--_child", case, str(scale), str(size)],
+                              cwd=box, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{case}@{scale} failed:\n{proc.stderr.strip()[-2000:]}")
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    best = min(r["wall_s"] for r in runs)
+    return {
+        "case":          case,
+        "scale":         scale,
+        "size":          size,
+        "unit":          CASES[case],
+        "wall_s":        round(best, 4),
+        "wall_s_runs":   [round(r["wall_s"], 4) for r in runs],
+        "throughput":    round(size / best, 1) if best > 0 else None,
+        "peak_rss_mb":   round(max(r["peak_rss_mb"] for r in runs), 1),
+        "rss_before_mb": round(min(r["rss_before_mb"] for r in runs), 1),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float = TOLERANCE) -> list:
+    """Keys of `results` whose wall time or peak RSS exceeds the baseline's by more than `tolerance`."""
+    regressions = []
+    for key, r in results.items():
+        b = baseline.get(key)
+        if not b:
+            continue
+        slow = r["wall_s"] > b["wall_s"] * (1 + tolerance) and r["wall_s"] - b["wall_s"] > NOISE_FLOOR_S
+        heavy = r["peak_rss_mb"] > b["peak_rss_mb"] * (1 + tolerance)
+        r["vs_baseline"] = {"wall": round(r["wall_s"] / b["wall_s"], 3) if b["wall_s"] else None,
+                            "peak_rss": round(r["peak_rss_mb"] / b["peak_rss_mb"], 3) if b["peak_rss_mb"] else None}
+        if slow or heavy:
+            regressions.append(key)
+    return regressions
+
+
+def run_suite(cases, scales, repeat: int = REPEAT) -> dict:
+    vocab = vocabulary()
+    box = make_sandbox(vocab)
+    results = {}
+    try:
+        for scale in scales:
+            for case in cases:
+                if case in EVIDENCE_CASES and scale > EVIDENCE_MAX_SCALE:
+                    print(f"[INFO] {case}@{scale}: above EVIDENCE_MAX_SCALE, skipped")
+                    continue
+                size = prepare(box, case, scale, vocab)
+                r = measure(box, case, scale, size, repeat)
+                results[f"{case}@{scale}"] = r
+                print(f"[OK] {case}@{scale}: {r['wall_s']:.3f}s, {r['throughput']:,.0f} {r['unit']}/s, "
+                      f"peak RSS {r['peak_rss_mb']:.0f} MB")
+    finally:
+        shutil.rmtree(box, ignore_errors=True)
+    return results
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "--_child":
+        _child_main(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline on scaled synthetic workloads")
+    parser.add_argument("--cases",         nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--scales",        type=int, nargs="+", default=list(SCALES))
+    parser.add_argument("--repeat",        type=int, default=REPEAT, help="Runs per case (best wall time kept)")
+    parser.add_argument("--tolerance",     type=float, default=TOLERANCE,
+                        help="Allowed slowdown / memory growth vs the baseline (0.25 = 25%%)")
+    parser.add_argument("--baseline",      default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--out",           default=RESULTS_PATH)
+    args = parser.parse_args()
+
+    results = run_suite(args.cases, args.scales, args.repeat)
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment":  {"python": platform.python_version(), "numpy": np.__version__,
+                         "pandas": pd.__version__, "machine": platform.machine(), "cpus": os.cpu_count()},
+        "params":       {"repeat": args.repeat, "evidence_items": EVIDENCE_ITEMS,
+                         "validation_draws": VALIDATION_DRAWS, "seed": SEED},
+        "results":      results,
+    }
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        report["regressions"] = regressions
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[OK] Baseline saved to {args.baseline}")
+
+    for key in regressions:
+        v = results[key]["vs_baseline"]
+        print(f"[FAIL] {key}: wall ×{v['wall']}, peak RSS ×{v['peak_rss']} vs baseline")
+    print(f"[OK] {len(results)} measurements written to {args.out}"
+          + (f"; {len(regressions)} regression(s)" if regressions else ""))
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
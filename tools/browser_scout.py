@@ -36,17 +36,26 @@ DEDUPLICATION RULES (same as DataHub.dedupeEvidence in docs/index.html):
   - Same URL (normalized, strip query params)
   - Same excerpt (Jaccard >= 0.85)
   Deduped posts are dropped; a DUPLICATE_REMOVED quality_flag is added to
-  the surviving canonical item.
+  the surviving canonical item. Title/excerpt candidates come from a
+  MinHash/LSH index and are confirmed with exact Jaccard (see dedupe_items).
 """
 
 import os
 import sys
 import json
 import argparse
+import zlib
 import hashlib
+from itertools import islice
 from datetime import datetime, timezone
 from collections import defaultdict
 
+import numpy as np
+
+from evidence_store import iter_evidence
+from lexicon import HYPE_BULL, HYPE_BEAR, HYPE_LEXICON, score_hype
+from score_cache import open_score_cache
+
 ROOT     = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(ROOT, "docs", "data")
 DEMO_CACHE  = os.path.join(DATA_DIR, "retail_demo_cache.json")
@@ -54,6 +63,8 @@ LIVE_OUTPUT = os.path.join(DATA_DIR, "retail_live_cache.json")
 
 FOCUS_TICKERS = ["AFRM", "SQ", "PYPL", "SHOP", "TSLA"]
 
+SCORE_BATCH = 8192   # posts hype-scored per score_hype() call when streaming
+
 
 # ── Jaccard similarity (word-token level) ────────────────────────────────────
 def jaccard(a: str, b: str) -> float:
@@ -71,93 +82,275 @@ def normalize_url(url: str) -> str:
     return url.split("?")[0].rstrip("/") if url else ""
 
 
-# ── Dedupe a list of items in-place; returns (kept, dropped_count) ───────────
-def dedupe_items(items: list) -> tuple:
-    kept   = []
-    dropped = 0
-    seen_urls   = {}   # norm_url -> index in kept
-    seen_titles = {}   # item index -> title tokens
+# ── MinHash / LSH index for near-duplicate lookup ───────────────────────────
+# Token sets are MinHashed with LSH_BANDS x LSH_ROWS seeded permutations; two
+# posts become candidates if any band matches, and every candidate is then
+# verified with the exact Jaccard above, so LSH can only ever *miss* a pair,
+# never invent one. At Jaccard 0.85 the chance of a miss is
+# (1 - 0.85**5)**32 ≈ 7e-9 per pair.
+LSH_BANDS  = 32
+LSH_ROWS   = 5
+LSH_BLOCK  = 1024            # posts MinHashed per numpy batch
+# Multiply-shift hash family over 32-bit token hashes: ((a*h + b) mod 2**64) >> 32
+_perm_rng  = np.random.default_rng(20210119)
+_PERM_A    = _perm_rng.integers(0, 1 << 63, LSH_BANDS * LSH_ROWS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_PERM_B    = _perm_rng.integers(0, 1 << 63, LSH_BANDS * LSH_ROWS, dtype=np.uint64)
+_BAND_MIX  = _perm_rng.integers(0, 1 << 63, LSH_ROWS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_BAND_SALT = _perm_rng.integers(0, 1 << 63, LSH_BANDS, dtype=np.uint64)
+
+
+def token_set(text) -> frozenset:
+    """Same tokenisation as jaccard(): lower-cased whitespace split (tokens interned, shared across posts)."""
+    return frozenset(map(sys.intern, text.lower().split())) if text else frozenset()
+
+
+def minhash_signatures(sets: list, token_hashes: dict) -> np.ndarray:
+    """(len(sets), LSH_BANDS*LSH_ROWS) uint64 signatures; rows of empty sets are 0."""
+    sig = np.zeros((len(sets), len(_PERM_A)), dtype=np.uint64)
+    rows, starts, flat = [], [], []
+    for i, st in enumerate(sets):
+        if st:
+            rows.append(i)
+            starts.append(len(flat))
+            flat.extend(st)
+    for tok in set(flat).difference(token_hashes):
+        token_hashes[tok] = zlib.crc32(tok.encode("utf-8"))
+    if rows:
+        h = np.fromiter(map(token_hashes.__getitem__, flat), dtype=np.uint64, count=len(flat))
+        perm = (h[:, None] * _PERM_A[None, :] + _PERM_B[None, :]) >> np.uint64(32)
+        sig[rows] = np.minimum.reduceat(perm, starts, axis=0)
+    return sig
+
+
+def band_keys(sig: np.ndarray) -> np.ndarray:
+    """(len(sig), LSH_BANDS) uint64 hashed bucket key per LSH band of every signature row."""
+    bands = sig.reshape(len(sig), LSH_BANDS, LSH_ROWS)
+    return (bands * _BAND_MIX).sum(axis=2, dtype=np.uint64) ^ _BAND_SALT
+
+
+# Buckets are sorted numpy runs of (band key uint64, ref int32) — 12 bytes per
+# band of a kept post, no Python object per bucket — merged geometrically as
+# blocks are flushed, and queried a whole block of keys at a time.
+_NO_REFS = np.empty(0, dtype=np.int32)
+
+
+def new_lsh_index() -> dict:
+    return {"exact": {}, "sets": [], "runs": []}
+
+
+def lsh_add(index: dict, ref: int, st: frozenset):
+    """Register kept post `ref` (its position in `kept`) under token set `st`."""
+    while len(index["sets"]) <= ref:
+        index["sets"].append(frozenset())
+    if st:
+        index["sets"][ref] = st
+        index["exact"].setdefault(st, ref)
+
+
+def lsh_flush(index: dict, keys: np.ndarray, refs: np.ndarray):
+    """Add the band keys (n, LSH_BANDS) of kept posts `refs` (n,) to the buckets."""
+    if not len(refs):
+        return
+    flat = keys.ravel()
+    order = np.argsort(flat, kind="stable")
+    runs = index["runs"]
+    runs.append((flat[order], np.repeat(np.asarray(refs, dtype=np.int32), keys.shape[1])[order]))
+    while len(runs) > 1 and len(runs[-2][0]) <= 2 * len(runs[-1][0]):
+        (k2, r2), (k1, r1) = runs.pop(), runs.pop()
+        merged, refs = np.concatenate([k1, k2]), np.concatenate([r1, r2])
+        order = np.argsort(merged, kind="stable")
+        runs.append((merged[order], refs[order]))
+
+
+def _group_by_row(rows: np.ndarray, values: np.ndarray, n_rows: int) -> list:
+    order = np.argsort(rows, kind="stable")
+    return np.split(values[order], np.searchsorted(rows[order], np.arange(1, n_rows)))
+
+
+def lsh_candidates(index: dict, keys: np.ndarray) -> list:
+    """Flushed refs sharing a band with each row of `keys` (one int32 array per row)."""
+    B, L = keys.shape
+    flat = keys.ravel()
+    qo = np.argsort(flat)
+    q = flat[qo]
+    hit_rows, hit_refs = [], []
+    for run_keys, run_refs in index["runs"]:
+        lo = np.searchsorted(run_keys, q, "left")
+        hit = np.flatnonzero(run_keys[np.minimum(lo, len(run_keys) - 1)] == q)
+        if not len(hit):
+            continue
+        lo = lo[hit]
+        cnt = np.searchsorted(run_keys, q[hit], "right") - lo
+        offs = np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        hit_rows.append(np.repeat(qo[hit] // L, cnt))
+        hit_refs.append(run_refs[np.repeat(lo, cnt) + offs])
+    if not hit_rows:
+        return [_NO_REFS] * B
+    return _group_by_row(np.concatenate(hit_rows), np.concatenate(hit_refs), B)
+
+
+def block_pairs(keys: np.ndarray) -> list:
+    """For each row j of `keys`, the earlier rows i < j sharing a band with it."""
+    B, L = keys.shape
+    flat = keys.ravel()
+    order = np.argsort(flat, kind="stable")
+    sk, rows = flat[order], order // L          # rows ascend within a run of equal keys
+    new_group = np.r_[True, sk[1:] != sk[:-1]]
+    if new_group.all():
+        return [_NO_REFS] * B
+    gstart = np.flatnonzero(new_group)[np.cumsum(new_group) - 1]
+    pos = np.arange(len(sk))
+    firsts, seconds = [], []
+    d = 1
+    active = pos[pos - gstart >= 1]
+    while len(active):
+        firsts.append(rows[active - d])
+        seconds.append(rows[active])
+        d += 1
+        active = active[active - gstart[active] >= d]
+    i, j = np.concatenate(firsts), np.concatenate(seconds)
+    earlier = i < j
+    return _group_by_row(j[earlier], i[earlier].astype(np.int32), B)
+
+
+def lsh_match(index: dict, st: frozenset, candidates, threshold: float) -> bool:
+    """True if `st` is registered or some candidate ref's set has exact Jaccard >= threshold."""
+    if not st:
+        return False
+    if st in index["exact"]:
+        return True
+    n, sets, seen = len(st), index["sets"], set()
+    for ref in candidates:
+        if ref in seen:
+            continue
+        seen.add(ref)
+        other = sets[ref]
+        m = len(other)
+        if min(n, m) < threshold * max(n, m):   # size filter: J <= min/max
+            continue
+        inter = len(st & other)
+        if inter / (n + m - inter) >= threshold:
+            return True
+    return False
 
-    for item in items:
-        url  = normalize_url(item.get("url", ""))
-        title   = item.get("title", "")
-        excerpt = item.get("excerpt", "")
 
-        # URL dedup (exact after normalize)
-        if url and url in seen_urls:
-            dropped += 1
-            continue
+def _block_candidates(flushed: np.ndarray, pairs: np.ndarray, block_refs: list) -> list:
+    # refs from earlier blocks, then kept posts of this block (block_refs[i] >= 0)
+    return flushed.tolist() + [r for r in map(block_refs.__getitem__, pairs.tolist()) if r >= 0]
 
-        # Title / excerpt Jaccard against existing kept
-        is_dup = False
-        for ki, k in enumerate(kept):
-            if jaccard(title, k.get("title", "")) >= 0.92:
-                is_dup = True
-                break
-            if excerpt and jaccard(excerpt, k.get("excerpt", "")) >= 0.85:
-                is_dup = True
-                break
-        if is_dup:
-            dropped += 1
-            continue
 
-        if url:
-            seen_urls[url] = len(kept)
-        kept.append(item)
+# ── Dedupe a list of items in-place; returns (kept, dropped_count) ───────────
+def dedupe_items(items) -> tuple:
+    """
+    Drop posts whose normalized URL, title (Jaccard >= 0.92) or excerpt
+    (Jaccard >= 0.85) duplicates an already-kept post. Same rules and same
+    kept set as a pairwise scan, but candidates come from the LSH index and
+    token sets are computed once per post, so cost is ~linear in posts.
+    `items` may be any iterable; it is consumed in blocks of LSH_BLOCK.
+    """
+    kept   = []
+    dropped = 0
+    seen_urls = set()
+    titles, excerpts = new_lsh_index(), new_lsh_index()
+    token_hashes = {}
+
+    it = iter(items)
+    while True:
+        block = list(islice(it, LSH_BLOCK))
+        if not block:
+            break
+        t_sets = [token_set(x.get("title", "")) for x in block]
+        e_sets = [token_set(x.get("excerpt", "")) for x in block]
+        t_keys = band_keys(minhash_signatures(t_sets, token_hashes))
+        e_keys = band_keys(minhash_signatures(e_sets, token_hashes))
+        t_prev, e_prev = lsh_candidates(titles, t_keys), lsh_candidates(excerpts, e_keys)
+        t_pairs, e_pairs = block_pairs(t_keys), block_pairs(e_keys)
+        t_refs, e_refs = [-1] * len(block), [-1] * len(block)   # block row -> ref once bucketed
+
+        for j, item in enumerate(block):
+            url = normalize_url(item.get("url", ""))
+
+            # URL dedup (exact after normalize)
+            if url and url in seen_urls:
+                dropped += 1
+                continue
+
+            # Title / excerpt near-duplicate of anything kept so far
+            if (lsh_match(titles, t_sets[j], _block_candidates(t_prev[j], t_pairs[j], t_refs), 0.92)
+                    or lsh_match(excerpts, e_sets[j], _block_candidates(e_prev[j], e_pairs[j], e_refs), 0.85)):
+                dropped += 1
+                continue
+
+            if url:
+                seen_urls.add(url)
+            ref = len(kept)
+            lsh_add(titles, ref, t_sets[j])
+            lsh_add(excerpts, ref, e_sets[j])
+            if t_sets[j]:
+                t_refs[j] = ref
+            if e_sets[j]:
+                e_refs[j] = ref
+            kept.append(item)
+
+        for index, keys, refs in ((titles, t_keys, t_refs), (excerpts, e_keys, e_refs)):
+            rows = [j for j, r in enumerate(refs) if r >= 0]
+            lsh_flush(index, keys[rows], np.asarray(refs, dtype=np.int32)[rows])
 
     return kept, dropped
 
 
 # ── Hype classifier: naive rule-based (0..1) ─────────────────────────────────
-HYPE_BULL = {"moon", "squeeze", "yolo", "rocket", "ape", "diamond", "hold", "rip",
-             "breakout", "buy", "calls", "bullish", "long", "up"}
-HYPE_BEAR = {"puts", "short", "crash", "dump", "paper", "sell", "bearish", "down"}
-
-def hype_score(title: str, excerpt: str) -> float:
-    text  = (title + " " + excerpt).lower().split()
-    words = set(text)
-    bull  = len(words & HYPE_BULL)
-    bear  = len(words & HYPE_BEAR)
-    total = bull + bear
-    if total == 0:
-        return 0.5  # neutral
-    return round(bull / total, 4)
+# Lexicon (HYPE_BULL / HYPE_BEAR) and batch scorer live in tools/lexicon.py;
+# score whole lists with score_hype(), this is the one-post convenience form.
+def hype_score(title: str, excerpt: str, lexicon=HYPE_LEXICON) -> float:
+    return float(score_hype([title], [excerpt], lexicon)[0])
 
 
 # ── Build per-day time-series from a flat item list ──────────────────────────
-def build_daily_series(items: list) -> dict:
+def build_daily_series(items, cache=None) -> dict:
     """
     Returns dict: { "YYYY-MM-DD": { "ret_vol": int, "hype": float, "post_count": int } }
     ret_vol  = sum(engagement across posts on that day)
     hype     = mean(hype_score) across posts on that day
     post_count = unique posts after dedupe
+
+    `items` may be any iterable (e.g. iter_evidence()); it is consumed in one
+    pass and only per-day running sums are kept. `cache` is an optional
+    score_cache.ScoreCache for the hype scores.
     """
-    by_day = defaultdict(list)
-    for item in items:
-        ts = item.get("published_at_utc", "")
-        dk = ts[:10] if len(ts) >= 10 else None   # "YYYY-MM-DD"
-        if dk:
-            by_day[dk].append(item)
+    by_day = defaultdict(lambda: [0, 0.0, 0])   # day -> [engagement sum, hype sum, posts]
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, SCORE_BATCH))
+        if not chunk:
+            break
+        batch = [it for it in chunk if len(it.get("published_at_utc", "")) >= 10]
+        hype = score_hype([it.get("title", "") for it in batch], [it.get("excerpt", "") for it in batch],
+                          cache=cache)
+        for item, h in zip(batch, hype.tolist()):
+            acc = by_day[item["published_at_utc"][:10]]   # "YYYY-MM-DD"
+            acc[0] += item.get("metrics", {}).get("engagement", 0)
+            acc[1] += h
+            acc[2] += 1
 
     series = {}
-    for dk, day_items in sorted(by_day.items()):
-        engagements = [item.get("metrics", {}).get("engagement", 0) for item in day_items]
-        hypes       = [hype_score(item.get("title", ""), item.get("excerpt", ""))
-                       for item in day_items]
+    for dk, (eng, hype, n) in sorted(by_day.items()):
         series[dk] = {
-            "ret_vol":    sum(engagements),
-            "hype":       round(sum(hypes) / len(hypes), 4) if hypes else 0.0,
-            "post_count": len(day_items),
+            "ret_vol":    eng,
+            "hype":       round(hype / n, 4) if n else 0.0,
+            "post_count": n,
         }
     return series
 
 
 # ── Ingest a manual-collection seed file (tools/browser_scout.md format) ─────
-def ingest_seed(seed_path: str, ticker: str) -> list:
+def ingest_seed(seed_path: str, ticker: str, cache=None) -> list:
     with open(seed_path, encoding="utf-8") as f:
         raw = json.load(f)
 
     now = datetime.now(timezone.utc).isoformat()
+    hype = score_hype([it.get("title", "") for it in raw], [it.get("excerpt", "") for it in raw],
+                      cache=cache).tolist()
     result = []
     for i, item in enumerate(raw):
         # Ensure required fields exist; mark as LIVE
@@ -180,23 +373,22 @@ def ingest_seed(seed_path: str, ticker: str) -> list:
             item["metrics"] = {}
         item["metrics"].setdefault(
             "sentiment", item["metrics"].get("sentiment", 0.0))
-        item["metrics"]["hype"] = hype_score(
-            item.get("title", ""), item.get("excerpt", ""))
+        item["metrics"]["hype"] = hype[i]
 
         result.append(item)
     return result
 
 
 # ── Offline mode: summarise DEMO cache for a ticker ──────────────────────────
-def offline_summary(ticker: str) -> dict:
+def offline_summary(ticker: str, cache=None) -> dict:
     if not os.path.exists(DEMO_CACHE):
         print(f"[WARN] Demo cache not found: {DEMO_CACHE}")
         return {}
-    with open(DEMO_CACHE, encoding="utf-8") as f:
-        all_items = json.load(f)
-    items = [x for x in all_items if x.get("ticker") == ticker]
+    # Streams the flat cache in its own order (dedupe keeps the first copy it
+    # sees, so day-partition order would change which items survive)
+    items = iter_evidence(ticker, source=DEMO_CACHE)
     kept, dropped = dedupe_items(items)
-    series = build_daily_series(kept)
+    series = build_daily_series(kept, cache)
     return {
         "ticker":       ticker,
         "mode":         "OFFLINE_DEMO",
@@ -217,7 +409,10 @@ def main():
                         help="Path to manual-collection JSON (required for --mode live)")
     parser.add_argument("--out",    default=None,
                         help="Output path (default: docs/data/retail_live_cache.json for live)")
+    parser.add_argument("--no-score-cache", action="store_true",
+                        help="Re-score every post instead of using docs/data/score_cache.sqlite")
     args = parser.parse_args()
+    cache = None if args.no_score_cache else open_score_cache()
 
     ticker = args.ticker.upper()
     if ticker not in FOCUS_TICKERS:
@@ -225,9 +420,11 @@ def main():
 
     if args.mode == "offline":
         print(f"[INFO] Offline mode — summarising DEMO cache for {ticker}")
-        summary = offline_summary(ticker)
+        summary = offline_summary(ticker, cache)
         print(json.dumps(summary, indent=2))
         print(f"\n[OK] daily_series has {len(summary.get('daily_series', {}))} days.")
+        if cache is not None:
+            print(f"[INFO] {cache.summary()}")
         return
 
     # LIVE mode
@@ -236,11 +433,13 @@ def main():
         sys.exit(1)
 
     print(f"[INFO] Live mode — ingesting {args.seed} for {ticker}")
-    items = ingest_seed(args.seed, ticker)
+    items = ingest_seed(args.seed, ticker, cache)
     kept, dropped = dedupe_items(items)
     print(f"[INFO] {len(items)} items ingested; {dropped} deduped; {len(kept)} kept.")
 
-    series = build_daily_series(kept)
+    series = build_daily_series(kept, cache)
+    if cache is not None:
+        print(f"[INFO] {cache.summary()}")
 
     output = {
         "generated_at": datetime.now(timezone.utc).isoformat(),
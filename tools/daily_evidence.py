@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+daily_evidence.py  —  Short-Alpha Pod | Daily Evidence Aggregation
+===================================================================
+Produces the per-ticker daily evidence tables stage4_validation.py merges
+onto the stage1 features, for every ticker at once:
+
+  news_daily_<TICKER>.npz     date, news_count, news_volume, news_sentiment_index
+  retail_daily_<TICKER>.npz   date, retail_count, retail_chatter_volume,
+                              retail_hype_index, retail_black_swan
+
+The news and retail caches the UI would load (LIVE over DEMO) are streamed
+once each and grouped by (ticker, UTC day) with tools/indices.py, so the
+columns are exactly DataHub.computeRealIndices' series:
+
+  news_volume             news count / max daily news count of the ticker
+  news_sentiment_index    mean news sentiment (0 without news)
+  retail_chatter_volume   engagement / max daily engagement of the ticker
+  retail_hype_index       min(1, mean |retail sentiment|)
+  retail_black_swan       1 on a swan day: a SWAN_TAGS tag on any news or
+                          retail item, |news shock| > 5 or |retail sentiment| > 0.9
+
+Rows are the ticker's evidence days (any news or retail item); stage4 fills
+the other trading days with 0.
+
+Tables are written through tools/artifact_store.py (typed .npz):
+  date     int32    proleptic-Gregorian day ordinal
+  *_count  int32
+  retail_black_swan int8
+  others   float64
+
+load_daily() reads a table back as a DataFrame with datetime64 dates,
+falling back to a hand-made <table>_<TICKER>.csv when no .npz exists.
+
+USAGE:
+  python tools/daily_evidence.py                     # every ticker in the caches -> ./artifacts
+  python tools/daily_evidence.py --tickers TSLA --csv
+"""
+
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from artifact_store import WRITE_FORMATS, find_table, has_table, read_table, write_table
+from evidence_store import iter_evidence, resolve_ui_cache
+from indices import compute_indices, daily_aggregates, evidence_calendar, evidence_frames
+
+ARTIFACTS_DIR = os.path.join(".", "artifacts")
+
+# table -> {column: (column in compute_indices() output, dtype)}
+TABLES = {
+    "news_daily": {
+        "news_count":            ("nc", np.int32),
+        "news_volume":           ("news_volume", np.float64),
+        "news_sentiment_index":  ("news_sentiment_index", np.float64),
+    },
+    "retail_daily": {
+        "retail_count":          ("rn", np.int32),
+        "retail_chatter_volume": ("retail_chatter_volume", np.float64),
+        "retail_hype_index":     ("retail_hype_index", np.float64),
+        "retail_black_swan":     ("swan", np.int8),
+    },
+}
+
+
+# ── Aggregate ─────────────────────────────────────────────────────────────────
+def aggregate(news_items=(), retail_items=(), tickers=None) -> pd.DataFrame:
+    """One row per (ticker, evidence day) with every column of TABLES, all tickers in one pass."""
+    agg = daily_aggregates(*evidence_frames(news_items, retail_items, tickers))
+    return compute_indices(agg, evidence_calendar(agg))
+
+
+def table_frame(series: pd.DataFrame, table: str) -> pd.DataFrame:
+    """Typed columns of one ticker's `table` from aggregate() rows."""
+    frame = pd.DataFrame({"date": pd.to_datetime(series["d"]).to_numpy()})
+    for col, (src, dtype) in TABLES[table].items():
+        frame[col] = series[src].to_numpy().astype(dtype)
+    return frame
+
+
+# ── Read / write ──────────────────────────────────────────────────────────────
+def write_tables(series: pd.DataFrame, out_dir: str = ARTIFACTS_DIR, csv: bool = False) -> dict:
+    """Write every table for every ticker in `series`; returns {ticker: rows}."""
+    formats = WRITE_FORMATS + (("csv",) if csv else ())
+    written = {}
+    for ticker, g in series.groupby("ticker", sort=True):
+        for table in TABLES:
+            write_table(table_frame(g, table), table, ticker, out_dir, formats)
+        written[ticker] = len(g)
+    return written
+
+
+def daily_path(table: str, ticker: str, out_dir: str = ARTIFACTS_DIR) -> str:
+    """The file load_daily() reads (.npz, else a hand-made .csv), or None."""
+    return find_table(table, ticker, out_dir)
+
+
+def has_daily(table: str, ticker: str, out_dir: str = ARTIFACTS_DIR) -> bool:
+    return has_table(table, ticker, out_dir)
+
+
+def load_daily(table: str, ticker: str, out_dir: str = ARTIFACTS_DIR, columns=None) -> pd.DataFrame:
+    """
+    One ticker's `table` ("news_daily" / "retail_daily") with 'date' as
+    datetime64; `columns` limits what is read besides the date.
+    """
+    return read_table(table, ticker, out_dir, None if columns is None else ["date", *columns])
+
+
+# ── Build ─────────────────────────────────────────────────────────────────────
+def build_daily(tickers=None, out_dir: str = ARTIFACTS_DIR, csv: bool = False) -> dict:
+    news_mode, news_path = resolve_ui_cache("news")
+    ret_mode, ret_path = resolve_ui_cache("retail")
+    print(f"[INFO] News: {news_mode or 'none'} | Retail: {ret_mode or 'none'}")
+
+    news = iter_evidence(source=news_path) if news_path else ()
+    retail = iter_evidence(source=ret_path) if ret_path else ()
+    return write_tables(aggregate(news, retail, tickers), out_dir, csv)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate news/retail evidence into stage4's daily tables")
+    parser.add_argument("--tickers", nargs="+", default=None, help="Default: every ticker in the caches")
+    parser.add_argument("--out",     default=ARTIFACTS_DIR)
+    parser.add_argument("--csv",     action="store_true", help="Also write a .csv copy of every table")
+    args = parser.parse_args()
+
+    tickers = [t.upper() for t in args.tickers] if args.tickers else None
+    written = build_daily(tickers, args.out, args.csv)
+    if not written:
+        print("[WARN] No evidence items found")
+        return
+    print(f"[OK] Daily evidence for {len(written)} tickers ({sum(written.values())} ticker-days) written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
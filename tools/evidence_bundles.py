@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+evidence_bundles.py  —  Short-Alpha Pod | Per-Peak Evidence Bundles
+====================================================================
+Precomputes what DataHub.getWindowEvidence (docs/index.html) shows for each
+ticker × peak window, so the UI fetches one small JSON per window instead of
+filtering both full caches and running the O(n²) dedupe in the browser.
+
+Faithful port of the UI pipeline:
+  normalizeText / getJaccard        -> normalize_text / jaccard_tokens
+  dedupeEvidence (+ scoreItem,       -> dedupe_evidence
+    _sig3 imul-31 hash, URL rule,       (same first-match order, same
+    excerpt ≥ 0.85 / title ≥ 0.92)       higher-score primary swap)
+  sampleDiverse / enforceDiversity  -> sample_diverse / enforce_diversity
+  getWindowEvidence (±3 days, stats)-> window_evidence
+Normalized token sets are computed once per item, not once per comparison.
+
+Peaks come from docs/data/peaks.json (tools/peak_engine.py). Like the UI,
+the *_live_cache.json files are used when present, the DEMO caches otherwise;
+the manifest records which, and the UI only uses a bundle built from the same
+caches it loaded.
+
+Layout:
+  docs/data/evidence_bundles/
+    manifest.json               params, sources, { ticker: { date: file } }
+    <TICKER>/<YYYY-MM-DD>.json  { peak, news[], retail[], stats }
+
+USAGE:
+  python tools/evidence_bundles.py
+  python tools/evidence_bundles.py --tickers TSLA SQ --window-days 3
+"""
+
+import os
+import re
+import json
+import math
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from evidence_store import iter_evidence, resolve_ui_cache
+from peak_engine import OUTPUT_PATH as PEAKS_PATH, build_catalog
+
+ROOT       = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR   = os.path.join(ROOT, "docs", "data")
+BUNDLE_DIR = os.path.join(DATA_DIR, "evidence_bundles")
+
+FOCUS_TICKERS     = ["AFRM", "SQ", "PYPL", "SHOP", "TSLA"]
+WINDOW_DAYS       = 3
+SAMPLE_TARGET     = 10
+MAX_PER_PROVIDER  = 2
+PREMIUM_PROVIDERS = {"Bloomberg", "Reuters", "WSJ", "Financial Times"}
+SCHEMA_VERSION    = "1.0"
+
+
+# ── JS-compatible text helpers ────────────────────────────────────────────────
+# ECMAScript \s, so normalize_text() keeps exactly the characters the UI keeps
+_JS_WS     = "\t\n\v\f\r \u00a0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000\ufeff"
+_NON_WORD  = re.compile(f"[^a-z0-9{_JS_WS}]")
+_WS_RUN    = re.compile(f"[{_JS_WS}]+")
+_STOPWORDS = re.compile(r"\b(the|a|an|in|on|at|of|for|to|is|am|are|was|were|be|been|being)\b", re.ASCII)
+_TICKER_RES = [re.compile(r"\$?" + t) for t in FOCUS_TICKERS]
+
+
+def normalize_text(s) -> str:
+    """DataHub.normalizeText."""
+    if not s:
+        return ""
+    s = s.lower()
+    for reg in _TICKER_RES:
+        s = reg.sub("", s)
+    s = _NON_WORD.sub(" ", s)
+    s = _WS_RUN.sub(" ", s)
+    s = _STOPWORDS.sub("", s)
+    return s.strip()
+
+
+def jaccard_tokens(norm: str) -> frozenset:
+    """Token set getJaccard() builds from a normalized string (words longer than 2 chars)."""
+    return frozenset(w for w in norm.split(" ") if len(w) > 2)
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+def _utf16_units(s: str):
+    data = s.encode("utf-16-le", "surrogatepass")
+    return (data[i] | (data[i + 1] << 8) for i in range(0, len(data), 2))
+
+
+def js_len(s: str) -> int:
+    """String.prototype.length (UTF-16 code units)."""
+    return len(s.encode("utf-16-le", "surrogatepass")) // 2
+
+
+def js_hash(s: str) -> str:
+    """The UI's `h = (Math.imul(31, h) + charCode) | 0` hash, rendered by toString(16)."""
+    h = 0
+    for cu in _utf16_units(s):
+        h = (31 * h + cu) & 0xFFFFFFFF
+    if h >= 0x80000000:
+        return "-" + format(0x100000000 - h, "x")
+    return format(h, "x")
+
+
+def score_item(item: dict) -> float:
+    """dedupeEvidence's scoreItem."""
+    score = 0
+    url = item.get("url")
+    if url and "placeholder" not in url:
+        score += 10
+    if item.get("provider") in PREMIUM_PROVIDERS:
+        score += 5
+    if item.get("excerpt"):
+        score += min(js_len(item["excerpt"]) / 50, 5)
+    eng = (item.get("metrics") or {}).get("engagement")
+    if eng:
+        score += math.log10(eng + 1)
+    return score
+
+
+# ── dedupeEvidence / sampleDiverse / enforceDiversity ─────────────────────────
+def dedupe_evidence(items: list) -> tuple:
+    """
+    Returns (unique, dropped). `unique` holds one record per surviving item:
+      {"item", "sig3", "norm_url", "score", "t_tok", "e_tok", "duplicates"}
+    in the insertion order of the UI's uniqueMap.
+    """
+    unique = {}   # item id -> record; dict order == JS Map order
+    for item in items:
+        norm_t = normalize_text(item.get("title"))
+        norm_e = normalize_text(item.get("excerpt") or "")
+        url = (item.get("url") or "").split("?")[0]
+        rec = {
+            "item":       item,
+            "sig3":       js_hash(norm_t + "|" + norm_e[:120]),
+            "norm_url":   url[:-1] if url.endswith("/") else url,
+            "score":      score_item(item),
+            "t_tok":      jaccard_tokens(norm_t),
+            "e_tok":      jaccard_tokens(norm_e),
+            "duplicates": [],
+        }
+
+        match_found = False
+        for key, existing in unique.items():
+            is_dup = (rec["sig3"] == existing["sig3"]
+                      or (rec["norm_url"] and len(rec["norm_url"]) > 10
+                          and rec["norm_url"] == existing["norm_url"])
+                      or jaccard(rec["e_tok"], existing["e_tok"]) >= 0.85
+                      or jaccard(rec["t_tok"], existing["t_tok"]) >= 0.92)
+            if is_dup:
+                match_found = True
+                if rec["score"] > existing["score"]:
+                    # Swap primary: the new item moves to the end of the map
+                    rec["duplicates"] = [existing] + existing["duplicates"]
+                    existing["duplicates"] = []
+                    del unique[key]
+                    unique[item.get("id")] = rec
+                else:
+                    existing["duplicates"].append(rec)
+                break
+
+        if not match_found:
+            unique[item.get("id")] = rec
+
+    recs = list(unique.values())
+    return recs, sum(len(r["duplicates"]) for r in recs)
+
+
+def sample_diverse(recs: list, target: int = SAMPLE_TARGET, max_per_provider: int = MAX_PER_PROVIDER) -> list:
+    """DataHub.sampleDiverse: provider round-robin by score, capped per provider."""
+    if len(recs) <= target and len(recs) >= 5:
+        return recs
+
+    groups = {}
+    for r in recs:
+        groups.setdefault(r["item"].get("provider") or "unknown", []).append(r)
+    for g in groups.values():
+        g.sort(key=lambda r: -(r["score"] or 0))
+
+    sampled, used, rnd = [], {}, 0
+    while len(sampled) < target:
+        added = 0
+        for p, g in groups.items():
+            if len(sampled) >= target:
+                break
+            if len(g) > rnd:
+                if len(recs) > target * 1.5 and used.get(p, 0) >= max_per_provider:
+                    continue
+                sampled.append(g[rnd])
+                used[p] = used.get(p, 0) + 1
+                added += 1
+        if added == 0:
+            break
+        rnd += 1
+    return sampled
+
+
+def enforce_diversity(recs: list) -> dict:
+    items = [r["item"] for r in recs]
+    providers = {it.get("provider") for it in items}
+    dates = {None if it.get("published_at_utc") is None else it["published_at_utc"].split("T")[0]
+             for it in items}
+    tags = {t for it in items for t in (it.get("tags") or [])}
+    return {
+        "uniqueSources": len(providers),
+        "uniqueDates":   len(dates),
+        "uniqueTags":    len(tags),
+        "passedAssay":   len(providers) >= 4 and len(dates) >= 3 and len(items) >= 5,
+    }
+
+
+# ── getWindowEvidence ─────────────────────────────────────────────────────────
+def _parse_ts(ts):
+    try:
+        dt = datetime.fromisoformat(ts)
+    except (TypeError, ValueError):
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def in_window(items: list, center: str, window_days: int = WINDOW_DAYS) -> list:
+    """Items published within ±window_days of the UTC midnight of `center` (inclusive)."""
+    d = datetime.fromisoformat(center).replace(tzinfo=timezone.utc)
+    lo, hi = d - timedelta(days=window_days), d + timedelta(days=window_days)
+    out = []
+    for it in items:
+        t = _parse_ts(it.get("published_at_utc") or it.get("d"))
+        if t is not None and lo <= t <= hi:
+            out.append(it)
+    return out
+
+
+def _bundle_item(rec: dict) -> dict:
+    """Cache item plus the dedupe fields the evidence cards read."""
+    out = dict(rec["item"])
+    out["_score"] = rec["score"]
+    out["_sig3"] = rec["sig3"]
+    out["duplicates"] = [{"id": d["item"].get("id"), "provider": d["item"].get("provider")}
+                         for d in rec["duplicates"]]
+    return out
+
+
+def window_evidence(news_pool: list, retail_pool: list, center: str, window_days: int = WINDOW_DAYS) -> dict:
+    raw_news = in_window(news_pool, center, window_days)
+    raw_retail = in_window(retail_pool, center, window_days)
+
+    news_u, news_dropped = dedupe_evidence(raw_news)
+    ret_u, ret_dropped = dedupe_evidence(raw_retail)
+
+    sampled_news = sample_diverse(news_u)
+    sampled_ret = sample_diverse(ret_u)
+    news_div = enforce_diversity(news_u)
+    ret_div = enforce_diversity(ret_u)
+
+    # sorted() is stable, like Array.prototype.sort
+    return {
+        "news":   [_bundle_item(r) for r in sorted(sampled_news, key=lambda r: -(r["score"] or 0))],
+        "retail": [_bundle_item(r) for r in sorted(sampled_ret, key=lambda r: -(r["score"] or 0))],
+        "stats": {
+            "newsLoaded":    len(raw_news),
+            "newsUnique":    len(news_u),
+            "newsDropped":   news_dropped,
+            "newsSources":   news_div["uniqueSources"],
+            "newsDates":     news_div["uniqueDates"],
+            "newsPassedDiv": news_div["passedAssay"] and len(news_u) >= 10,
+            "newsTopSig":    news_u[0]["sig3"][:8] if news_u else "N/A",
+
+            "retLoaded":     len(raw_retail),
+            "retUnique":     len(ret_u),
+            "retDropped":    ret_dropped,
+            "retSources":    ret_div["uniqueSources"],
+            "retDates":      ret_div["uniqueDates"],
+            "retPassedDiv":  ret_div["passedAssay"] and len(ret_u) >= 10,
+            "retTopSig":     ret_u[0]["sig3"][:8] if ret_u else "N/A",
+        },
+    }
+
+
+# ── Build ─────────────────────────────────────────────────────────────────────
+def load_pools(path: str, tickers: list) -> dict:
+    """Per-ticker items in cache order (dedupe is order-dependent), streamed once."""
+    pools = {t: [] for t in tickers}
+    if path:
+        for item in iter_evidence(source=path):
+            if item.get("ticker") in pools:
+                pools[item["ticker"]].append(item)
+    return pools
+
+
+def load_peaks(tickers: list) -> dict:
+    if os.path.exists(PEAKS_PATH):
+        with open(PEAKS_PATH, encoding="utf-8") as f:
+            catalog = json.load(f)
+    else:
+        catalog = build_catalog()
+    return {t: catalog["tickers"].get(t, []) for t in tickers}
+
+
+def build_bundles(tickers=None, window_days: int = WINDOW_DAYS, out_dir: str = BUNDLE_DIR) -> dict:
+    tickers = tickers or FOCUS_TICKERS
+    news_mode, news_path = resolve_ui_cache("news")
+    ret_mode, ret_path = resolve_ui_cache("retail")
+    print(f"[INFO] News: {news_mode or 'none'} | Retail: {ret_mode or 'none'}")
+    news = load_pools(news_path, tickers)
+    retail = load_pools(ret_path, tickers)
+    peaks = load_peaks(tickers)
+
+    index = {}
+    for t in tickers:
+        os.makedirs(os.path.join(out_dir, t), exist_ok=True)
+        for pk in peaks[t]:
+            win = window_evidence(news[t], retail[t], pk["date"], window_days)
+            bundle = {
+                "schema_version": SCHEMA_VERSION,
+                "ticker":         t,
+                "peak":           {"rank": pk["rank"], "date": pk["date"]},
+                "window_days":    window_days,
+                **win,
+            }
+            rel = f"{t}/{pk['date']}.json"
+            with open(os.path.join(out_dir, rel), "w", encoding="utf-8") as f:
+                json.dump(bundle, f, ensure_ascii=False, separators=(",", ":"))
+            index.setdefault(t, {})[pk["date"]] = rel
+            print(f"[OK] {t} #{pk['rank']} {pk['date']}: "
+                  f"{win['stats']['newsUnique']} news / {win['stats']['retUnique']} retail unique")
+
+    manifest = {
+        "schema_version": SCHEMA_VERSION,
+        "generated_at":   datetime.now(timezone.utc).isoformat(),
+        "params":         {"window_days": window_days, "sample_target": SAMPLE_TARGET,
+                           "max_per_provider": MAX_PER_PROVIDER},
+        "source":         {"news": news_mode, "retail": ret_mode},
+        "bundles":        index,
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute per-peak evidence bundles for the UI")
+    parser.add_argument("--tickers",     nargs="+", default=FOCUS_TICKERS)
+    parser.add_argument("--window-days", type=int, default=WINDOW_DAYS)
+    parser.add_argument("--out",         default=BUNDLE_DIR)
+    args = parser.parse_args()
+
+    manifest = build_bundles([t.upper() for t in args.tickers], args.window_days, args.out)
+    n = sum(len(v) for v in manifest["bundles"].values())
+    print(f"[OK] {n} bundles written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+"""
+evidence_store.py  —  Short-Alpha Pod | Sharded Evidence Store
+===============================================================
+Partitions the flat evidence caches (news_demo_cache.json,
+retail_demo_cache.json, or their *_live_* counterparts) by ticker and UTC
+day, so a reader that wants one ticker's ±5-day window opens a handful of
+small files instead of json.load-ing the whole multi-MB array.
+
+Layout:
+  docs/data/evidence/<kind>/<source>/
+    manifest.json              source fingerprint + per-ticker summary
+                               { ticker: {items, start, end, days} }
+    <TICKER>/index.json        { "days": { "YYYY-MM-DD": item_count } }
+    <TICKER>/<YYYY-MM-DD>.jsonl  one compact JSON item per line
+    <TICKER>/_undated.jsonl      items without a usable published_at_utc
+
+<kind> is "news" or "retail". <source> is "demo" or "live" for the UI's
+caches (UI_CACHES), or "src-<sha1(path)[:10]>" for any other cache, so DEMO
+and LIVE partitions live side by side and switching between them rebuilds
+nothing. A partition set is refreshed automatically when its source cache's
+size or mtime changes (see ensure_evidence_store()), and is only ever served
+for the cache its manifest names. The manifest records the byte offset where
+the last partitioned item ends; when a cache has only been appended to (as
+append_json_array() and JSONL writers do), just the new tail is read and
+appended to the partitions. Any other change rebuilds the set.
+
+Everything is streamed: source caches may be a JSON array (the current
+*_cache.json format) or JSONL, are decoded item by item, and partitions are
+appended to through a bounded pool of open files, so building the store and
+iterating it with iter_evidence() both run in constant memory.
+
+USAGE:
+  # Build / refresh both stores from the DEMO caches
+  python tools/evidence_store.py
+
+  # From code
+  for item in iter_evidence("TSLA", start="2021-01-03", end="2021-01-13", source="retail"):
+      ...
+  items = load_evidence("retail", "TSLA", start="2021-01-03", end="2021-01-13")
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import argparse
+from collections import OrderedDict, defaultdict
+
+ROOT     = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT, "docs", "data")
+STORE_DIR = os.path.join(DATA_DIR, "evidence")
+
+SOURCES = {
+    "news":   os.path.join(DATA_DIR, "news_demo_cache.json"),
+    "retail": os.path.join(DATA_DIR, "retail_demo_cache.json"),
+}
+
+# Caches the UI loads, in DataHub.init's preference order (LIVE over DEMO)
+UI_CACHES = {
+    "news":   {"live": os.path.join(DATA_DIR, "news_live_cache.json"),   "demo": SOURCES["news"]},
+    "retail": {"live": os.path.join(DATA_DIR, "retail_live_cache.json"), "demo": SOURCES["retail"]},
+}
+
+MANIFEST_NAME  = "manifest.json"
+INDEX_NAME     = "index.json"
+UNDATED        = "_undated"
+SCHEMA_VERSION = "1.0"
+
+READ_CHUNK     = 1 << 20   # bytes decoded per step by iter_json_array()
+MAX_OPEN_FILES = 64        # partition files kept open while building
+PREFIX_WINDOW  = 4096      # bytes at each end of the partitioned prefix hashed by _prefix_sha1()
+
+
+def day_key(item) -> str:
+    """UTC day of an item ("YYYY-MM-DD"), or None when published_at_utc is unusable."""
+    ts = item.get("published_at_utc") or ""
+    return ts[:10] if len(ts) >= 10 else None
+
+
+def _prefix_sha1(path: str, offset: int) -> str:
+    """Hash of the first and last PREFIX_WINDOW bytes of path[:offset]: a cheap
+    check that an appended-to cache still starts with what was partitioned."""
+    with open(path, "rb") as f:
+        head = f.read(min(offset, PREFIX_WINDOW))
+        f.seek(max(0, offset - PREFIX_WINDOW))
+        tail = f.read(offset - f.tell())
+    return hashlib.sha1(head + tail).hexdigest()
+
+
+def _source_fingerprint(path: str, offset: int = None) -> dict:
+    st = os.stat(path)
+    fp = {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if offset is not None:
+        fp.update(offset=offset, prefix_sha1=_prefix_sha1(path, offset))
+    return fp
+
+
+def source_label(kind: str, cache_path: str = None) -> str:
+    """Store sub-directory of a source cache: "demo" / "live" for the UI caches, else a path hash."""
+    path = os.path.abspath(cache_path or SOURCES[kind])
+    for mode, ui_path in UI_CACHES[kind].items():
+        if path == os.path.abspath(ui_path):
+            return mode
+    return "src-" + hashlib.sha1(path.encode("utf-8")).hexdigest()[:10]
+
+
+def _kind_dir(kind: str, store_dir: str, cache_path: str = None) -> str:
+    return os.path.join(store_dir, kind, source_label(kind, cache_path))
+
+
+def _drop_legacy(kind: str, store_dir: str):
+    """Remove a partition set of the old single-source layout (<kind>/manifest.json)."""
+    root = os.path.join(store_dir, kind)
+    try:
+        with open(os.path.join(root, MANIFEST_NAME), encoding="utf-8") as f:
+            tickers = json.load(f).get("tickers", {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        return
+    for ticker in tickers:
+        shutil.rmtree(os.path.join(root, ticker), ignore_errors=True)
+    os.remove(os.path.join(root, MANIFEST_NAME))
+
+
+# ── Streaming readers for flat caches ─────────────────────────────────────────
+def iter_json_array(path: str, chunk_size: int = READ_CHUNK):
+    """Yield the elements of a top-level JSON array file one at a time."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buf, pos, eof = "", 0, False
+
+        def skip(chars):
+            # advance past `chars`, refilling the buffer as it runs dry
+            nonlocal buf, pos, eof
+            while True:
+                while pos < len(buf) and buf[pos] in chars:
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                buf, pos = f.read(chunk_size), 0
+                eof = not buf
+
+        skip(" \t\r\n")
+        if buf[pos:pos + 1] != "[":
+            raise ValueError(f"{path}: not a JSON array")
+        pos += 1
+        while True:
+            skip(" \t\r\n,")
+            if pos >= len(buf):
+                raise ValueError(f"{path}: truncated JSON array")
+            if buf[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                end = None
+            if end is None or (not eof and (end == len(buf) or buf[end] not in " \t\r\n,]")):
+                # incomplete element, or a number that may continue past the
+                # chunk boundary ("-3" of "-3e10"): pull in more text and retry
+                more = f.read(chunk_size)
+                eof = not more
+                if more or end is None:
+                    buf, pos = buf[pos:] + more, 0
+                    continue
+            yield item
+            pos = end
+
+
+def _array_close(f, path: str) -> tuple:
+    """
+    Walk back from the end of an open (binary) JSON array file over trailing
+    whitespace to the closing "]", then to the last non-blank byte before it.
+    Returns (that byte, its offset): b"[" for an empty array, else the last
+    byte of the final element.
+    """
+    pos = f.seek(0, os.SEEK_END)
+    close = None
+    while pos > 0:
+        step = min(4096, pos)
+        pos -= step
+        f.seek(pos)
+        chunk = f.read(step)
+        for i in range(len(chunk) - 1, -1, -1):
+            c = chunk[i:i + 1]
+            if c in b" \t\r\n":
+                continue
+            if close is None:
+                if c != b"]":
+                    raise ValueError(f"{path}: not a JSON array")
+                close = pos + i
+                continue
+            return c, pos + i
+    raise ValueError(f"{path}: not a JSON array")
+
+
+def append_json_array(path: str, items: list, indent: int = 2) -> int:
+    """
+    Append `items` to a top-level JSON array file in place: only the tail from
+    the closing "]" on is rewritten, so the write is O(len(items)), not O(file).
+    Creates the file when missing. Returns the number of bytes written.
+    """
+    if not items:
+        return 0
+    pad = " " * indent
+    body = ",\n".join(pad + json.dumps(it, ensure_ascii=False) for it in items)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        data = f"[\n{body}\n]".encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(data)
+        return len(data)
+
+    with open(path, "r+b") as f:
+        # the last non-blank byte before "]" tells "[]" from "[ ... }"
+        prev, last = _array_close(f, path)
+        sep = "\n" if prev == b"[" else ",\n"
+        data = f"{sep}{body}\n]".encode("utf-8")
+        f.seek(last + 1)
+        f.write(data)
+        f.truncate()
+    return len(data)
+
+
+def iter_jsonl(path: str):
+    """Yield one item per non-blank line of a JSONL file."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _is_json_array(path: str) -> bool:
+    with open(path, encoding="utf-8") as f:
+        return f.read(64).lstrip().startswith("[")
+
+
+def iter_cache(path: str):
+    """Stream a flat evidence cache, JSON array or JSONL (sniffed from the first byte)."""
+    return iter_json_array(path) if _is_json_array(path) else iter_jsonl(path)
+
+
+def cache_end_offset(path: str) -> int:
+    """Byte offset just past the last item of a flat cache (after "[" when it is empty)."""
+    if not _is_json_array(path):
+        return os.path.getsize(path)
+    with open(path, "rb") as f:
+        return _array_close(f, path)[1] + 1
+
+
+def read_cache_tail(path: str, offset: int) -> tuple:
+    """
+    Items of a flat cache that start after byte `offset` (the end of an item
+    already read, see cache_end_offset()), and the offset just past the last
+    of them. Only the tail is read, so the cost is O(new items).
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        raw = f.read()
+    if not _is_json_array(path):
+        end = raw.rfind(b"\n") + 1   # a half-written last line waits for the next call
+        items = [json.loads(line) for line in raw[:end].decode("utf-8").splitlines() if line.strip()]
+        return items, offset + end
+
+    text = raw.decode("utf-8")
+    decoder = json.JSONDecoder()
+    items, pos, end = [], 0, 0
+    while True:
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(text):
+            raise ValueError(f"{path}: truncated JSON array")
+        if text[pos] == "]":
+            break
+        item, end = decoder.raw_decode(text, pos)
+        items.append(item)
+        pos = end
+    return items, offset + len(text[:end].encode("utf-8"))
+
+
+# ── Build ─────────────────────────────────────────────────────────────────────
+def _append_line(handles: OrderedDict, root: str, ticker: str, day: str, line: str,
+                 max_open: int = MAX_OPEN_FILES):
+    """Append to a partition file, keeping at most `max_open` handles open (LRU)."""
+    key = (ticker, day)
+    f = handles.pop(key, None)
+    if f is None:
+        if len(handles) >= max_open:
+            handles.popitem(last=False)[1].close()
+        tdir = os.path.join(root, ticker)
+        os.makedirs(tdir, exist_ok=True)
+        f = open(os.path.join(tdir, f"{day}.jsonl"), "a", encoding="utf-8")
+    handles[key] = f
+    f.write(line + "\n")
+
+
+def _partition_items(items, root: str) -> dict:
+    """Append items to their <TICKER>/<day>.jsonl partitions under `root`; returns ticker -> day -> count."""
+    parts = defaultdict(lambda: defaultdict(int))   # ticker -> day -> item count
+    handles = OrderedDict()                          # (ticker, day) -> open file
+    try:
+        for item in items:
+            ticker = item.get("ticker") or "_UNKNOWN"
+            day = day_key(item) or UNDATED
+            _append_line(handles, root, ticker, day,
+                         json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+            parts[ticker][day] += 1
+    finally:
+        for f in handles.values():
+            f.close()
+    return parts
+
+
+def _write_index(root: str, ticker: str, counts: dict) -> dict:
+    """Write <TICKER>/index.json and return the ticker's manifest summary."""
+    counts = dict(sorted(counts.items()))
+    with open(os.path.join(root, ticker, INDEX_NAME), "w", encoding="utf-8") as f:
+        json.dump({"days": counts}, f, separators=(",", ":"))
+    dated = [d for d in counts if d != UNDATED]
+    return {
+        "items": sum(counts.values()),
+        "start": min(dated) if dated else None,
+        "end":   max(dated) if dated else None,
+        "days":  len(dated),
+    }
+
+
+def _write_manifest(root: str, kind: str, cache_path: str, offset: int, tickers: dict) -> dict:
+    manifest = {
+        "schema_version": SCHEMA_VERSION,
+        "kind":           kind,
+        "source":         _source_fingerprint(cache_path, offset),
+        "items":          sum(t["items"] for t in tickers.values()),
+        "tickers":        dict(sorted(tickers.items())),
+    }
+    with open(os.path.join(root, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def build_evidence_store(kind: str, cache_path: str = None, store_dir: str = STORE_DIR) -> dict:
+    """Partition one flat cache by ticker/day in a single streaming pass. Returns the manifest."""
+    cache_path = cache_path or SOURCES[kind]
+    _drop_legacy(kind, store_dir)
+    final_dir = _kind_dir(kind, store_dir, cache_path)
+    tmp_dir = final_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    parts = _partition_items(iter_cache(cache_path), tmp_dir)
+    tickers = {ticker: _write_index(tmp_dir, ticker, days) for ticker, days in parts.items()}
+    manifest = _write_manifest(tmp_dir, kind, cache_path, cache_end_offset(cache_path), tickers)
+
+    shutil.rmtree(final_dir, ignore_errors=True)
+    os.replace(tmp_dir, final_dir)
+    return manifest
+
+
+def append_evidence_store(kind: str, cache_path: str = None, store_dir: str = STORE_DIR):
+    """
+    Partition only the items appended to the source cache since the store was
+    last built or appended to. Returns the number of new items, or None when
+    the cache was not simply appended to (shrunk, rewritten, or no recorded
+    offset) and the partition set needs a full rebuild.
+    """
+    cache_path = cache_path or SOURCES[kind]
+    root = _kind_dir(kind, store_dir, cache_path)
+    try:
+        manifest = read_manifest(kind, store_dir, cache_path)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    src = manifest.get("source", {})
+    offset = src.get("offset")
+    if (manifest.get("schema_version") != SCHEMA_VERSION or src.get("path") != os.path.abspath(cache_path)
+            or offset is None or os.path.getsize(cache_path) < src.get("size", 0)
+            or _prefix_sha1(cache_path, offset) != src.get("prefix_sha1")):
+        return None
+    try:
+        items, offset = read_cache_tail(cache_path, offset)
+    except ValueError:
+        return None
+
+    # With the manifest gone, an interrupted append reads as a missing store and is rebuilt
+    os.remove(os.path.join(root, MANIFEST_NAME))
+    tickers = manifest["tickers"]
+    for ticker, days in _partition_items(items, root).items():
+        try:
+            with open(os.path.join(root, ticker, INDEX_NAME), encoding="utf-8") as f:
+                counts = json.load(f)["days"]
+        except FileNotFoundError:
+            counts = {}
+        for day, n in days.items():
+            counts[day] = counts.get(day, 0) + n
+        tickers[ticker] = _write_index(root, ticker, counts)
+    _write_manifest(root, kind, cache_path, offset, tickers)
+    return len(items)
+
+
+def read_manifest(kind: str, store_dir: str = STORE_DIR, cache_path: str = None) -> dict:
+    with open(os.path.join(_kind_dir(kind, store_dir, cache_path), MANIFEST_NAME), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def is_stale(kind: str, cache_path: str = None, store_dir: str = STORE_DIR) -> bool:
+    cache_path = cache_path or SOURCES[kind]
+    try:
+        manifest = read_manifest(kind, store_dir, cache_path)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return True
+    src = manifest.get("source", {})
+    fp  = _source_fingerprint(cache_path)
+    return (manifest.get("schema_version") != SCHEMA_VERSION
+            or src.get("path") != fp["path"]
+            or src.get("size") != fp["size"] or src.get("mtime_ns") != fp["mtime_ns"])
+
+
+def ensure_evidence_store(kind: str, cache_path: str = None, store_dir: str = STORE_DIR,
+                          rebuild: bool = False) -> bool:
+    """
+    (Re)build `kind` if missing or stale, partitioning only the new tail when
+    the cache has just been appended to. When the source cache is absent, a
+    store built from that same path is still served; otherwise returns False.
+    """
+    cache_path = cache_path or SOURCES[kind]
+    if not os.path.exists(cache_path):
+        try:
+            built_from = read_manifest(kind, store_dir, cache_path)["source"]["path"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            built_from = None
+        if built_from == os.path.abspath(cache_path):
+            return True
+        print(f"[WARN] Evidence cache not found: {cache_path}")
+        return False
+    if rebuild or is_stale(kind, cache_path, store_dir):
+        added = None if rebuild else append_evidence_store(kind, cache_path, store_dir)
+        if added is None:
+            print(f"[INFO] Partitioning {kind} evidence from {cache_path} ...")
+            build_evidence_store(kind, cache_path, store_dir)
+        else:
+            print(f"[INFO] Partitioned {added} new {kind} items from {cache_path}")
+    return True
+
+
+# ── Read ──────────────────────────────────────────────────────────────────────
+def resolve_ui_cache(kind: str) -> tuple:
+    """("live" | "demo", path) of the cache the UI would load for `kind`, or (None, None)."""
+    for mode in ("live", "demo"):
+        path = UI_CACHES[kind][mode]
+        if os.path.exists(path):
+            return mode, path
+    return None, None
+
+
+def list_tickers(kind: str, store_dir: str = STORE_DIR, cache_path: str = None) -> list:
+    return list(read_manifest(kind, store_dir, cache_path)["tickers"])
+
+
+def partition_paths(kind: str, ticker: str, start: str = None, end: str = None,
+                    store_dir: str = STORE_DIR, cache_path: str = None) -> list:
+    """
+    Partition files of one ticker overlapping [start, end] (inclusive UTC days;
+    either bound optional) in the store of `cache_path` (default: the kind's
+    DEMO cache). Undated items are only included for open-ended queries.
+    """
+    tdir = os.path.join(_kind_dir(kind, store_dir, cache_path), ticker)
+    try:
+        with open(os.path.join(tdir, INDEX_NAME), encoding="utf-8") as f:
+            days = json.load(f)["days"]
+    except FileNotFoundError:
+        return []
+    lo = start[:10] if start else None
+    hi = end[:10] if end else None
+    out = []
+    for d in days:
+        if d == UNDATED:
+            if lo is None and hi is None:
+                out.append(os.path.join(tdir, f"{d}.jsonl"))
+            continue
+        if (lo is None or d >= lo) and (hi is None or d <= hi):
+            out.append(os.path.join(tdir, f"{d}.jsonl"))
+    return out
+
+
+def iter_evidence(ticker: str = None, start: str = None, end: str = None, source: str = "news",
+                  store_dir: str = STORE_DIR, cache_path: str = None):
+    """
+    Stream evidence items one at a time.
+
+    source : "news" / "retail" to read the partitioned store (only partitions
+             overlapping ticker/[start, end] are opened; `cache_path` overrides
+             the kind's source cache), or the path of a flat JSON-array / JSONL
+             cache to scan directly with the same filters.
+    """
+    lo = start[:10] if start else None
+    hi = end[:10] if end else None
+
+    if source not in SOURCES:
+        for item in iter_cache(source):
+            if ticker and item.get("ticker") != ticker:
+                continue
+            if lo or hi:
+                d = day_key(item)
+                if d is None or (lo and d < lo) or (hi and d > hi):
+                    continue
+            yield item
+        return
+
+    if not ensure_evidence_store(source, cache_path, store_dir):
+        return
+    tickers = [ticker] if ticker else list_tickers(source, store_dir, cache_path)
+    for t in tickers:
+        for path in partition_paths(source, t, start, end, store_dir, cache_path):
+            yield from iter_jsonl(path)
+
+
+def load_evidence(kind: str, ticker: str = None, start: str = None, end: str = None,
+                  store_dir: str = STORE_DIR, cache_path: str = None) -> list:
+    """
+    Items of `kind` for one ticker (or all tickers when None) within the UTC day
+    range [start, end], as a list. Prefer iter_evidence() for large ranges.
+    """
+    return list(iter_evidence(ticker, start, end, source=kind, store_dir=store_dir, cache_path=cache_path))
+
+
+# ── Main ──────────────────────────────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Partition evidence caches by ticker/day")
+    parser.add_argument("--kind",  choices=sorted(SOURCES) + ["all"], default="all")
+    parser.add_argument("--cache", default=None, help="Source cache (default: DEMO cache for --kind)")
+    parser.add_argument("--out",   default=STORE_DIR)
+    parser.add_argument("--force", action="store_true", help="Rebuild even if fresh")
+    args = parser.parse_args()
+
+    kinds = sorted(SOURCES) if args.kind == "all" else [args.kind]
+    for kind in kinds:
+        if ensure_evidence_store(kind, args.cache, args.out, rebuild=args.force):
+            m = read_manifest(kind, args.out, args.cache)
+            print(f"[OK] {kind}: {m['items']} items, {len(m['tickers'])} tickers "
+                  f"in {_kind_dir(kind, args.out, args.cache)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+fidelity_audit.py  —  Short-Alpha Pod | Synthetic Fidelity Audit
+=================================================================
+Scores synthetic datasets against a ticker's real daily series (stage4's
+merged_daily_<TICKER> table), a whole batch of runs at a time:
+
+  lag profile    Pearson(noise(t), SI(t+k+2) - SI(t+k)) for k = 0..MAX_LAG
+                 (stage4's 48h lead at every lag, via lag_scan), on both
+                 sides; distance = RMSE between the synthetic and real
+                 profiles; also reports each profile's peak lag
+  distributions  two-sample Kolmogorov-Smirnov statistic and asymptotic
+                 p-value of the z-scored daily SI change, news sentiment
+                 and retail hype, each synthetic row against the real series
+  event shape    mean z-scored SI path over ±EVENT_WINDOW rows around the
+                 TOP_EVENTS sharpest EVENT_DROP_DAYS-day SI drops (found with
+                 peak_engine.detect_peaks, all runs at once); similarity =
+                 Pearson of the synthetic and real mean shapes
+
+Noise is stage4's news / retail terms (0.15·z|news| + 0.25·z|hype|) on both
+sides, since synthetic runs carry no volume or utilization. All inputs are
+compared in rows (days) and z-scored per run, so units and calendars do not
+matter (synthetic SI is in %, real SI a fraction; synthetic days are
+calendar days, real days trading days).
+
+A run passes a check when it is within the *_MAX / *_MIN constant below;
+fidelity_score is the percentage of checks passed.
+
+Runs are read from docs/data/synthetic/<TICKER>/<n>/synthetic.csv, or
+generated on the fly with tools/synthetic.py (--generate), in chunks spread
+over a process pool.
+
+Output: ./artifacts/fidelity_<TICKER>.csv, one row per run.
+
+USAGE:
+  python tools/fidelity_audit.py --tickers TSLA                   # every saved run
+  python tools/fidelity_audit.py --tickers TSLA SQ --generate 5000
+"""
+
+import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from artifact_store import has_table, read_table
+from lag_scan import forward_delta, lag_correlations
+from peak_engine import detect_peaks
+from synthetic import SEED, SYNTHETIC_DIR, existing_runs, generate_batch
+
+ARTIFACTS_DIR = os.path.join(".", "artifacts")
+
+MAX_LAG          = 10
+LEAD             = 2
+EVENT_DROP_DAYS  = 5
+EVENT_WINDOW     = 30
+TOP_EVENTS       = 3
+EVENT_SPACING    = 60
+CHUNK            = 250          # runs per pool task
+KS_MIN_LAMBDA    = 0.2          # below this the Kolmogorov p-value is 1
+
+LAG_RMSE_MAX     = 0.15
+KS_MAX           = 0.25
+SHAPE_CORR_MIN   = 0.5
+
+NOISE_WEIGHTS    = {"news": 0.15, "retail": 0.25}
+DIST_SERIES      = ("si_change", "news", "retail")
+
+REAL_COLUMNS = {"si": "short_interest_pct", "news": "news_sentiment_index", "retail": "retail_hype_index"}
+SYN_COLUMNS  = {"si": "Synthetic_Short_Interest_Pct", "news": "News_Sentiment_Index",
+                "retail": "Retail_Hype_Index"}
+
+
+# ── Core (arrays, last axis = days) ───────────────────────────────────────────
+def zscore_rows(values: np.ndarray) -> np.ndarray:
+    """Per-row z-score, NaN-aware; constant rows become 0."""
+    values = np.asarray(values, dtype=float)
+    with np.errstate(invalid="ignore"):
+        mean = np.nanmean(values, axis=-1, keepdims=True)
+        sd = np.nanstd(values, axis=-1, ddof=1, keepdims=True)
+    return np.where(sd > 0, (values - mean) / np.where(sd > 0, sd, 1.0), 0.0 * values)
+
+
+def noise_proxy(news: np.ndarray, retail: np.ndarray) -> np.ndarray:
+    return (NOISE_WEIGHTS["news"] * zscore_rows(np.abs(news))
+            + NOISE_WEIGHTS["retail"] * zscore_rows(np.abs(retail)))
+
+
+def lag_profile(series: dict, max_lag: int = MAX_LAG) -> np.ndarray:
+    """(..., max_lag + 1) Pearson(noise(t), Δ_LEAD SI(t + k))."""
+    corr, _ = lag_correlations(noise_proxy(series["news"], series["retail"]),
+                               forward_delta(series["si"], LEAD), max_lag)
+    return corr
+
+
+def ks_statistic(samples: np.ndarray, reference: np.ndarray) -> tuple:
+    """
+    Two-sample KS of every row of `samples` (S, n) against `reference` (m,),
+    exact on finite values; returns (D, asymptotic p-value), each (S,).
+    """
+    ref = np.sort(reference[np.isfinite(reference)])
+    x = np.sort(np.where(np.isfinite(samples), samples, np.inf), axis=-1)
+    n = np.isfinite(x).sum(axis=-1, keepdims=True)
+    m = len(ref)
+    i = np.arange(x.shape[-1])
+    valid = i < n
+    # the ECDF gap peaks just at / just before a sample point
+    d_plus = np.where(valid, (i + 1) / n - np.searchsorted(ref, x, "right") / m, -np.inf).max(axis=-1)
+    d_minus = np.where(valid, np.searchsorted(ref, x, "left") / m - i / n, -np.inf).max(axis=-1)
+    d = np.maximum(d_plus, d_minus)
+    en = np.sqrt(n[..., 0] * m / (n[..., 0] + m))
+    lam = (en + 0.12 + 0.11 / en) * d
+    k = np.arange(1, 101)[:, None]
+    p = 2 * ((-1.0) ** (k - 1) * np.exp(-2.0 * k * k * lam[None, :] ** 2)).sum(axis=0)
+    # the alternating series does not converge for small λ, where p → 1
+    p = np.where(lam < KS_MIN_LAMBDA, 1.0, p)
+    return d, np.clip(p, 0.0, 1.0)
+
+
+def event_shapes(si: np.ndarray) -> np.ndarray:
+    """(S, 2·EVENT_WINDOW + 1) mean z-scored SI around each row's TOP_EVENTS sharpest drops."""
+    si = np.atleast_2d(si)
+    S, T = si.shape
+    z = zscore_rows(si)
+    drop = -forward_delta(z, EVENT_DROP_DAYS)
+    res = detect_peaks(drop.ravel(), np.tile(np.arange(T), S), np.repeat(np.arange(S), T),
+                       top_k=TOP_EVENTS, min_distance=EVENT_SPACING, window=EVENT_WINDOW)
+    offs = np.arange(-EVENT_WINDOW, EVENT_WINDOW + 1)
+    cols = res["day"][:, None] + offs
+    ok = (cols >= 0) & (cols < T)
+    vals = np.where(ok, z[res["group"][:, None], np.clip(cols, 0, T - 1)], 0.0)
+    total = np.zeros((S, len(offs)))
+    count = np.zeros((S, len(offs)))
+    np.add.at(total, res["group"], vals)
+    np.add.at(count, res["group"], ok)
+    with np.errstate(invalid="ignore"):
+        return total / count
+
+
+def _row_corr(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    corr, _ = lag_correlations(a, b, max_lag=0)
+    return corr[..., 0]
+
+
+def audit_arrays(syn: dict, real: dict) -> pd.DataFrame:
+    """
+    Fidelity of S synthetic runs. syn: {"si", "news", "retail": (S, T)},
+    real: the same keys as 1-D arrays. One row per run.
+    """
+    S = syn["si"].shape[0]
+    out = {}
+
+    prof_s = lag_profile(syn)
+    prof_r = lag_profile({k: v[None, :] for k, v in real.items()})
+    with np.errstate(invalid="ignore"):
+        out["lag_rmse"] = np.sqrt(np.nanmean((prof_s - prof_r) ** 2, axis=-1))
+    out["lag_peak"] = np.where(np.isfinite(prof_s).any(-1), np.nanargmax(np.nan_to_num(prof_s, nan=-np.inf), -1), -1)
+    out["lag_peak_real"] = np.full(S, int(np.nanargmax(np.nan_to_num(prof_r[0], nan=-np.inf))))
+
+    def dist_series(series):
+        return {"si_change": np.diff(series["si"], axis=-1), "news": series["news"], "retail": series["retail"]}
+    ds, dr = dist_series(syn), dist_series(real)
+    for name in DIST_SERIES:
+        d, p = ks_statistic(zscore_rows(ds[name]), zscore_rows(dr[name]))
+        out[f"ks_{name}"] = d
+        out[f"ks_{name}_p"] = p
+
+    out["shape_corr"] = _row_corr(event_shapes(syn["si"]), event_shapes(real["si"]))
+
+    frame = pd.DataFrame(out)
+    frame["pass_lag_profile"] = frame["lag_rmse"] <= LAG_RMSE_MAX
+    frame["pass_distributions"] = np.logical_and.reduce([frame[f"ks_{n}"] <= KS_MAX for n in DIST_SERIES])
+    frame["pass_event_shape"] = frame["shape_corr"] >= SHAPE_CORR_MIN
+    checks = ["pass_lag_profile", "pass_distributions", "pass_event_shape"]
+    frame["fidelity_score"] = frame[checks].mean(axis=1) * 100
+    return frame
+
+
+# ── Loading ───────────────────────────────────────────────────────────────────
+def load_real(ticker: str, artifacts_dir: str = ARTIFACTS_DIR) -> dict:
+    """stage4 merged_daily series {"si", "news", "retail"}, or None when missing."""
+    if not has_table("merged_daily", ticker, artifacts_dir):
+        return None
+    frame = read_table("merged_daily", ticker, artifacts_dir, columns=list(REAL_COLUMNS.values()))
+    return {k: frame[c].to_numpy(dtype=float) for k, c in REAL_COLUMNS.items()}
+
+
+def load_runs(ticker: str, runs, synthetic_dir: str = SYNTHETIC_DIR) -> dict:
+    """Saved runs stacked as {"si", "news", "retail": (S, T)}; runs must share a length."""
+    frames = [pd.read_csv(os.path.join(synthetic_dir, ticker, str(n), "synthetic.csv"),
+                          usecols=list(SYN_COLUMNS.values())) for n in runs]
+    return {k: np.stack([f[c].to_numpy(dtype=float) for f in frames]) for k, c in SYN_COLUMNS.items()}
+
+
+def audit_chunk(ticker: str, runs: list, real: dict, generate: bool, seed: int = SEED,
+                synthetic_dir: str = SYNTHETIC_DIR) -> pd.DataFrame:
+    """One pool task: load or generate `runs` of `ticker` and audit them."""
+    if generate:
+        b = generate_batch([ticker] * len(runs), runs, seed=seed)
+        syn = {"si": b["si"], "news": b["news_sentiment"], "retail": b["retail_hype"]}
+    else:
+        syn = load_runs(ticker, runs, synthetic_dir)
+    frame = audit_arrays(syn, real)
+    frame.insert(0, "run", runs)
+    frame.insert(0, "ticker", ticker)
+    return frame
+
+
+def audit_ticker(ticker: str, runs: list, real: dict, generate: bool = False, seed: int = SEED,
+                 pool=None, synthetic_dir: str = SYNTHETIC_DIR) -> pd.DataFrame:
+    chunks = [runs[i:i + CHUNK] for i in range(0, len(runs), CHUNK)]
+    args = [(ticker, c, real, generate, seed, synthetic_dir) for c in chunks]
+    if pool is None:
+        parts = [audit_chunk(*a) for a in args]
+    else:
+        parts = list(pool.map(audit_chunk, *zip(*args)))
+    return pd.concat(parts, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit synthetic runs against the real series (stage4)")
+    parser.add_argument("--tickers",  nargs="+", required=True)
+    parser.add_argument("--generate", type=int, default=0,
+                        help="Audit this many runs generated on the fly instead of the saved ones")
+    parser.add_argument("--seed",     type=int, default=SEED)
+    parser.add_argument("--workers",  type=int, default=os.cpu_count(), help="0 = in-process")
+    parser.add_argument("--out",      default=ARTIFACTS_DIR)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    pool = ProcessPoolExecutor(args.workers) if args.workers and args.workers > 1 else None
+    try:
+        for ticker in (t.upper() for t in args.tickers):
+            real = load_real(ticker)
+            if real is None:
+                print(f"[WARN] {ticker}: no merged_daily_{ticker} table (run stage4 first)")
+                continue
+            runs = list(range(1, args.generate + 1)) if args.generate else existing_runs(ticker)
+            if not runs:
+                print(f"[WARN] {ticker}: no synthetic runs")
+                continue
+            table = audit_ticker(ticker, runs, real, bool(args.generate), args.seed, pool)
+            path = os.path.join(args.out, f"fidelity_{ticker}.csv")
+            table.round(4).to_csv(path, index=False)
+            print(f"[OK] {ticker}: {len(table)} runs, median fidelity {table['fidelity_score'].median():.0f}%, "
+                  f"{(table['fidelity_score'] == 100).mean():.1%} pass all checks -> {path}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
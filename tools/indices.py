@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+indices.py  —  Short-Alpha Pod | Daily Evidence Indices
+========================================================
+Vectorized port of DataHub.computeRealIndices (docs/index.html): for every
+ticker at once it turns the news/retail caches into the daily series the
+charts, lag validation and swan markers read:
+
+  nc / re                 raw news count / retail engagement per day
+  news_volume (nv)        nc / max(nc over evidence days, 1)
+  retail_chatter_volume   re / max(re over evidence days, 1)
+  news_sentiment_index    mean news sentiment (0 without news)
+  retail_hype_index       min(1, mean |retail sentiment|)
+  noise_index             (clamp(z(0.6·nv + 0.4·rv), -5, 5) + 5) · 10, z over the calendar
+  swan                    SWAN_TAGS tag, |news shock| > 5 or |retail sentiment| > 0.9
+
+The calendar the z-score runs over is either the ticker's CSV business days
+("csv", what the UI uses) or the days that have any evidence ("evidence",
+what tools/verify_tool_orchestration_example.py spotlights).
+
+Output (read by DataHub.computeRealIndices when it matches the loaded caches):
+  docs/data/indices/<TICKER>.json   column arrays keyed by field, one entry per CSV day
+
+USAGE:
+  python tools/indices.py
+  python tools/indices.py --tickers TSLA --calendar evidence
+"""
+
+import os
+import json
+import argparse
+from datetime import datetime, timezone
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+import pandas as pd
+
+from evidence_store import iter_evidence, resolve_ui_cache
+from si_store import CSV_PATH, ensure_store, list_tickers, load_ticker, ordinals_to_datetime64
+
+ROOT        = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR    = os.path.join(ROOT, "docs", "data")
+INDICES_DIR = os.path.join(DATA_DIR, "indices")
+
+SWAN_TAGS      = {"regulatory", "fraud", "liquidity", "lawsuit", "halt", "bankruptcy", "sec", "downgrade"}
+NEWS_WEIGHT    = 0.6
+RETAIL_WEIGHT  = 0.4
+Z_CLAMP        = 5
+SCHEMA_VERSION = "1.0"
+
+SERIES_FIELDS = ["nc", "re", "rn", "news_volume", "retail_chatter_volume", "news_sentiment_index",
+                 "retail_hype_index", "raw_combined", "z_noise", "noise_index", "swan"]
+
+
+def js_to_fixed(values, digits: int = 2) -> np.ndarray:
+    """parseFloat(x.toFixed(digits)): half-up on the exact binary value, not banker's rounding."""
+    values = np.asarray(values, dtype=float)
+    out = np.round(values, digits)
+    scaled = values * 10 ** digits
+    # only values sitting on (or within float noise of) a .5 boundary can disagree with np.round
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    q = Decimal(1).scaleb(-digits)
+    for i in np.flatnonzero(near_tie & np.isfinite(values)):
+        out[i] = float(Decimal(float(values[i])).quantize(q, rounding=ROUND_HALF_UP))
+    return out
+
+
+# ── Evidence -> per-day aggregates ────────────────────────────────────────────
+def _num(v) -> float:
+    """`x || 0` for a JSON metric."""
+    try:
+        v = float(v)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if v != v else v
+
+
+def _swan_tagged(tags) -> bool:
+    return any(str(t).lower() in SWAN_TAGS for t in (tags or []))
+
+
+def evidence_frames(news_items=(), retail_items=(), tickers=None) -> tuple:
+    """
+    One pass over news/retail items (lists or iter_evidence() streams) into
+    flat per-item frames:
+      news:   ticker, d, sentiment, swan
+      retail: ticker, d, engagement, hype, swan
+    """
+    wanted = set(tickers) if tickers else None
+    cols = {"news": ([], [], [], []), "retail": ([], [], [], [], [])}
+
+    if news_items:
+        t_, d_, s_, w_ = cols["news"]
+        for n in news_items:
+            d = (n.get("published_at_utc") or "").split("T")[0]
+            if not d or (wanted and n.get("ticker") not in wanted):
+                continue
+            m = n.get("metrics") or {}
+            t_.append(n.get("ticker")); d_.append(d); s_.append(_num(m.get("sentiment")))
+            w_.append(_swan_tagged(n.get("tags")) or abs(_num(m.get("shock"))) > 5)
+
+    if retail_items:
+        t_, d_, e_, h_, w_ = cols["retail"]
+        for r in retail_items:
+            d = (r.get("published_at_utc") or "").split("T")[0]
+            if not d or (wanted and r.get("ticker") not in wanted):
+                continue
+            m = r.get("metrics") or {}
+            hype = abs(_num(m.get("sentiment")))
+            t_.append(r.get("ticker")); d_.append(d); e_.append(_num(m.get("engagement")) or 1.0)
+            h_.append(hype); w_.append(_swan_tagged(r.get("tags")) or hype > 0.9)
+
+    news = pd.DataFrame(dict(zip(["ticker", "d", "sentiment", "swan"], cols["news"])))
+    retail = pd.DataFrame(dict(zip(["ticker", "d", "engagement", "hype", "swan"], cols["retail"])))
+    return news, retail
+
+
+def daily_aggregates(news: pd.DataFrame, retail: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per (ticker, evidence day): nc, sent_sum, re, hype_sum, rn, swan.
+    Sums accumulate in cache order with np.bincount (no pairwise/Kahan
+    summation), so they match the UI's running `+=` to the last bit.
+    """
+    keys = pd.concat([news[["ticker", "d"]], retail[["ticker", "d"]]], ignore_index=True)
+    codes, uniq = pd.MultiIndex.from_frame(keys).factorize()
+    k = len(uniq)
+    cn, cr = codes[:len(news)], codes[len(news):]
+
+    agg = pd.DataFrame({
+        "nc":       np.bincount(cn, minlength=k),
+        "sent_sum": np.bincount(cn, weights=news["sentiment"].to_numpy(float), minlength=k),
+        "re":       np.bincount(cr, weights=retail["engagement"].to_numpy(float), minlength=k),
+        "hype_sum": np.bincount(cr, weights=retail["hype"].to_numpy(float), minlength=k),
+        "rn":       np.bincount(cr, minlength=k),
+        "swan":     (np.bincount(cn, weights=news["swan"].to_numpy(float), minlength=k)
+                     + np.bincount(cr, weights=retail["swan"].to_numpy(float), minlength=k)) > 0,
+    }, index=pd.MultiIndex.from_tuples(list(uniq), names=["ticker", "d"]))
+    return agg.sort_index()
+
+
+# ── Calendars ─────────────────────────────────────────────────────────────────
+def csv_calendar(tickers=None, csv_path: str = CSV_PATH) -> pd.DataFrame:
+    """(ticker, d) for every CSV business day, ascending per ticker — the UI's `data` rows."""
+    store_dir = ensure_store(csv_path)
+    frames = []
+    for t in tickers or list_tickers(store_dir):
+        cols = load_ticker(store_dir, t, columns=[])
+        if not cols:
+            continue
+        d = pd.DatetimeIndex(ordinals_to_datetime64(cols["date"])).strftime("%Y-%m-%d")
+        frames.append(pd.DataFrame({"ticker": t, "d": d}))
+    if not frames:
+        return pd.DataFrame(columns=["ticker", "d"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def evidence_calendar(agg: pd.DataFrame) -> pd.DataFrame:
+    """(ticker, d) for every day with any news or retail item."""
+    return agg.index.to_frame(index=False)[["ticker", "d"]]
+
+
+# ── Core ──────────────────────────────────────────────────────────────────────
+def compute_indices(agg: pd.DataFrame, calendar: pd.DataFrame) -> pd.DataFrame:
+    """
+    Daily series for every (ticker, d) of `calendar`, all tickers in one pass.
+    Normalisation maxima come from all evidence days of the ticker; the z-score
+    runs over the calendar rows, as in computeRealIndices.
+    """
+    by_ticker = agg.groupby(level="ticker")
+    max_n = by_ticker["nc"].max().clip(lower=1)
+    max_r = by_ticker["re"].max().clip(lower=1)
+
+    out = calendar.reset_index(drop=True).join(agg, on=["ticker", "d"])
+    for c in ("nc", "rn"):
+        out[c] = out[c].fillna(0).astype(np.int64)
+    for c in ("sent_sum", "re", "hype_sum"):
+        out[c] = out[c].fillna(0.0)
+    out["swan"] = out["swan"].fillna(False).astype(bool).astype(np.int64)
+
+    out["max_news_count"] = out["ticker"].map(max_n).fillna(1).astype(float)
+    out["max_retail_engagement"] = out["ticker"].map(max_r).fillna(1).astype(float)
+    out["news_volume"] = out["nc"] / out["max_news_count"]
+    out["retail_chatter_volume"] = out["re"] / out["max_retail_engagement"]
+    out["news_sentiment_index"] = np.where(out["nc"] > 0, out["sent_sum"] / out["nc"].clip(lower=1), 0.0)
+    out["retail_hype_index"] = np.where(out["rn"] > 0, np.minimum(1, out["hype_sum"] / out["rn"].clip(lower=1)), 0.0)
+
+    out["raw_combined"] = NEWS_WEIGHT * out["news_volume"] + RETAIL_WEIGHT * out["retail_chatter_volume"]
+    g = out.groupby("ticker", sort=False)["raw_combined"]
+    out["noise_mean"] = g.transform("mean")
+    dev2 = (out["raw_combined"] - out["noise_mean"]) ** 2
+    std = np.sqrt(dev2.groupby(out["ticker"], sort=False).transform("mean"))
+    out["zero_variance"] = std == 0
+    out["noise_std"] = std.where(std != 0, 1.0)
+    out["z_noise"] = (out["raw_combined"] - out["noise_mean"]) / out["noise_std"]
+    out["noise_index"] = js_to_fixed((out["z_noise"].clip(-Z_CLAMP, Z_CLAMP) + Z_CLAMP) * 10, 2)
+    return out
+
+
+def ticker_series(ticker: str, news: list, retail: list, calendar: str = "csv") -> pd.DataFrame:
+    """compute_indices() for one ticker's already-loaded news/retail items."""
+    agg = daily_aggregates(*evidence_frames(news, retail, [ticker]))
+    cal = csv_calendar([ticker]) if calendar == "csv" else evidence_calendar(agg)
+    return compute_indices(agg, cal)
+
+
+# ── Build ─────────────────────────────────────────────────────────────────────
+def build_indices(tickers=None, calendar: str = "csv", out_dir: str = INDICES_DIR) -> dict:
+    news_mode, news_path = resolve_ui_cache("news")
+    ret_mode, ret_path = resolve_ui_cache("retail")
+    print(f"[INFO] News: {news_mode or 'none'} | Retail: {ret_mode or 'none'} | calendar: {calendar}")
+
+    news = iter_evidence(source=news_path) if news_path else ()
+    retail = iter_evidence(source=ret_path) if ret_path else ()
+    agg = daily_aggregates(*evidence_frames(news, retail, tickers))
+    cal = csv_calendar(tickers) if calendar == "csv" else evidence_calendar(agg)
+    if tickers:
+        cal = cal[cal["ticker"].isin(tickers)]
+    series = compute_indices(agg, cal)
+
+    os.makedirs(out_dir, exist_ok=True)
+    generated_at = datetime.now(timezone.utc).isoformat()
+    written = {}
+    for t, g in series.groupby("ticker", sort=True):
+        doc = {
+            "schema_version":        SCHEMA_VERSION,
+            "ticker":                t,
+            "generated_at":          generated_at,
+            "calendar":              calendar,
+            "source":                {"news": news_mode, "retail": ret_mode},
+            "max_news_count":        float(g["max_news_count"].iloc[0]),
+            "max_retail_engagement": float(g["max_retail_engagement"].iloc[0]),
+            "noise_mean":            float(g["noise_mean"].iloc[0]),
+            "noise_std":             float(g["noise_std"].iloc[0]),
+            "zero_variance":         bool(g["zero_variance"].iloc[0]),
+            "d":                     g["d"].tolist(),
+        }
+        for c in SERIES_FIELDS:
+            doc[c] = g[c].tolist()
+        path = os.path.join(out_dir, f"{t}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(doc, f, separators=(",", ":"))
+        written[t] = path
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute daily evidence indices (computeRealIndices)")
+    parser.add_argument("--tickers",  nargs="+", default=None, help="Default: every ticker in the CSV")
+    parser.add_argument("--calendar", choices=["csv", "evidence"], default="csv",
+                        help="Days the noise z-score runs over (UI uses csv)")
+    parser.add_argument("--out",      default=INDICES_DIR)
+    args = parser.parse_args()
+
+    tickers = [t.upper() for t in args.tickers] if args.tickers else None
+    written = build_indices(tickers, args.calendar, args.out)
+    print(f"[OK] Indices for {len(written)} tickers written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
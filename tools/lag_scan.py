@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+lag_scan.py  —  Short-Alpha Pod | Lead-Lag Scan Engine
+=======================================================
+Pearson correlation of a driver series (the stage4 Noise Index) against
+forward changes of target series (short interest, crowded score) for every
+lag 0..L and every forward horizon h at once:
+
+  Δ_h y(t)          = y(t + h) - y(t)                 (horizon h, e.g. 2 = "48h")
+  corr_{h,k}        = Pearson( x(t), Δ_h y(t + k) )   over all t where both exist
+
+lag 0 / horizon 2 is stage4's original `shift(-2)` test; larger k asks
+whether noise today leads the move that starts k days later.
+
+Missing values are handled pairwise (an (x, y) pair counts only when both
+are finite), exactly like pandas .corr(). All the sums Pearson needs
+(n, Σx, Σy, Σx², Σy², Σxy per lag) are masked cross-correlations, computed
+for all lags, horizons and tickers in one batched real FFT, so a scan costs
+O(T log T) per series instead of one pandas .corr() per lag per ticker.
+Series are centred before the transform to keep the sums well conditioned.
+
+Rolling validation (rolling_correlations / rolling_frame): for every day t,
+Pearson(x(s), y(s + lag)) over the trailing `window` days s = t-window+1..t,
+from running (cumulative) sums of the same masked moments — O(T) per
+series whatever the window length. The statistic at t uses y up to
+t + lag, i.e. it is only known `lag` days after t.
+
+USAGE:
+  profile = scan_frame(merged, "noise_index",
+                       {"delta_SI": "short_interest_pct", "delta_crowded": "crowded_score"},
+                       group_col="ticker")       # long frame: ticker, target, horizon, lag, n, corr
+  peaks   = peak_leads(profile)
+  rolling = rolling_frame(merged, "noise_index", {"si": "short_interest_pct"}, windows=(21, 63))
+"""
+
+import numpy as np
+import pandas as pd
+
+MAX_LAG     = 10
+HORIZONS    = (1, 2, 5, 10)
+MIN_PERIODS = 3
+WINDOWS     = (10, 21, 63)
+ROLL_LAGS   = (2,)
+
+
+# ── Core (arrays) ─────────────────────────────────────────────────────────────
+def forward_delta(values: np.ndarray, horizon: int) -> np.ndarray:
+    """y(t + h) - y(t) along the last axis; NaN where t + h runs past the end."""
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    if horizon < values.shape[-1]:
+        out[..., :values.shape[-1] - horizon] = values[..., horizon:] - values[..., :values.shape[-1] - horizon]
+    return out
+
+
+def _fft_len(n: int) -> int:
+    return 1 << max(0, int(n - 1).bit_length())
+
+
+def lag_correlations(x: np.ndarray, y: np.ndarray, max_lag: int = MAX_LAG,
+                     min_periods: int = MIN_PERIODS) -> tuple:
+    """
+    Pairwise-complete Pearson(x[..., t], y[..., t + k]) for k = 0..max_lag.
+
+    x, y : arrays broadcastable to (..., T); NaN/inf mark missing values.
+    Returns (corr, n), each of shape (..., max_lag + 1). corr is NaN where
+    fewer than `min_periods` pairs exist or either side has zero variance.
+    """
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    T = x.shape[-1]
+    mx, my = np.isfinite(x), np.isfinite(y)
+    # centre each row on its own mean: Pearson is shift-invariant per lag, and
+    # small sums keep the FFT round-off far below the reported precision
+    a = np.where(mx, x, 0.0)
+    b = np.where(my, y, 0.0)
+    a = np.where(mx, a - a.sum(-1, keepdims=True) / np.maximum(mx.sum(-1, keepdims=True), 1), 0.0)
+    b = np.where(my, b - b.sum(-1, keepdims=True) / np.maximum(my.sum(-1, keepdims=True), 1), 0.0)
+
+    nfft = _fft_len(T + max_lag + 1)
+    lhs = np.fft.rfft(np.stack([mx.astype(float), a, a * a]), nfft, axis=-1)
+    rhs = np.fft.rfft(np.stack([my.astype(float), b, b * b]), nfft, axis=-1)
+
+    def xc(i, j):
+        # Σ_t l[t] · r[t + k]  for k = 0..max_lag
+        return np.fft.irfft(np.conj(lhs[i]) * rhs[j], nfft, axis=-1)[..., :max_lag + 1]
+
+    n   = np.rint(xc(0, 0))
+    sx  = xc(1, 0)
+    sy  = xc(0, 1)
+    sxx = xc(2, 0)
+    syy = xc(0, 2)
+    sxy = xc(1, 1)
+
+    return _pearson_from_sums(n, sx, sy, sxx, syy, sxy, min_periods), n.astype(np.int64)
+
+
+def scan_arrays(x: np.ndarray, targets: dict, horizons=HORIZONS, max_lag: int = MAX_LAG,
+                min_periods: int = MIN_PERIODS) -> dict:
+    """
+    {target: (corr, n)} with arrays of shape (..., len(horizons), max_lag + 1)
+    for a driver `x` (..., T) and target level series (..., T).
+    """
+    out = {}
+    x = np.asarray(x, dtype=float)[..., None, :]
+    for name, y in targets.items():
+        deltas = np.stack([forward_delta(y, h) for h in horizons], axis=-2)   # (..., H, T)
+        out[name] = lag_correlations(x, deltas, max_lag, min_periods)
+    return out
+
+
+def _pearson_from_sums(n, sx, sy, sxx, syy, sxy, min_periods: int):
+    """Pearson from pair count and (centred) moment sums; NaN for short or constant samples."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov  = sxy - sx * sy / n
+        varx = sxx - sx * sx / n
+        vary = syy - sy * sy / n
+        corr = cov / np.sqrt(varx * vary)
+    # variances that are round-off residue of an exactly constant sample
+    tol = 1e-9
+    bad = (n < max(min_periods, 2)) | (varx <= tol * np.maximum(sxx, tol)) | (vary <= tol * np.maximum(syy, tol))
+    return np.where(bad, np.nan, np.clip(corr, -1.0, 1.0))
+
+
+def shift_forward(values: np.ndarray, lag: int) -> np.ndarray:
+    """y(t + lag) along the last axis; NaN past the end."""
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    if lag < values.shape[-1]:
+        out[..., :values.shape[-1] - lag] = values[..., lag:]
+    return out
+
+
+def rolling_correlations(x: np.ndarray, y: np.ndarray, window: int, lag: int = 0,
+                         min_periods: int = None) -> tuple:
+    """
+    Trailing-window Pearson(x[..., s], y[..., s + lag]) for s in (t-window, t],
+    for every t, pairwise-complete. Returns (corr, n), each shaped like x.
+    `min_periods` defaults to the full window (as pandas .rolling does).
+    """
+    min_periods = window if min_periods is None else min_periods
+    x = np.asarray(x, dtype=float)
+    y = shift_forward(y, lag)
+    m = np.isfinite(x) & np.isfinite(y)
+    a = np.where(m, x, 0.0)
+    b = np.where(m, y, 0.0)
+    cnt = np.maximum(m.sum(-1, keepdims=True), 1)
+    a = np.where(m, a - a.sum(-1, keepdims=True) / cnt, 0.0)
+    b = np.where(m, b - b.sum(-1, keepdims=True) / cnt, 0.0)
+
+    def windowed(v):
+        # running sum; window total = cs[t] - cs[t - window]
+        cs = np.cumsum(v, axis=-1)
+        out = cs.copy()
+        out[..., window:] -= cs[..., :-window]
+        return out
+
+    n = np.rint(windowed(m.astype(float)))
+    corr = _pearson_from_sums(n, windowed(a), windowed(b), windowed(a * a), windowed(b * b),
+                              windowed(a * b), min_periods)
+    return corr, n.astype(np.int64)
+
+
+# ── Frames ────────────────────────────────────────────────────────────────────
+def pad_panel(frame: pd.DataFrame, columns, group_col: str = None, order_col: str = "date") -> tuple:
+    """
+    (groups, {column: (G, T) float array}) from a long frame, one row per group,
+    left-aligned in `order_col` order and NaN-padded to the longest group.
+    """
+    if group_col is None:
+        f = frame.sort_values(order_col) if order_col in frame else frame
+        return [None], {c: f[c].to_numpy(dtype=float)[None, :] for c in columns}
+    f = frame.sort_values([group_col, order_col], kind="stable") if order_col in frame else frame
+    codes, groups = pd.factorize(f[group_col], sort=False)
+    pos = f.groupby(group_col, sort=False).cumcount().to_numpy()
+    width = int(pos.max()) + 1 if len(pos) else 0
+    arrays = {}
+    for c in columns:
+        arr = np.full((len(groups), width), np.nan)
+        arr[codes, pos] = f[c].to_numpy(dtype=float)
+        arrays[c] = arr
+    return list(groups), arrays
+
+
+def scan_frame(frame: pd.DataFrame, driver: str, targets: dict, group_col: str = None,
+               horizons=HORIZONS, max_lag: int = MAX_LAG, min_periods: int = MIN_PERIODS,
+               order_col: str = "date") -> pd.DataFrame:
+    """
+    Lag profile of `driver` against forward changes of each target column.
+
+    targets : {target name: level column}, e.g. {"delta_SI": "short_interest_pct"}
+    Returns a long frame [group_col,] target, horizon, lag, n, corr — every
+    group, target, horizon and lag from one batched FFT.
+    """
+    groups, arrays = pad_panel(frame, [driver, *targets.values()], group_col, order_col)
+    res = scan_arrays(arrays[driver], {name: arrays[col] for name, col in targets.items()},
+                      horizons, max_lag, min_periods)
+
+    G, H, L = len(groups), len(horizons), max_lag + 1
+    parts = []
+    for name, (corr, n) in res.items():
+        part = pd.DataFrame({
+            "target":  name,
+            "horizon": np.tile(np.repeat(np.asarray(horizons), L), G),
+            "lag":     np.tile(np.arange(L), G * H),
+            "n":       n.reshape(-1),
+            "corr":    corr.reshape(-1),
+        })
+        if group_col is not None:
+            part.insert(0, group_col, np.repeat(np.asarray(groups, dtype=object), H * L))
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
+
+
+def peak_leads(profile: pd.DataFrame, group_col: str = None) -> pd.DataFrame:
+    """Row of the highest correlation per [group,] target (ties: shortest horizon, then lag)."""
+    keys = ([group_col] if group_col else []) + ["target"]
+    p = profile.dropna(subset=["corr"]).sort_values(keys + ["corr", "horizon", "lag"],
+                                                    ascending=[True] * len(keys) + [False, True, True],
+                                                    kind="stable")
+    return p.groupby(keys, sort=False).head(1).reset_index(drop=True)
+
+
+def rolling_frame(frame: pd.DataFrame, driver: str, targets: dict, windows=WINDOWS, lags=ROLL_LAGS,
+                  group_col: str = None, min_periods: int = None, order_col: str = "date") -> pd.DataFrame:
+    """
+    One row per input row (in [group_col,] order_col order) with
+    rcorr_<target>_w<window>_lag<lag> and n_<target>_w<window>_lag<lag> for
+    every target level column, window and lag.
+    """
+    groups, arrays = pad_panel(frame, [driver, *targets.values()], group_col, order_col)
+    if group_col is None:
+        f = frame.sort_values(order_col) if order_col in frame else frame
+        out = f[[order_col]].reset_index(drop=True) if order_col in f else pd.DataFrame(index=range(len(f)))
+        width = len(f)
+        take = (np.zeros(width, dtype=np.int64), np.arange(width))
+    else:
+        f = frame.sort_values([group_col, order_col], kind="stable") if order_col in frame else frame
+        cols = [group_col] + ([order_col] if order_col in f else [])
+        out = f[cols].reset_index(drop=True)
+        codes = pd.Index(groups).get_indexer(f[group_col])
+        take = (codes, f.groupby(group_col, sort=False).cumcount().to_numpy())
+
+    for name, col in targets.items():
+        for w in windows:
+            for lag in lags:
+                corr, n = rolling_correlations(arrays[driver], arrays[col], w, lag, min_periods)
+                out[f"rcorr_{name}_w{w}_lag{lag}"] = corr[take]
+                out[f"n_{name}_w{w}_lag{lag}"] = n[take]
+    return out
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+lexicon.py  —  Short-Alpha Pod | Batch Lexicon Scoring
+=======================================================
+One scorer for the rule-based text signals, applied to whole lists of texts:
+
+  sentiment  newsapi_oracle's naive sentiment: (pos - neg) / (pos + neg) over
+             the lexicon terms that occur *as substrings* of the lower-cased
+             text, 0.0 when none do
+  hype       browser_scout's hype: bull / (bull + bear) over the terms that
+             occur *as whitespace tokens*, 0.5 when none do
+
+Each term counts once per text (presence, not frequency), exactly like the
+per-item scorers these replace. Identical texts in a batch are scored once;
+the distinct ones are lower-cased, joined, and scanned once by a single
+precompiled alternation over every term; matches are mapped back to their
+text with np.searchsorted and counted with np.bincount, so the cost is one
+C-level regex pass plus a few array ops instead of (#terms × #texts)
+Python-level scans.
+
+The scan does not overlap matches, so substring lexicons also credit every
+term inside a matched term, and check with `in` the terms a match could
+hide by overlapping them. Results are identical to `term in text` /
+`term in text.split()` per term.
+
+Lexicons are pluggable: build a Lexicon from two term lists, or load one
+from JSON ({"positive": [...], "negative": [...], "match": "token"}).
+
+Both scorers take an optional `cache` (tools/score_cache.py) that memoizes
+scores across batches and runs.
+
+USAGE:
+  sent = score_sentiment(titles, excerpts)             # np.ndarray[float64]
+  hype = score_hype(titles, excerpts, lexicon=my_lex, cache=open_score_cache())
+"""
+
+import re
+import json
+
+import numpy as np
+
+SENTIMENT_POSITIVE = ["surge", "rally", "beat", "record", "up", "gain", "bullish"]
+SENTIMENT_NEGATIVE = ["drop", "crash", "miss", "down", "loss", "bearish", "fail"]
+
+HYPE_BULL = {"moon", "squeeze", "yolo", "rocket", "ape", "diamond", "hold", "rip",
+             "breakout", "buy", "calls", "bullish", "long", "up"}
+HYPE_BEAR = {"puts", "short", "crash", "dump", "paper", "sell", "bearish", "down"}
+
+MATCH_MODES = ("substring", "token")
+_JOIN = "\n"   # whitespace, so it ends tokens; no term may contain it
+
+
+class Lexicon:
+    """
+    Positive / negative term sets plus how they match: "substring" (anywhere in
+    the lower-cased text) or "token" (a whole whitespace-delimited token).
+    A term listed on both sides counts on both, as the per-item scorers did.
+    """
+
+    def __init__(self, positive, negative, match: str = "substring", name: str = None):
+        if match not in MATCH_MODES:
+            raise ValueError(f"match must be one of {MATCH_MODES}, got {match!r}")
+        self.positive = sorted({t.lower() for t in positive if t})
+        self.negative = sorted({t.lower() for t in negative if t})
+        self.match = match
+        self.name = name or match
+        terms = sorted(set(self.positive) | set(self.negative), key=lambda t: (-len(t), t))
+        if any(_JOIN in t for t in terms) or (match == "token" and any(len(t.split()) != 1 for t in terms)):
+            raise ValueError("token terms must be single words; no term may contain a newline")
+        self.terms = terms
+        self._term_id = {t: i for i, t in enumerate(terms)}
+        pos_set, neg_set = set(self.positive), set(self.negative)
+        self._is_pos = np.array([t in pos_set for t in terms], dtype=bool)
+        self._is_neg = np.array([t in neg_set for t in terms], dtype=bool)
+
+        # one alternation over every term, longest first; it scans without
+        # overlap, which the bookkeeping below makes exact
+        alt = "|".join(map(re.escape, terms))
+        if not terms:
+            self._regex = None
+        elif match == "token":
+            # texts are joined and padded with whitespace, so every token has
+            # a whitespace char on both sides; the term itself is group 1
+            self._regex = re.compile(rf"\s({alt})(?=\s)")
+        else:
+            self._regex = re.compile(f"({alt})")
+        # substring mode: a match of term T also proves every term inside T,
+        # and may hide a term that starts inside T and runs past it
+        # ("record" + "drop" in "recordrop"); those are checked with `in` on
+        # the few texts that have such a match
+        self._implied = {}
+        self._hidden = {}
+        if match == "substring":
+            for t in terms:
+                inner = [self._term_id[u] for u in terms if u != t and u in t]
+                if inner:
+                    self._implied[self._term_id[t]] = inner
+                tail = [self._term_id[u] for u in terms
+                        if any(t.endswith(u[:k]) for k in range(1, min(len(t), len(u))))]
+                if tail:
+                    self._hidden[self._term_id[t]] = tail
+
+    @classmethod
+    def from_dict(cls, spec: dict, name: str = None) -> "Lexicon":
+        return cls(spec.get("positive", []), spec.get("negative", []),
+                   spec.get("match", "substring"), name or spec.get("name"))
+
+    @property
+    def whitespace_insensitive(self) -> bool:
+        """True when collapsing runs of whitespace can never change a score."""
+        return self.match == "token" or not any(len(t.split()) > 1 for t in self.terms)
+
+    def fingerprint(self) -> str:
+        """Stable description of the scoring rules (terms + match mode)."""
+        return json.dumps({"match": self.match, "positive": self.positive, "negative": self.negative},
+                          sort_keys=True, separators=(",", ":"))
+
+    def counts(self, texts) -> tuple:
+        """(pos, neg) int64 arrays: distinct positive / negative terms present per text."""
+        # identical texts (reposts, templated headlines) are scanned once
+        uniq = {}
+        inv = np.fromiter((uniq.setdefault((t or "").lower(), len(uniq)) for t in texts), dtype=np.int64)
+        pos, neg = self._count_unique(list(uniq))
+        return pos[inv], neg[inv]
+
+    def _count_unique(self, lowered: list) -> tuple:
+        n = len(lowered)
+        pos = np.zeros(n, dtype=np.int64)
+        neg = np.zeros(n, dtype=np.int64)
+        if not n or self._regex is None:
+            return pos, neg
+
+        lengths = np.fromiter((len(t) for t in lowered), dtype=np.int64, count=n)
+        starts = np.ones(n, dtype=np.int64)
+        np.cumsum(lengths[:-1] + len(_JOIN), out=starts[1:])
+        starts[1:] += 1
+        blob = _JOIN + _JOIN.join(lowered) + _JOIN
+
+        term_id = self._term_id
+        hits = [(m.start(1), term_id[m.group(1)]) for m in self._regex.finditer(blob)]
+        if not hits:
+            return pos, neg
+
+        at, ids = zip(*hits)
+        doc = np.searchsorted(starts, np.asarray(at, dtype=np.int64), side="right") - 1
+        tid = np.asarray(ids, dtype=np.int64)
+
+        if self._hidden:
+            extra = [(d, u) for d, t in set(zip(doc.tolist(), tid.tolist()))
+                     for u in self._hidden.get(t, ()) if self.terms[u] in lowered[d]]
+            if extra:
+                doc = np.concatenate([doc, np.asarray([d for d, _ in extra], dtype=np.int64)])
+                tid = np.concatenate([tid, np.asarray([u for _, u in extra], dtype=np.int64)])
+        if self._implied:
+            extra = [(d, u) for d, t in zip(doc.tolist(), tid.tolist()) for u in self._implied.get(t, ())]
+            if extra:
+                doc = np.concatenate([doc, np.asarray([d for d, _ in extra], dtype=np.int64)])
+                tid = np.concatenate([tid, np.asarray([u for _, u in extra], dtype=np.int64)])
+
+        # presence, not frequency: one count per distinct (text, term)
+        pair = np.unique(doc * len(self.terms) + tid)
+        doc, tid = pair // len(self.terms), pair % len(self.terms)
+        pos += np.bincount(doc[self._is_pos[tid]], minlength=n)
+        neg += np.bincount(doc[self._is_neg[tid]], minlength=n)
+        return pos, neg
+
+
+def load_lexicon(path: str) -> Lexicon:
+    with open(path, encoding="utf-8") as f:
+        return Lexicon.from_dict(json.load(f), name=path)
+
+
+SENTIMENT_LEXICON = Lexicon(SENTIMENT_POSITIVE, SENTIMENT_NEGATIVE, match="substring", name="sentiment")
+HYPE_LEXICON      = Lexicon(HYPE_BULL, HYPE_BEAR, match="token", name="hype")
+
+
+def _join_texts(titles, excerpts) -> list:
+    if excerpts is None:
+        return list(titles)
+    return [(a or "") + " " + (b or "") for a, b in zip(titles, excerpts)]
+
+
+def _ratio(num: np.ndarray, den: np.ndarray, empty: float, digits: int = 4) -> np.ndarray:
+    """round(num / den, digits) per element (Python rounding), `empty` where den == 0."""
+    out = np.full(len(den), empty, dtype=np.float64)
+    hit = den > 0
+    if hit.any():
+        # few distinct (num, den) pairs: round each once with round() so values
+        # are bit-identical to the per-item scorers
+        keys, inv = np.unique(np.stack([num[hit], den[hit]], axis=1), axis=0, return_inverse=True)
+        vals = np.array([round(int(a) / int(b), digits) for a, b in keys], dtype=np.float64)
+        out[hit] = vals[inv.ravel()]
+    return out
+
+
+def _cached(kind: str, texts: list, lexicon: Lexicon, compute, cache) -> np.ndarray:
+    return compute(texts) if cache is None else cache.scores(kind, lexicon, texts, compute)
+
+
+def score_sentiment(titles, excerpts=None, lexicon: Lexicon = SENTIMENT_LEXICON, cache=None) -> np.ndarray:
+    """
+    (pos - neg) / (pos + neg) per title+excerpt, rounded to 4 dp; 0.0 without matches.
+    `cache` (a score_cache.ScoreCache) serves previously scored texts.
+    """
+    def compute(texts):
+        pos, neg = lexicon.counts(texts)
+        return _ratio(pos - neg, pos + neg, 0.0)
+    return _cached("sentiment", _join_texts(titles, excerpts), lexicon, compute, cache)
+
+
+def score_hype(titles, excerpts=None, lexicon: Lexicon = HYPE_LEXICON, cache=None) -> np.ndarray:
+    """
+    bull / (bull + bear) per title+excerpt, rounded to 4 dp; 0.5 (neutral) without matches.
+    `cache` (a score_cache.ScoreCache) serves previously scored texts.
+    """
+    def compute(texts):
+        bull, bear = lexicon.counts(texts)
+        return _ratio(bull, bull + bear, 0.5)
+    return _cached("hype", _join_texts(titles, excerpts), lexicon, compute, cache)
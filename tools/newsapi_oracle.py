@@ -32,6 +32,36 @@ Schema emitted (matches news_demo_cache.json):
     "mode": "LIVE"
   }
 
+Harvesting (a few hundred tickers per run):
+  - asyncio fan-out over tickers, requests served by a pool of keep-alive
+    HTTP connections (one TLS handshake per connection, not per request)
+  - full pagination: page 1 reports totalResults, the remaining pages are
+    fetched concurrently (capped by --max-pages and the plan's result cap)
+  - token-bucket rate limit (--rate / --burst) plus a hard request budget
+    (--quota, the plan's daily allowance); cache hits cost neither
+  - retries with exponential backoff + jitter on 429/5xx/connection errors,
+    honouring Retry-After
+  - on-disk response cache keyed by (query, from, page) in
+    docs/data/newsapi_cache/, so re-runs within --cache-ttl (default 1 h)
+    do not re-spend quota; entries expire because every query's window
+    runs up to now, and a page cached earlier misses what was published since
+  - --base-url points the harvester at a local stub server for testing
+
+Incremental mode (--incremental):
+  docs/data/news_live_state.json keeps, per ticker, the newest publishedAt
+  already in news_live_cache.json (the high-water mark) plus a URL index
+  { "<TICKER>|<normalized url>": id }. A run asks NewsAPI only for articles
+  from max(watermark, now - --days), newest first (sortBy=publishedAt),
+  drops those whose URL is already indexed, and appends the rest to the
+  cache in place (only the array tail is rewritten). The watermark only
+  advances for tickers whose every page up to totalResults was fetched; a
+  run cut short by --max-pages, --quota or the plan's result cap keeps it,
+  so the next run asks for the same window again and the URL index skips
+  what is already stored. If the cache was changed by anything else since the state was
+  saved, the index is rebuilt with one streaming pass over the cache.
+  IDs are content-stable ("live-<TICKER>-<sha1(url)[:12]>"), so the same
+  article keeps its id across runs in both modes.
+
 Degrades gracefully: if NEWSAPI_KEY is missing or request fails,
 writes nothing and exits with code 1 so the UI keeps using DEMO cache.
 """
@@ -39,21 +69,58 @@ writes nothing and exits with code 1 so the UI keeps using DEMO cache.
 import os
 import sys
 import json
+import time
+import math
+import random
+import asyncio
+import hashlib
 import argparse
+import http.client
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 
-try:
-    import urllib.request
-    import urllib.parse
-except ImportError:
-    pass
+from browser_scout import normalize_url
+from evidence_store import append_json_array, iter_cache
+from lexicon import SENTIMENT_LEXICON, score_sentiment
+from score_cache import open_score_cache
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(ROOT, "docs", "data")
 OUTPUT_PATH = os.path.join(DATA_DIR, "news_live_cache.json")
+CACHE_DIR = os.path.join(DATA_DIR, "newsapi_cache")
+STATE_PATH = os.path.join(DATA_DIR, "news_live_state.json")
+STATE_SCHEMA_VERSION = "1.0"
 
 NEWSAPI_BASE = "https://newsapi.org/v2/everything"
 FOCUS_TICKERS = ["AFRM", "SQ", "PYPL", "SHOP", "TSLA"]
+USER_AGENT = "ShortAlphaPod/1.0"
+
+PAGE_SIZE       = 100    # NewsAPI maximum
+MAX_PAGES       = 5
+MAX_CONNECTIONS = 8
+RATE_PER_SEC    = 5.0
+BURST           = 5
+DAILY_QUOTA     = 100    # Developer plan; raise for paid plans
+MAX_RETRIES     = 4
+BACKOFF_BASE    = 0.5    # seconds; doubles per attempt
+BACKOFF_MAX     = 30.0
+TIMEOUT         = 15
+CACHE_TTL       = 3600   # seconds; queries have no end date, so pages go stale
+RETRY_STATUSES  = {429, 500, 502, 503, 504}
+
+
+class NewsAPIError(Exception):
+    """Non-retryable NewsAPI failure (bad key, bad request, exhausted retries)."""
+
+    def __init__(self, message: str, status: int = None, code: str = None):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+class QuotaExhausted(NewsAPIError):
+    """The run's request budget (--quota) is spent."""
 
 
 def ticker_to_query(ticker: str) -> str:
@@ -67,46 +134,348 @@ def ticker_to_query(ticker: str) -> str:
     return f"{ticker} OR \"{name_map.get(ticker, ticker)}\""
 
 
-def naive_sentiment(title: str, excerpt: str) -> float:
+def naive_sentiment(title: str, excerpt: str, lexicon=SENTIMENT_LEXICON) -> float:
     """Very naive rule-based sentiment. Replace with a real model for LIVE prod."""
-    text = (title + " " + excerpt).lower()
-    pos = sum(w in text for w in ["surge", "rally", "beat", "record", "up", "gain", "bullish"])
-    neg = sum(w in text for w in ["drop", "crash", "miss", "down", "loss", "bearish", "fail"])
-    total = pos + neg
-    if total == 0:
-        return 0.0
-    return round((pos - neg) / total, 4)
-
-
-def fetch_newsapi(ticker: str, api_key: str, days: int = 7):
-    from_date = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d")
-    params = urllib.parse.urlencode({
-        "q": ticker_to_query(ticker),
-        "from": from_date,
-        "language": "en",
-        "sortBy": "relevancy",
-        "pageSize": 50,
-        "apiKey": api_key,
-    })
-    url = f"{NEWSAPI_BASE}?{params}"
-    req = urllib.request.Request(url, headers={"User-Agent": "ShortAlphaPod/1.0"})
-    with urllib.request.urlopen(req, timeout=15) as resp:
-        data = json.loads(resp.read().decode())
-    return data.get("articles", [])
-
-
-def articles_to_schema(articles, ticker: str):
+    return float(score_sentiment([title], [excerpt], lexicon)[0])
+
+
+# ── Rate limiting ─────────────────────────────────────────────────────────────
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens/s refill up to `capacity`, one token per
+    network request. `quota` (optional) is a hard cap on tokens handed out over
+    the bucket's lifetime; past it acquire() raises QuotaExhausted.
+    """
+
+    def __init__(self, rate: float = RATE_PER_SEC, capacity: int = BURST, quota: int = None,
+                 clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = max(1, int(capacity))
+        self.quota = quota
+        self.spent = 0
+        self._clock = clock
+        self._tokens = float(self.capacity)
+        self._stamp = clock()
+        self._lock = asyncio.Lock()
+
+    @property
+    def remaining(self):
+        return None if self.quota is None else max(0, self.quota - self.spent)
+
+    async def acquire(self):
+        async with self._lock:
+            if self.quota is not None and self.spent >= self.quota:
+                raise QuotaExhausted(f"request quota of {self.quota} spent", code="quotaExhausted")
+            while True:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self.spent += 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# ── Response cache ────────────────────────────────────────────────────────────
+class ResponseCache:
+    """
+    One JSON file per response under `cache_dir`, named by the SHA-1 of the
+    request parameters (query, from, page and the other fixed params; never
+    the API key). Only successful ("status": "ok") bodies are stored.
+    `max_age` (seconds) expires entries; None keeps them forever.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_age: float = CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(params: dict) -> str:
+        blob = json.dumps({k: v for k, v in params.items() if k != "apiKey"},
+                          sort_keys=True, separators=(",", ":"))
+        return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+    def _path(self, params: dict) -> str:
+        return os.path.join(self.cache_dir, f"{self.key(params)}.json")
+
+    def get(self, params: dict):
+        path = self._path(params)
+        try:
+            if self.max_age is not None and time.time() - os.path.getmtime(path) > self.max_age:
+                self.misses += 1
+                return None
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["response"]
+
+    def put(self, params: dict, response: dict):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(params)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        entry = {
+            "params": {k: v for k, v in params.items() if k != "apiKey"},
+            "fetched_at_utc": datetime.now(timezone.utc).isoformat(),
+            "response": response,
+        }
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+
+# ── Pooled HTTP client ────────────────────────────────────────────────────────
+class ConnectionPool:
+    """
+    Up to `size` keep-alive http.client connections to one host. Blocking I/O
+    runs on a matching thread pool so the event loop only ever waits on
+    futures; a connection is checked out by exactly one request at a time and
+    dropped (not returned) after any transport error.
+    """
+
+    def __init__(self, base_url: str, size: int = MAX_CONNECTIONS, timeout: float = TIMEOUT):
+        parts = urllib.parse.urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL scheme: {base_url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or "/"
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self.opened = 0
+        self._idle = []
+        self._slots = asyncio.Semaphore(self.size)
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="newsapi")
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        self.opened += 1
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    @staticmethod
+    def _roundtrip(conn, target: str, headers: dict):
+        conn.request("GET", target, headers=headers)
+        resp = conn.getresponse()
+        body = resp.read()   # drain fully so the connection can be reused
+        return resp.status, dict(resp.getheaders()), body, resp.will_close
+
+    async def get(self, params: dict, headers: dict) -> tuple:
+        """GET base path with `params`. Returns (status, headers, body bytes)."""
+        target = f"{self.path}?{urllib.parse.urlencode(params)}"
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else self._connect()
+            try:
+                status, resp_headers, body, will_close = await loop.run_in_executor(
+                    self._executor, self._roundtrip, conn, target, headers)
+            except BaseException:
+                conn.close()
+                raise
+            if will_close:
+                conn.close()
+            else:
+                self._idle.append(conn)
+        return status, resp_headers, body
+
+    def close(self):
+        while self._idle:
+            self._idle.pop().close()
+        self._executor.shutdown(wait=False)
+
+
+def _retry_after(headers: dict) -> float:
+    for k, v in headers.items():
+        if k.lower() == "retry-after":
+            try:
+                return max(0.0, float(v))
+            except ValueError:
+                return None
+    return None
+
+
+# ── Harvester ─────────────────────────────────────────────────────────────────
+class NewsHarvester:
+    """
+    Concurrent, paginated, rate-limited, cached NewsAPI /everything client.
+
+    Use as an async context manager:
+        async with NewsHarvester(api_key) as h:
+            articles = await h.harvest(["TSLA", "SQ"], days=7)   # {ticker: [article, ...]}
+
+    `complete` maps each fetched ticker to whether every page up to
+    totalResults was fetched (False when --max-pages, the quota or the
+    plan's result cap cut it short).
+    """
+
+    def __init__(self, api_key: str, base_url: str = NEWSAPI_BASE,
+                 page_size: int = PAGE_SIZE, max_pages: int = MAX_PAGES,
+                 max_connections: int = MAX_CONNECTIONS, rate: float = RATE_PER_SEC,
+                 burst: int = BURST, quota: int = DAILY_QUOTA,
+                 cache: ResponseCache = None, max_retries: int = MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE, timeout: float = TIMEOUT,
+                 sort_by: str = "relevancy"):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.max_connections = max_connections
+        self.rate, self.burst, self.quota = rate, burst, quota
+        self.cache = cache
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.sort_by = sort_by
+        self.complete = {}
+        self.requests = 0
+        self.retries = 0
+        self.pool = None
+        self.bucket = None
+
+    async def __aenter__(self):
+        self.pool = ConnectionPool(self.base_url, self.max_connections, self.timeout)
+        self.bucket = TokenBucket(self.rate, self.burst, self.quota)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.pool.close()
+
+    def params(self, ticker: str, from_date: str, page: int) -> dict:
+        return {
+            "q": ticker_to_query(ticker),
+            "from": from_date,
+            "language": "en",
+            "sortBy": self.sort_by,
+            "pageSize": self.page_size,
+            "page": page,
+        }
+
+    async def fetch_page(self, params: dict) -> dict:
+        """One /everything page, from the cache or the network (with retries)."""
+        if self.cache is not None:
+            cached = self.cache.get(params)
+            if cached is not None:
+                return cached
+
+        headers = {"User-Agent": USER_AGENT, "X-Api-Key": self.api_key, "Accept": "application/json"}
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            self.requests += 1
+            delay = None
+            try:
+                status, resp_headers, body = await self.pool.get(params, headers)
+            except (OSError, http.client.HTTPException) as e:
+                status, resp_headers, body, error = None, {}, b"", e
+            else:
+                error = None
+                try:
+                    data = json.loads(body.decode("utf-8")) if body else {}
+                except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                    data, error = {}, e
+                if status == 200 and data.get("status") == "ok":
+                    if self.cache is not None:
+                        self.cache.put(params, data)
+                    return data
+                if status not in RETRY_STATUSES:
+                    raise NewsAPIError(data.get("message") or f"HTTP {status}",
+                                       status=status, code=data.get("code"))
+                delay = _retry_after(resp_headers)
+
+            if attempt == self.max_retries:
+                what = f"HTTP {status}" if status else f"{type(error).__name__}: {error}"
+                raise NewsAPIError(f"giving up after {attempt + 1} attempts ({what})", status=status)
+            self.retries += 1
+            if delay is None:
+                delay = min(BACKOFF_MAX, self.backoff_base * 2 ** attempt)
+                delay *= 0.5 + random.random() / 2   # jitter: spread synchronized retries
+            await asyncio.sleep(delay)
+
+    async def fetch_ticker(self, ticker: str, from_date: str) -> list:
+        """All pages for one ticker (page 1 first for totalResults, the rest concurrently)."""
+        first = await self.fetch_page(self.params(ticker, from_date, 1))
+        articles = list(first.get("articles") or [])
+        total = int(first.get("totalResults") or 0)
+        needed = math.ceil(total / self.page_size) if total else 1
+        pages = min(self.max_pages, needed)
+        if pages <= 1 or len(articles) < self.page_size:
+            self.complete[ticker] = pages == needed or len(articles) < self.page_size
+            return articles
+
+        results = await asyncio.gather(
+            *(self.fetch_page(self.params(ticker, from_date, p)) for p in range(2, pages + 1)),
+            return_exceptions=True)
+        complete = pages == needed
+        for page, res in enumerate(results, start=2):
+            if isinstance(res, BaseException):
+                if isinstance(res, QuotaExhausted) or getattr(res, "code", None) == "maximumResultsReached":
+                    # plan result cap / run budget: keep what we have, in page order
+                    complete = False
+                    break
+                raise res
+            articles.extend(res.get("articles") or [])
+        self.complete[ticker] = complete
+        return articles
+
+    async def harvest(self, tickers, days: int = 7, on_done=None, since: dict = None) -> dict:
+        """
+        {ticker: [article, ...]} for every ticker fetched without error.
+        `since` maps ticker -> ISO timestamp; such tickers are queried from
+        max(since, now - days) instead of the full lookback.
+        `on_done(ticker, articles_or_exception)` is called as each ticker finishes.
+        """
+        from_date = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d")
+        since = since or {}
+
+        async def one(t):
+            try:
+                res = await self.fetch_ticker(t, max(from_date, since.get(t) or ""))
+            except NewsAPIError as e:
+                res = e
+            if on_done is not None:
+                on_done(t, res)
+            return t, res
+
+        done = await asyncio.gather(*(one(t) for t in tickers))
+        return {t: res for t, res in done if not isinstance(res, BaseException)}
+
+
+def fetch_newsapi(ticker: str, api_key: str, days: int = 7, **kwargs):
+    """Synchronous single-ticker wrapper around NewsHarvester. Returns the article list."""
+    async def run():
+        async with NewsHarvester(api_key, **kwargs) as h:
+            from_date = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d")
+            return await h.fetch_ticker(ticker, from_date)
+    return asyncio.run(run())
+
+
+def url_key(ticker: str, url: str) -> str:
+    """URL-index key; the same article may legitimately appear under several tickers."""
+    return f"{ticker}|{normalize_url(url or '')}"
+
+
+def stable_id(ticker: str, art: dict) -> str:
+    """Content-stable item id: hash of the normalized URL, else of title + publishedAt."""
+    basis = normalize_url(art.get("url") or "") or f"{art.get('title') or ''}|{art.get('publishedAt') or ''}"
+    return f"live-{ticker}-{hashlib.sha1(basis.encode('utf-8')).hexdigest()[:12]}"
+
+
+def articles_to_schema(articles, ticker: str, lexicon=SENTIMENT_LEXICON, cache=None):
     result = []
     now = datetime.now(timezone.utc).isoformat()
-    for i, art in enumerate(articles):
-        title = art.get("title") or ""
-        excerpt = art.get("description") or ""
-        sentiment = naive_sentiment(title, excerpt)
+    titles = [art.get("title") or "" for art in articles]
+    excerpts = [art.get("description") or "" for art in articles]
+    sentiments = score_sentiment(titles, excerpts, lexicon, cache=cache).tolist()
+    for art, title, excerpt, sentiment in zip(articles, titles, excerpts, sentiments):
         engagement = art.get("source", {}).get("id", 0) or 0
         shock = round(abs(sentiment) * min(len(title) / 20, 5), 2)
 
         result.append({
-            "id": f"live-{ticker}-{i}",
+            "id": stable_id(ticker, art),
             "ticker": ticker,
             "provider": art.get("source", {}).get("name", "Unknown"),
             "title": title,
@@ -126,10 +495,99 @@ def articles_to_schema(articles, ticker: str):
     return result
 
 
+# ── Incremental state ─────────────────────────────────────────────────────────
+def _cache_fingerprint(path: str) -> dict:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def new_state() -> dict:
+    return {"schema_version": STATE_SCHEMA_VERSION, "cache": None, "watermarks": {}, "urls": {}}
+
+
+def rebuild_state(cache_path: str = OUTPUT_PATH) -> dict:
+    """Watermarks + URL index from one streaming pass over an existing cache."""
+    state = new_state()
+    if not os.path.exists(cache_path):
+        return state
+    marks, urls = state["watermarks"], state["urls"]
+    for item in iter_cache(cache_path):
+        t = item.get("ticker")
+        pub = item.get("published_at_utc") or ""
+        if pub > marks.get(t, ""):
+            marks[t] = pub
+        if item.get("url"):
+            urls.setdefault(url_key(t, item["url"]), item.get("id"))
+    state["cache"] = _cache_fingerprint(cache_path)
+    return state
+
+
+def load_state(path: str = STATE_PATH, cache_path: str = OUTPUT_PATH) -> dict:
+    """Saved state if it still describes `cache_path`, else one rebuilt from the cache."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        state = None
+    if (state is None or state.get("schema_version") != STATE_SCHEMA_VERSION
+            or state.get("cache") != _cache_fingerprint(cache_path)):
+        if os.path.exists(cache_path):
+            print(f"[INFO] Rebuilding watermarks / URL index from {cache_path} ...")
+        return rebuild_state(cache_path)
+    return state
+
+
+def save_state(state: dict, path: str = STATE_PATH):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def select_new(items: list, state: dict, advance: bool = True) -> list:
+    """
+    Items whose URL is not indexed yet (deduped within the batch too); updates
+    the URL index, and the watermarks only when `advance` (the fetch was complete).
+    """
+    urls, marks = state["urls"], state["watermarks"]
+    fresh = []
+    for item in items:
+        if item["url"] and item["url"] != "#":
+            key = url_key(item["ticker"], item["url"])
+            if key in urls:
+                continue
+            urls[key] = item["id"]
+        fresh.append(item)
+        if advance and item["published_at_utc"] > marks.get(item["ticker"], ""):
+            marks[item["ticker"]] = item["published_at_utc"]
+    return fresh
+
+
 def main():
     parser = argparse.ArgumentParser(description="NewsAPI oracle for Short-Alpha Pod")
-    parser.add_argument("--ticker", default="all", help="Ticker or 'all'")
+    parser.add_argument("--ticker", default="all", help="Ticker, comma-separated tickers, or 'all'")
+    parser.add_argument("--tickers-file", default=None, help="File with one ticker per line (overrides --ticker)")
     parser.add_argument("--days", type=int, default=7, help="Lookback days")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--max-pages", type=int, default=MAX_PAGES, help="Pages per ticker")
+    parser.add_argument("--connections", type=int, default=MAX_CONNECTIONS, help="Pooled HTTP connections")
+    parser.add_argument("--rate", type=float, default=RATE_PER_SEC, help="Requests per second")
+    parser.add_argument("--burst", type=int, default=BURST, help="Token-bucket capacity")
+    parser.add_argument("--quota", type=int, default=DAILY_QUOTA,
+                        help="Max network requests this run (cache hits are free); 0 = unlimited")
+    parser.add_argument("--retries", type=int, default=MAX_RETRIES)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--cache-ttl", type=float, default=CACHE_TTL,
+                        help="Cache entry max age in seconds; 0 = never expire")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the response cache")
+    parser.add_argument("--base-url", default=NEWSAPI_BASE, help="Endpoint (e.g. a local stub server)")
+    parser.add_argument("--no-score-cache", action="store_true",
+                        help="Re-score every article instead of using docs/data/score_cache.sqlite")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Fetch only past each ticker's watermark and append to the existing cache")
     args = parser.parse_args()
 
     api_key = os.environ.get("NEWSAPI_KEY", "")
@@ -137,18 +595,62 @@ def main():
         print("[FAIL] NEWSAPI_KEY env var not set. Aborting — UI will use DEMO cache.")
         sys.exit(1)
 
-    tickers = FOCUS_TICKERS if args.ticker == "all" else [args.ticker.upper()]
-    all_items = []
+    if args.tickers_file:
+        with open(args.tickers_file, encoding="utf-8") as f:
+            tickers = [line.strip().upper() for line in f if line.strip() and not line.startswith("#")]
+    elif args.ticker == "all":
+        tickers = FOCUS_TICKERS
+    else:
+        tickers = [t.strip().upper() for t in args.ticker.split(",") if t.strip()]
+    tickers = list(dict.fromkeys(tickers))
+
+    cache = None if args.no_cache else ResponseCache(args.cache_dir, args.cache_ttl or None)
+    state = load_state() if args.incremental else new_state()
+    since = {t: state["watermarks"][t] for t in tickers if t in state["watermarks"]}
+
+    def report(ticker, res):
+        if isinstance(res, BaseException):
+            print(f"[WARN] {ticker} fetch failed: {res}")
+        else:
+            print(f"[INFO] {ticker} → {len(res)} articles")
+
+    async def run():
+        async with NewsHarvester(api_key, base_url=args.base_url, page_size=args.page_size,
+                                 max_pages=args.max_pages, max_connections=args.connections,
+                                 rate=args.rate, burst=args.burst, quota=args.quota or None,
+                                 cache=cache, max_retries=args.retries,
+                                 sort_by="publishedAt" if args.incremental else "relevancy") as h:
+            fetched = await h.harvest(tickers, args.days, on_done=report, since=since)
+            return h, fetched
+
+    print(f"[INFO] Harvesting NewsAPI for {len(tickers)} tickers "
+          f"({args.connections} connections, {args.rate:g} req/s) ...")
+    t0 = time.perf_counter()
+    harvester, fetched = asyncio.run(run())
 
+    # output order follows the ticker list, not completion order
+    score_cache = None if args.no_score_cache else open_score_cache()
+    all_items = []
     for t in tickers:
-        print(f"[INFO] Fetching NewsAPI for {t}...")
-        try:
-            articles = fetch_newsapi(t, api_key, args.days)
-            items = articles_to_schema(articles, t)
-            all_items.extend(items)
-            print(f"       → {len(items)} articles")
-        except Exception as e:
-            print(f"[WARN] {t} fetch failed: {e}")
+        if t in fetched:
+            complete = harvester.complete.get(t, False)
+            if args.incremental and not complete:
+                print(f"[WARN] {t}: not every page was fetched; watermark kept at "
+                      f"{state['watermarks'].get(t) or 'the lookback start'}")
+            all_items.extend(select_new(articles_to_schema(fetched[t], t, cache=score_cache), state, complete))
+
+    cache_note = "" if cache is None else f", cache {cache.hits} hit / {cache.misses} miss"
+    print(f"[INFO] {harvester.requests} requests ({harvester.retries} retries{cache_note}) "
+          f"in {time.perf_counter() - t0:.1f}s")
+    if score_cache is not None:
+        print(f"[INFO] {score_cache.summary()}")
+
+    if args.incremental and fetched and os.path.exists(OUTPUT_PATH):
+        written = append_json_array(OUTPUT_PATH, all_items)
+        state["cache"] = _cache_fingerprint(OUTPUT_PATH)
+        save_state(state)
+        print(f"[OK] {len(all_items)} new articles appended to {OUTPUT_PATH} ({written} bytes)")
+        return
 
     if not all_items:
         print("[FAIL] No articles fetched. Aborting — UI will use DEMO cache.")
@@ -157,6 +659,8 @@ def main():
     os.makedirs(DATA_DIR, exist_ok=True)
     with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
         json.dump(all_items, f, indent=2)
+    state["cache"] = _cache_fingerprint(OUTPUT_PATH)
+    save_state(state)
 
     print(f"[OK] {len(all_items)} articles written to {OUTPUT_PATH}")
     print("     UI will show [LIVE] badge on next load.")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+peak_engine.py  —  Short-Alpha Pod | Shared Peak Detection
+===========================================================
+One peak definition for every consumer (stage1 discovery, the demo-cache
+generator, and the UI peak picker / run-artifact producer via peaks.json).
+
+For each ticker it returns the top-k peaks of a score series with:
+  - minimum-distance suppression: a peak closer than `min_distance` calendar
+    days to a higher (already accepted) peak is skipped — the same greedy
+    rule the UI and generate_demo_caches.py used to run per ticker;
+  - prominence: peak value minus the higher of the lowest points on either
+    side within ±`window` days (window-limited topographic prominence);
+  - event-window bounds: peak date ± `window` calendar days.
+
+All tickers are processed together: each of the k rounds is a handful of
+array operations over the whole universe, so cost is O(k·n), not a Python
+loop per ticker or per row.
+
+USAGE:
+  # Write docs/data/peaks.json (read by DataHub.getPeaks in docs/index.html)
+  python tools/peak_engine.py
+
+  # From code
+  peaks = detect_peaks_frame(features, "squeeze_score")
+"""
+
+import os
+import json
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+
+from si_store import CSV_PATH, DATA_DIR, ensure_store, load_frame, ordinal_to_iso, datetime64_to_ordinals
+
+OUTPUT_PATH = os.path.join(DATA_DIR, "peaks.json")
+
+# 14-day separation is what the demo evidence caches were generated around;
+# the ±21-day event window is the UI's lag-validation scope.
+TOP_K             = 3
+MIN_DISTANCE_DAYS = 14
+WINDOW_DAYS       = 21
+
+
+# ── Core (arrays) ─────────────────────────────────────────────────────────────
+def _window_min(values, lo, hi):
+    """min(values[lo[i]:hi[i]]) for every i, NaN-aware, in one reduceat call."""
+    v = np.where(np.isnan(values), np.inf, values)
+    v = np.append(v, np.inf)  # sentinel so hi == len(values) is a valid index
+    idx = np.empty(2 * len(lo), dtype=np.int64)
+    idx[0::2] = lo
+    idx[1::2] = hi
+    return np.minimum.reduceat(v, idx)[0::2]
+
+
+def detect_peaks(values, days, groups, top_k=TOP_K,
+                 min_distance=MIN_DISTANCE_DAYS, window=WINDOW_DAYS) -> dict:
+    """
+    values : float[]  score series (NaN rows are never peaks)
+    days   : int[]    day numbers (ordinals or days since epoch)
+    groups : any[]    ticker per row; rows need not be pre-sorted
+
+    Returns arrays, ordered by group then rank:
+      group, rank (1-based), row (index into the inputs), day, value,
+      prominence, window_lo, window_hi (days, inclusive)
+    """
+    values = np.asarray(values, dtype=float)
+    days   = np.asarray(days, dtype=np.int64)
+    uniq, codes = np.unique(np.asarray(groups), return_inverse=True)
+    n = len(values)
+
+    # Priority order: ticker, then value desc, then date asc (stable tie-break)
+    order = np.lexsort((days, -np.nan_to_num(values, nan=-np.inf), codes))
+    alive = np.isfinite(values)
+
+    picked_rows, picked_rank = [], []
+    for rank in range(1, top_k + 1):
+        cand = order[alive[order]]
+        if len(cand) == 0:
+            break
+        _, first = np.unique(codes[cand], return_index=True)
+        sel = cand[first]
+        picked_rows.append(sel)
+        picked_rank.append(np.full(len(sel), rank))
+
+        # Suppress everything within min_distance of this round's peak, per ticker
+        peak_day = np.full(len(uniq), np.nan)
+        peak_day[codes[sel]] = days[sel]
+        with np.errstate(invalid="ignore"):
+            alive &= ~(np.abs(days - peak_day[codes]) < min_distance)
+
+    if not picked_rows:
+        empty = np.array([], dtype=np.int64)
+        return {"group": np.array([], dtype=uniq.dtype), "rank": empty, "row": empty,
+                "day": empty, "value": np.array([]), "prominence": np.array([]),
+                "window_lo": empty, "window_hi": empty}
+
+    rows = np.concatenate(picked_rows)
+    ranks = np.concatenate(picked_rank)
+    out_order = np.lexsort((ranks, codes[rows]))
+    rows, ranks = rows[out_order], ranks[out_order]
+
+    # Window-limited prominence via range-min over each ticker's date-sorted rows
+    by_date = np.lexsort((days, codes))
+    span = int(days.max() - days.min()) + 2 * window + 2 if n else 1
+    key = codes[by_date].astype(np.int64) * span + (days[by_date] - days.min())
+    sorted_vals = values[by_date]
+    pk_key = codes[rows].astype(np.int64) * span + (days[rows] - days.min())
+    pos = np.searchsorted(key, pk_key)
+    left_lo = np.searchsorted(key, pk_key - window, side="left")
+    right_hi = np.searchsorted(key, pk_key + window, side="right")
+    left_min = _window_min(sorted_vals, left_lo, pos + 1)
+    right_min = _window_min(sorted_vals, pos, right_hi)
+    prominence = values[rows] - np.maximum(left_min, right_min)
+
+    return {
+        "group":      uniq[codes[rows]],
+        "rank":       ranks,
+        "row":        rows,
+        "day":        days[rows],
+        "value":      values[rows],
+        "prominence": prominence,
+        "window_lo":  days[rows] - window,
+        "window_hi":  days[rows] + window,
+    }
+
+
+# ── DataFrame front-end ───────────────────────────────────────────────────────
+def _to_day_numbers(col):
+    import pandas as pd
+    return datetime64_to_ordinals(pd.to_datetime(col).to_numpy())
+
+
+def detect_peaks_frame(df, value_col, date_col="date", group_col="ticker", top_k=TOP_K,
+                       min_distance=MIN_DISTANCE_DAYS, window=WINDOW_DAYS):
+    """
+    Peaks of `value_col` per `group_col` for a long frame. Returns a DataFrame with
+    ticker, rank, date, value, prominence, window_start, window_end and `row`
+    (positional index into `df`, for looking up other columns of the peak day).
+    """
+    import pandas as pd
+
+    days = _to_day_numbers(df[date_col])
+    res = detect_peaks(df[value_col].to_numpy(dtype=float), days, df[group_col].to_numpy(),
+                       top_k=top_k, min_distance=min_distance, window=window)
+    return pd.DataFrame({
+        group_col:      res["group"],
+        "rank":         res["rank"],
+        "row":          res["row"],
+        "date":         [ordinal_to_iso(d) for d in res["day"]],
+        "value":        res["value"],
+        "prominence":   res["prominence"],
+        "window_start": [ordinal_to_iso(d) for d in res["window_lo"]],
+        "window_end":   [ordinal_to_iso(d) for d in res["window_hi"]],
+    })
+
+
+# ── Catalog for the UI ────────────────────────────────────────────────────────
+def build_catalog(csv_path=CSV_PATH, tickers=None, top_k=TOP_K,
+                  min_distance=MIN_DISTANCE_DAYS, window=WINDOW_DAYS) -> dict:
+    store_dir = ensure_store(csv_path)
+    df = load_frame(store_dir, tickers, columns=["Squeeze Score", "Crowded Score"])
+    peaks = detect_peaks_frame(df, "Squeeze Score", date_col="Business Date", group_col="Ticker",
+                               top_k=top_k, min_distance=min_distance, window=window)
+    crowded = df["Crowded Score"].to_numpy()
+
+    catalog = {}
+    for row in peaks.itertuples(index=False):
+        catalog.setdefault(row.Ticker, []).append({
+            "rank":          int(row.rank),
+            "date":          row.date,
+            "squeeze_score": float(row.value),
+            "crowded_score": float(crowded[row.row]),
+            "prominence":    round(float(row.prominence), 4),
+            "window_start":  row.window_start,
+            "window_end":    row.window_end,
+        })
+    return {
+        "schema_version": "1.0",
+        "generated_at":   datetime.now(timezone.utc).isoformat(),
+        "source":         os.path.basename(csv_path),
+        "params":         {"value": "Squeeze Score", "top_k": top_k,
+                           "min_distance_days": min_distance, "window_days": window},
+        "tickers":        catalog,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared peak detection — writes docs/data/peaks.json")
+    parser.add_argument("--csv",          default=CSV_PATH)
+    parser.add_argument("--out",          default=OUTPUT_PATH)
+    parser.add_argument("--top-k",        type=int, default=TOP_K)
+    parser.add_argument("--min-distance", type=int, default=MIN_DISTANCE_DAYS, help="Calendar days between peaks")
+    parser.add_argument("--window",       type=int, default=WINDOW_DAYS, help="Event window half-width (days)")
+    args = parser.parse_args()
+
+    catalog = build_catalog(args.csv, top_k=args.top_k, min_distance=args.min_distance, window=args.window)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, indent=2)
+    print(f"[OK] Peaks for {len(catalog['tickers'])} tickers written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+pipeline.py  —  Short-Alpha Pod | Incremental Pipeline Runner
+==============================================================
+Runs the offline stages in dependency order and skips every unit of work
+whose inputs did not change since its last successful run:
+
+  CSV ──> si_store ──> discovery (stage1) ──┐
+                                            ├──> validation (stage4) ──> synthesis (stage5)
+  caches ──────────> daily (daily_evidence) ┘
+  CSV + caches ────> indices (tools/indices.py)
+  CSV + caches ────> snapshot (tools/run_daily_demo.py)
+
+discovery, validation and synthesis are per ticker; daily, indices and
+snapshot are one unit each. A unit's fingerprint is the SHA-1 of
+
+  - the content of its inputs: the ticker's si_store partition columns,
+    the upstream artifacts, or the caches / CSV for the global units
+    (.npz files are hashed by array content, so a rewrite with the same
+    values keeps the fingerprint and the downstream units stay skipped),
+  - its parameters,
+  - the source of the code it runs: the stage's entry module (ENTRY below)
+    and every repo module it imports, transitively (found by scanning the
+    import statements, so a new helper module is covered automatically),
+
+and the unit is skipped when that fingerprint matches the one recorded
+after its last successful run and its outputs still exist. Dirty
+discovery tickers are run in one stage1 pass; dirty validation and
+synthesis tickers are spread over a process pool.
+
+File hashes are memoised in the state by (size, mtime_ns), so unchanged
+inputs are not re-read on every run.
+
+Output:
+  ./artifacts/...                    the stages' usual artifacts
+  ./artifacts/pipeline_state.json    per-unit fingerprints of the last successful run
+
+Run from the repository root (the stages read ./data and ./artifacts).
+
+USAGE:
+  python tools/pipeline.py                                 # every ticker, every stage
+  python tools/pipeline.py --tickers TSLA SQ --stages discovery validation
+  python tools/pipeline.py --dry-run                       # list what would run
+  python tools/pipeline.py --force                         # ignore recorded fingerprints
+"""
+
+import os
+import ast
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import stage1_discovery as stage1
+import stage4_validation as stage4
+import stage5_synthesis_audit as stage5
+from artifact_store import artifact_path, find_table, has_table
+from daily_evidence import TABLES, build_daily, has_daily
+from evidence_store import resolve_ui_cache
+from indices import build_indices
+from run_daily_demo import build_snapshot
+from si_store import CSV_PATH, ensure_store, list_tickers
+
+ARTIFACTS_DIR        = os.path.join(".", "artifacts")
+STATE_PATH           = os.path.join(ARTIFACTS_DIR, "pipeline_state.json")
+STATE_SCHEMA_VERSION = "1.0"
+HASH_BLOCK           = 1 << 20
+
+STAGES = ("discovery", "daily", "validation", "synthesis", "indices", "snapshot")
+
+# Module each stage runs; it and every repo module it imports feed that stage's fingerprints
+ENTRY = {
+    "discovery":  "stage1_discovery.py",
+    "daily":      "tools/daily_evidence.py",
+    "validation": "stage4_validation.py",
+    "synthesis":  "stage5_synthesis_audit.py",
+    "indices":    "tools/indices.py",
+    "snapshot":   "tools/run_daily_demo.py",
+}
+MODULE_DIRS = ("", "tools")     # where the stages' imports resolve (tools/ is on their sys.path)
+
+
+# ── Fingerprints ──────────────────────────────────────────────────────────────
+def hash_file(path: str, memo: dict = None) -> str:
+    """SHA-1 of a file's bytes; `memo` ({abspath: {size, mtime_ns, sha1}}) skips unchanged files."""
+    st = os.stat(path)
+    key = os.path.abspath(path)
+    hit = (memo or {}).get(key)
+    if hit and hit["size"] == st.st_size and hit["mtime_ns"] == st.st_mtime_ns:
+        return hit["sha1"]
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            h.update(block)
+    if memo is not None:
+        memo[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": h.hexdigest()}
+    return h.hexdigest()
+
+
+def hash_arrays(path: str, columns=None) -> str:
+    """SHA-1 of an .npz's arrays (name, dtype, shape, values), independent of zip metadata."""
+    h = hashlib.sha1()
+    with np.load(path) as z:
+        for name in sorted(z.files if columns is None else columns):
+            a = np.ascontiguousarray(z[name])
+            h.update(f"{name}|{a.dtype.str}|{a.shape}".encode())
+            h.update(a.tobytes())
+    return h.hexdigest()
+
+
+def hash_input(path: str, memo: dict = None, columns=None) -> str:
+    return hash_arrays(path, columns) if path.endswith(".npz") else hash_file(path, memo)
+
+
+def fingerprint(*parts) -> str:
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _imported_modules(path: str) -> set:
+    """Top-level names of every module `path` imports (at any depth in the file)."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(a.name.split(".")[0] for a in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split(".")[0])
+    return names
+
+
+def code_files(stage: str) -> list:
+    """ENTRY[stage] plus the repo modules it imports, transitively; sorted repo-relative paths."""
+    todo, seen = [ENTRY[stage]], set()
+    while todo:
+        rel = todo.pop()
+        if rel in seen:
+            continue
+        seen.add(rel)
+        for name in _imported_modules(os.path.join(ROOT, rel)):
+            for d in MODULE_DIRS:
+                dep = os.path.join(d, f"{name}.py") if d else f"{name}.py"
+                if os.path.exists(os.path.join(ROOT, dep)):
+                    todo.append(dep)
+                    break
+    return sorted(seen)
+
+
+def code_hash(stage: str, memo: dict) -> str:
+    return fingerprint(*((p, hash_file(os.path.join(ROOT, p), memo)) for p in code_files(stage)))
+
+
+# ── State ─────────────────────────────────────────────────────────────────────
+def new_state():
+    return {"schema_version": STATE_SCHEMA_VERSION, "files": {}, "units": {s: {} for s in STAGES}}
+
+
+def load_state(path=STATE_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return new_state()
+    if state.get("schema_version") != STATE_SCHEMA_VERSION:
+        print(f"[WARN] State schema mismatch in {path}; starting from scratch.")
+        return new_state()
+    for s in STAGES:
+        state["units"].setdefault(s, {})
+    return state
+
+
+def save_state(state, path=STATE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+
+
+def dirty_units(state: dict, stage: str, fps: dict, outputs: dict, force: bool = False) -> list:
+    """Units of `stage` whose fingerprint changed or whose outputs are missing."""
+    done = state["units"][stage]
+    return [u for u, fp in fps.items()
+            if force or done.get(u) != fp or not all(os.path.exists(p) for p in outputs.get(u, ()))]
+
+
+def record(state: dict, stage: str, fps: dict, units):
+    state["units"][stage].update({u: fps[u] for u in units})
+
+
+# ── Per-ticker workers (pool targets) ─────────────────────────────────────────
+def _validate(ticker: str, params: dict) -> str:
+    stage4.run_validation(ticker, params["max_lag"], params["horizons"], params["windows"],
+                          params["roll_lags"], params["n_resamples"], params["seed"], params["block"])
+    return ticker
+
+
+def _synthesize(ticker: str, params: dict) -> str:
+    stage5.generate_synthetic(ticker, params["days"], params["seed"])
+    return ticker
+
+
+def run_parallel(fn, tickers: list, params: dict, pool) -> list:
+    """Run fn(ticker, params) for every ticker; returns the ones that succeeded."""
+    if pool is None or len(tickers) <= 1:
+        done = []
+        for t in tickers:
+            try:
+                done.append(fn(t, params))
+            except Exception as e:
+                print(f"[FAIL] {t}: {e}")
+        return done
+    futures = {pool.submit(fn, t, params): t for t in tickers}
+    done = []
+    for fut in as_completed(futures):
+        try:
+            done.append(fut.result())
+        except Exception as e:
+            print(f"[FAIL] {futures[fut]}: {e}")
+    return sorted(done)
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+class Pipeline:
+    def __init__(self, tickers=None, stages=STAGES, params: dict = None, workers: int = None,
+                 force: bool = False, dry_run: bool = False, state_path: str = STATE_PATH):
+        self.tickers = tickers
+        self.stages = [s for s in STAGES if s in stages]
+        self.params = params or {}
+        self.workers = workers
+        self.force = force
+        self.dry_run = dry_run
+        self.state_path = state_path
+        self.state = load_state(state_path)
+        self.memo = self.state["files"]
+        self.summary = {}
+        self._warned = set()
+
+    def _plan(self, stage, fps, outputs=None):
+        dirty = dirty_units(self.state, stage, fps, outputs or {}, self.force)
+        print(f"[INFO] {stage}: {len(dirty)} to run, {len(fps) - len(dirty)} up to date")
+        self.summary[stage] = {"run": len(dirty), "skipped": len(fps) - len(dirty)}
+        return [] if self.dry_run else dirty
+
+    def _finish(self, stage, fps, done):
+        if self.dry_run:
+            return
+        record(self.state, stage, fps, done)
+        save_state(self.state, self.state_path)
+        if len(done) < self.summary[stage]["run"]:
+            self.summary[stage]["failed"] = self.summary[stage]["run"] - len(done)
+
+    def _universe(self, store_dir):
+        universe = list_tickers(store_dir)
+        return universe if self.tickers is None else [t for t in self.tickers if t in universe]
+
+    def _featured(self):
+        candidates = self.tickers if self.tickers is not None else stage4.available_tickers()
+        return [t for t in candidates if has_table("daily_features", t)]
+
+    def _evidence_ready(self):
+        # Tickers stage4 can validate: stage1 features plus both daily tables
+        ready, missing = [], []
+        for t in self._featured():
+            (ready if all(has_daily(table, t) for table in TABLES) else missing).append(t)
+        missing = [t for t in missing if t not in self._warned]
+        if missing and not self.dry_run:
+            print(f"[WARN] No daily evidence tables for: {', '.join(missing)}; "
+                  f"not validated or synthesized")
+            self._warned.update(missing)
+        return ready
+
+    def discovery(self, pool):
+        csv_path = stage1.resolve_csv_path()
+        if not os.path.exists(csv_path):
+            print(f"[WARN] discovery: {csv_path} not found; skipped")
+            return
+        store_dir = ensure_store(csv_path)
+        params = {k: self.params[k] for k in ("vol_window", "vol_baseline")}
+        code = code_hash("discovery", self.memo)
+        columns = ["date", *stage1.STORE_COLUMNS]
+        fps = {t: fingerprint(code, params, hash_arrays(os.path.join(store_dir, f"{t}.npz"), columns))
+               for t in self._universe(store_dir)}
+        outputs = {t: [artifact_path("daily_features", t),
+                       os.path.join(ARTIFACTS_DIR, f"peaks_{t}.json")] for t in fps}
+        dirty = self._plan("discovery", fps, outputs)
+        if dirty:
+            regime = {"window": params["vol_window"], "baseline": params["vol_baseline"]}
+            workers = 1 if self.workers == 0 else self.workers
+            stage1.run_discovery_many(dirty, workers=workers, out_dir=ARTIFACTS_DIR, regime_config=regime)
+        self._finish("discovery", fps, dirty)
+
+    def daily(self, pool):
+        caches = [resolve_ui_cache(kind) for kind in ("news", "retail")]
+        inputs = [(mode, hash_file(path, self.memo)) for mode, path in caches if path]
+        fps = {"*": fingerprint(code_hash("daily", self.memo), self.tickers, inputs)}
+        # every featured ticker needs both tables; a deleted one makes the unit dirty
+        outputs = {"*": [artifact_path(table, t) for t in self._featured() for table in TABLES]}
+        if self._plan("daily", fps, outputs):
+            build_daily(self.tickers)
+            self._finish("daily", fps, ["*"])
+
+    def validation(self, pool):
+        p = self.params
+        params = {"max_lag": p["max_lag"], "horizons": p["horizons"], "windows": p["windows"],
+                  "roll_lags": p["roll_lags"], "n_resamples": p["n_resamples"], "seed": p["seed"],
+                  "block": p["block"]}
+        code = code_hash("validation", self.memo)
+        fps = {}
+        for t in self._evidence_ready():
+            inputs = [hash_input(find_table(table, t), self.memo) for table in ("daily_features", *TABLES)]
+            fps[t] = fingerprint(code, params, inputs)
+        outputs = {t: [os.path.join(ARTIFACTS_DIR, f"validation_{t}.json")]
+                      + [artifact_path(name, t) for name in ("merged_daily", "lag_profile", "rolling_validation")]
+                   for t in fps}
+        dirty = self._plan("validation", fps, outputs)
+        self._finish("validation", fps, run_parallel(_validate, dirty, params, pool))
+
+    def synthesis(self, pool):
+        params = {"days": self.params["days"], "seed": self.params["synthetic_seed"]}
+        code = code_hash("synthesis", self.memo)
+        fps = {}
+        for t in self._evidence_ready():
+            merged = find_table("merged_daily", t)
+            real = hash_input(merged, self.memo) if merged else None
+            fps[t] = fingerprint(code, params, real)
+        outputs = {t: [os.path.join(ARTIFACTS_DIR, f"audit_{t}.json"),
+                       artifact_path("synthetic", f"{t}_{params['days']}d")] for t in fps}
+        dirty = self._plan("synthesis", fps, outputs)
+        self._finish("synthesis", fps, run_parallel(_synthesize, dirty, params, pool))
+
+    def _global_inputs(self):
+        caches = [resolve_ui_cache(kind) for kind in ("news", "retail")]
+        inputs = [(mode, hash_file(path, self.memo)) for mode, path in caches if path]
+        if os.path.exists(CSV_PATH):
+            inputs.append(hash_file(CSV_PATH, self.memo))
+        return inputs
+
+    def indices(self, pool):
+        fps = {"*": fingerprint(code_hash("indices", self.memo), self.tickers, self._global_inputs())}
+        if self._plan("indices", fps):
+            build_indices(self.tickers)
+            self._finish("indices", fps, ["*"])
+
+    def snapshot(self, pool):
+        # The snapshot's 30-day evidence window moves with the date
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        fps = {"*": fingerprint(code_hash("snapshot", self.memo), today, self._global_inputs())}
+        if self._plan("snapshot", fps):
+            build_snapshot()
+            self._finish("snapshot", fps, ["*"])
+
+    def run(self) -> dict:
+        os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+        pool = ProcessPoolExecutor(self.workers) if self.workers and self.workers > 1 else None
+        try:
+            for stage in self.stages:
+                getattr(self, stage)(pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        if not self.dry_run:
+            save_state(self.state, self.state_path)
+        return self.summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run stages 1/4/5, daily tables, indices and snapshot incrementally")
+    parser.add_argument("--tickers",      nargs="+", default=["all"], help="Tickers, or 'all' (default)")
+    parser.add_argument("--stages",       nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--workers",      type=int, default=os.cpu_count(), help="0 = in-process")
+    parser.add_argument("--force",        action="store_true", help="Rerun every unit regardless of fingerprints")
+    parser.add_argument("--dry-run",      action="store_true", help="Only report what would run")
+    parser.add_argument("--state",        default=STATE_PATH)
+    parser.add_argument("--vol-window",   type=int, default=stage1.REGIME_CONFIG["window"])
+    parser.add_argument("--vol-baseline", choices=["global", "expanding"], default=stage1.REGIME_CONFIG["baseline"])
+    parser.add_argument("--resamples",    type=int, default=stage4.N_RESAMPLES)
+    parser.add_argument("--seed",         type=int, default=stage4.SEED)
+    parser.add_argument("--days",         type=int, default=1095, help="Stage5 synthetic length")
+    args = parser.parse_args()
+
+    tickers = None if [t.lower() for t in args.tickers] == ["all"] else [t.upper() for t in args.tickers]
+    params = {
+        "vol_window": args.vol_window, "vol_baseline": args.vol_baseline,
+        "max_lag": stage4.MAX_LAG, "horizons": tuple(stage4.HORIZONS), "windows": tuple(stage4.WINDOWS),
+        "roll_lags": tuple(stage4.ROLL_LAGS), "n_resamples": args.resamples, "seed": args.seed, "block": None,
+        "days": args.days, "synthetic_seed": stage5.SEED,
+    }
+    summary = Pipeline(tickers, args.stages, params, args.workers, args.force, args.dry_run, args.state).run()
+    ran = sum(s["run"] for s in summary.values())
+    skipped = sum(s["skipped"] for s in summary.values())
+    failed = sum(s.get("failed", 0) for s in summary.values())
+    verb = "would run" if args.dry_run else "ran"
+    print(f"[OK] Pipeline {verb} {ran} units, skipped {skipped} up to date"
+          + (f", {failed} failed" if failed else ""))
+
+
+if __name__ == "__main__":
+    main()
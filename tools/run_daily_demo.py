@@ -8,10 +8,20 @@ Generates / updates docs/data/daily_snapshot.json from:
   - docs/data/retail_demo_cache.json
 
 Usage (offline DEMO mode, no API keys needed):
-  python tools/run_daily_demo.py
+  python tools/run_daily_demo.py                 # full rebuild
+  python tools/run_daily_demo.py --incremental   # only new CSV rows / evidence
 
 Output:
   docs/data/daily_snapshot.json
+  docs/data/daily_snapshot_state.json   (per-ticker watermarks + running aggregates)
+
+Incremental mode:
+  Each ticker keeps a watermark (last Business Date and last evidence
+  published_at_utc seen) and per-day running aggregates for the trailing
+  30-day window. A run only reads CSV rows after the date watermark and
+  evidence items after the timestamp watermark, folds them into the
+  aggregates, drops days that fell out of the window, and rewrites the
+  snapshot. Cost is proportional to what changed, not to total history.
 
 Set SQUEEZE_ORACLE_MODE flag in the UI to ON to have the UI read this snapshot.
 
@@ -24,11 +34,14 @@ LIVE mode (optional):
 """
 
 import json
-import csv
 import os
 import sys
+import math
+import argparse
 from datetime import datetime, timezone, timedelta
-import statistics
+
+from si_store import ensure_store, load_ticker, ordinal_to_iso, to_ordinal
+from evidence_store import iter_evidence
 
 # ── Paths ──────────────────────────────────────────────────────────────────
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -37,38 +50,33 @@ CSV_PATH = os.path.join(DATA_DIR, "Stock Short Interest Data.csv")
 NEWS_CACHE = os.path.join(DATA_DIR, "news_demo_cache.json")
 RETAIL_CACHE = os.path.join(DATA_DIR, "retail_demo_cache.json")
 OUTPUT_PATH = os.path.join(DATA_DIR, "daily_snapshot.json")
+STATE_PATH = os.path.join(DATA_DIR, "daily_snapshot_state.json")
 
 FOCUS_TICKERS = ["AFRM", "SQ", "PYPL", "SHOP", "TSLA"]
 DATA_SOURCE = os.environ.get("ORACLE_DATA_SOURCE", "demo")  # "demo" or "live"
+WINDOW_DAYS = 30
+STATE_SCHEMA_VERSION = "1.0"
 
-# ── Helpers ────────────────────────────────────────────────────────────────
-def load_csv(path):
-    rows = []
-    try:
-        with open(path, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row.get("Ticker") in FOCUS_TICKERS:
-                    rows.append(row)
-    except FileNotFoundError:
-        print(f"[WARN] CSV not found: {path}")
-    return rows
-
-
-def load_json(path):
-    try:
-        with open(path, encoding="utf-8") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        print(f"[WARN] JSON not found or invalid: {path}")
-        return []
+SNAPSHOT_COLUMNS = ["S3SIPctFloat", "ShortInterestPct", "Short Interest", "S3Float",
+                    "Crowded Score", "Squeeze Score"]
 
+# ── Helpers ────────────────────────────────────────────────────────────────
 
 def safe_float(v, default=0.0):
     try:
-        return float(v)
+        f = float(v)
     except (TypeError, ValueError):
         return default
+    return default if math.isnan(f) else f
+
+
+def first_present(row, *keys):
+    """First non-empty value among `keys` (mirrors `a or b` on raw CSV strings)."""
+    for k in keys:
+        v = safe_float(row.get(k), default=None)
+        if v is not None:
+            return v
+    return 0.0
 
 
 def compute_days_to_cover_proxy(si_pct, avg_vol_proxy=0.03):
@@ -82,25 +90,160 @@ def compute_days_to_cover_proxy(si_pct, avg_vol_proxy=0.03):
     return round(si_pct / (avg_vol_proxy * 100), 2)
 
 
+
+# ── Incremental state ──────────────────────────────────────────────────────
+def new_ticker_state():
+    return {
+        "csv_watermark": None,        # last Business Date folded in (YYYY-MM-DD)
+        "latest_row": None,           # SNAPSHOT_COLUMNS of that date
+        "evidence_watermark": {"news": "", "retail": ""},
+        "evidence_ids_at_watermark": {"news": [], "retail": []},
+        "news_days": {},              # day -> {count, sent_sum, sent_sq, providers{name: n}}
+        "retail_days": {},            # day -> {count}
+    }
+
+
+def load_state(path=STATE_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"schema_version": STATE_SCHEMA_VERSION, "tickers": {}}
+    if state.get("schema_version") != STATE_SCHEMA_VERSION:
+        print(f"[WARN] State schema mismatch in {path}; starting from scratch.")
+        return {"schema_version": STATE_SCHEMA_VERSION, "tickers": {}}
+    return state
+
+
+def save_state(state, path=STATE_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(state, f, separators=(",", ":"))
+
+
+def update_csv_state(state, csv_path, tickers):
+    """Fold CSV rows after each ticker's date watermark; returns rows read."""
+    if not os.path.exists(csv_path):
+        print(f"[WARN] CSV not found: {csv_path}")
+        return 0
+    store_dir = ensure_store(csv_path)
+    rows_read = 0
+    for ticker in tickers:
+        ts = state["tickers"].setdefault(ticker, new_ticker_state())
+        start = None if ts["csv_watermark"] is None else to_ordinal(ts["csv_watermark"]) + 1
+        cols = load_ticker(store_dir, ticker, start=start, columns=SNAPSHOT_COLUMNS)
+        if not cols or len(cols["date"]) == 0:
+            continue
+        rows_read += len(cols["date"])
+        ts["latest_row"] = {c: float(v[-1]) for c, v in cols.items() if c != "date"}
+        ts["csv_watermark"] = ordinal_to_iso(cols["date"][-1])
+    return rows_read
+
+
+def update_evidence_state(state, items, kind, tickers, cutoff_day):
+    """
+    One pass over an evidence list: fold every item newer than its ticker's
+    watermark into per-day buckets (days before `cutoff_day` are not kept).
+    Returns the number of items folded in.
+    """
+    wanted = set(tickers)
+    folded = 0
+    new_marks = {}
+    for item in items:
+        ticker = item.get("ticker")
+        if ticker not in wanted:
+            continue
+        ts_state = state["tickers"].setdefault(ticker, new_ticker_state())
+        pub = item.get("published_at_utc", "")
+        mark = ts_state["evidence_watermark"][kind]
+        if pub < mark or (pub == mark and item.get("id") in ts_state["evidence_ids_at_watermark"][kind]):
+            continue
+
+        hi = new_marks.setdefault(ticker, [mark, set(ts_state["evidence_ids_at_watermark"][kind])])
+        if pub > hi[0]:
+            hi[0], hi[1] = pub, {item.get("id")}
+        elif pub == hi[0]:
+            hi[1].add(item.get("id"))
+        folded += 1
+
+        day = pub[:10]
+        if day < cutoff_day:
+            continue
+        if kind == "news":
+            b = ts_state["news_days"].setdefault(day, {"count": 0, "sent_sum": 0.0, "sent_sq": 0.0, "providers": {}})
+            s = item.get("metrics", {}).get("sentiment", 0)
+            b["sent_sum"] += s
+            b["sent_sq"] += s * s
+            prov = item.get("provider", "")
+            b["providers"][prov] = b["providers"].get(prov, 0) + 1
+        else:
+            b = ts_state["retail_days"].setdefault(day, {"count": 0})
+        b["count"] += 1
+
+    for ticker, (mark, ids) in new_marks.items():
+        ts_state = state["tickers"][ticker]
+        ts_state["evidence_watermark"][kind] = mark
+        ts_state["evidence_ids_at_watermark"][kind] = sorted(i for i in ids if i is not None)
+    return folded
+
+
+def iter_new_evidence(state, kind, cache_path, tickers, cutoff_day):
+    """
+    Stream items of `kind` for `tickers` from the day partitions at or after both
+    the ticker's watermark day and `cutoff_day`; older partitions are never opened.
+    """
+    for ticker in tickers:
+        mark = state["tickers"].get(ticker, new_ticker_state())["evidence_watermark"][kind]
+        yield from iter_evidence(ticker, start=max(mark[:10], cutoff_day), source=kind, cache_path=cache_path)
+
+
+def prune_days(ts_state, cutoff_day):
+    for key in ("news_days", "retail_days"):
+        ts_state[key] = {d: b for d, b in ts_state[key].items() if d >= cutoff_day}
+
+
+def summarize_news(ts_state):
+    """Trailing-window news stats from the per-day running aggregates."""
+    n = sum(b["count"] for b in ts_state["news_days"].values())
+    s1 = sum(b["sent_sum"] for b in ts_state["news_days"].values())
+    s2 = sum(b["sent_sq"] for b in ts_state["news_days"].values())
+    providers = set()
+    for b in ts_state["news_days"].values():
+        providers.update(b["providers"])
+    avg = s1 / n if n else 0.0
+    std = math.sqrt(max(s2 - s1 * s1 / n, 0.0) / (n - 1)) if n > 1 else 0.0
+    return n, round(avg, 4), round(std, 4), providers
+
+
 # ── Core Builder ───────────────────────────────────────────────────────────
-def build_snapshot():
+def build_snapshot(incremental=False):
+    state = load_state() if incremental else {"schema_version": STATE_SCHEMA_VERSION, "tickers": {}}
+
+    now_utc = datetime.now(timezone.utc).isoformat()
+    snapshot_date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    # News volume in the last 30 days
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=WINDOW_DAYS)).strftime("%Y-%m-%d")
+
     print("[INFO] Loading CSV data...")
-    csv_rows = load_csv(CSV_PATH)
+    csv_rows = update_csv_state(state, CSV_PATH, FOCUS_TICKERS)
 
     print("[INFO] Loading news cache...")
-    news = load_json(NEWS_CACHE)
+    news_new = update_evidence_state(
+        state, iter_new_evidence(state, "news", NEWS_CACHE, FOCUS_TICKERS, cutoff), "news", FOCUS_TICKERS, cutoff)
 
     print("[INFO] Loading retail cache...")
-    retail = load_json(RETAIL_CACHE)
+    retail_new = update_evidence_state(
+        state, iter_new_evidence(state, "retail", RETAIL_CACHE, FOCUS_TICKERS, cutoff), "retail", FOCUS_TICKERS, cutoff)
 
-    now_utc = datetime.now(timezone.utc).isoformat()
-    snapshot_date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    print(f"[INFO] {'Incremental' if incremental else 'Full'} run: "
+          f"{csv_rows} CSV rows, {news_new} news, {retail_new} retail items processed")
 
     tickers_data = {}
     for ticker in FOCUS_TICKERS:
-        ticker_rows = [r for r in csv_rows if r.get("Ticker") == ticker]
+        ts_state = state["tickers"].setdefault(ticker, new_ticker_state())
+        prune_days(ts_state, cutoff)
+        latest = ts_state["latest_row"]
 
-        if not ticker_rows:
+        if latest is None:
             print(f"[WARN] No CSV rows for {ticker}")
             tickers_data[ticker] = {
                 "ticker": ticker,
@@ -109,21 +252,7 @@ def build_snapshot():
             }
             continue
 
-        # Sort by date
-        def parse_date(r):
-            ds = r.get("Business Date") or r.get("Date", "")
-            if "/" in ds:
-                parts = ds.split("/")
-                year = parts[2] if len(parts) == 3 else "2000"
-                if len(year) == 2:
-                    year = "20" + year
-                return f"{year}-{parts[0].zfill(2)}-{parts[1].zfill(2)}"
-            return ds
-
-        ticker_rows.sort(key=parse_date)
-        latest = ticker_rows[-1]
-
-        si_pct = safe_float(latest.get("S3SIPctFloat") or latest.get("ShortInterestPct")) * 100
+        si_pct = first_present(latest, "S3SIPctFloat", "ShortInterestPct") * 100
         if si_pct == 0:
             si_raw = safe_float(latest.get("Short Interest"))
             s3_float = safe_float(latest.get("S3Float"), default=1)
@@ -137,27 +266,18 @@ def build_snapshot():
         # Borrow fee proxy: high SI% → inferred higher borrow cost
         borrow_fee_proxy = round(min(50.0, si_pct * 0.8), 2)  # crude linear proxy
 
-        # News volume in the last 30 days
-        cutoff = (datetime.now(timezone.utc) - timedelta(days=30)).strftime("%Y-%m-%d")
-        recent_news = [n for n in news if n.get("ticker") == ticker
-                       and n.get("published_at_utc", "") >= cutoff]
-        recent_retail = [r for r in retail if r.get("ticker") == ticker
-                         and r.get("published_at_utc", "") >= cutoff]
-
-        sentiments = [n.get("metrics", {}).get("sentiment", 0) for n in recent_news]
-        avg_sentiment = round(statistics.mean(sentiments), 4) if sentiments else 0.0
-        sentiment_std = round(statistics.stdev(sentiments), 4) if len(sentiments) > 1 else 0.0
+        news_count, avg_sentiment, sentiment_std, provider_set = summarize_news(ts_state)
+        retail_count = sum(b["count"] for b in ts_state["retail_days"].values())
 
         # Simple shock score for snapshot: volume × |avg_sentiment| × source_diversity
-        provider_set = set(n.get("provider", "") for n in recent_news)
-        novelty = len(provider_set) / max(len(recent_news), 1)
-        snap_shock = round(len(recent_news) * abs(avg_sentiment) * novelty * 10, 2)
+        novelty = len(provider_set) / max(news_count, 1)
+        snap_shock = round(news_count * abs(avg_sentiment) * novelty * 10, 2)
 
         tickers_data[ticker] = {
             "ticker": ticker,
             "data_source": DATA_SOURCE.upper(),
             "snapshot_date": snapshot_date,
-            "latest_date": parse_date(latest),
+            "latest_date": ts_state["csv_watermark"],
             "short_interest_pct": round(si_pct, 2),
             "crowded_score": round(crowded, 2),
             "squeeze_score": round(squeeze, 2),
@@ -168,13 +288,13 @@ def build_snapshot():
                 "utilization_proxy": round(min(100.0, si_pct * 2.5), 2),
             },
             "news_30d": {
-                "count": len(recent_news),
+                "count": news_count,
                 "unique_providers": len(provider_set),
                 "avg_sentiment": avg_sentiment,
                 "sentiment_std": sentiment_std,
             },
             "retail_30d": {
-                "count": len(recent_retail),
+                "count": retail_count,
             },
             "snap_shock_score": snap_shock,
         }
@@ -192,6 +312,7 @@ def build_snapshot():
     os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
     with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
         json.dump(snapshot, f, indent=2)
+    save_state(state)
 
     print(f"[OK] Snapshot written to: {OUTPUT_PATH}")
     print(f"     Data source: {DATA_SOURCE.upper()}")
@@ -199,7 +320,16 @@ def build_snapshot():
     return snapshot
 
 
-if __name__ == "__main__":
-    snap = build_snapshot()
+def main():
+    parser = argparse.ArgumentParser(description="Squeeze Oracle daily snapshot runner")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Resume from daily_snapshot_state.json and only process new rows/items")
+    args = parser.parse_args()
+
+    snap = build_snapshot(incremental=args.incremental)
     print(f"\n[DONE] Snapshot covers {len(snap['tickers'])} tickers.")
     print("       Set SQUEEZE_ORACLE_MODE flag in the UI to read this snapshot.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+score_cache.py  —  Short-Alpha Pod | Persistent Text-Score Cache
+=================================================================
+Memoizes lexicon scores (lexicon.score_sentiment / score_hype) by a stable
+hash of the scored text, so re-posted / templated items and unchanged
+items on a nightly rebuild are never scored twice.
+
+Key:   (namespace, blake2b-128 of the normalized "title excerpt" text)
+       namespace = score kind + hash of the lexicon's terms and match mode,
+       so editing a lexicon never serves stale scores.
+       Normalization is lower-casing plus whitespace collapsing; the latter
+       only when the lexicon cannot tell the difference (token lexicons, or
+       substring lexicons without multi-word terms), so a cached score is
+       always the score the text would get.
+
+Tiers: an in-process LRU (OrderedDict, `lru_size` entries) in front of an
+       SQLite file (docs/data/score_cache.sqlite). Misses are scored in one
+       batch call and written back in one transaction per batch. When the
+       file's live data exceeds `max_bytes`, least-recently-used rows are
+       evicted down to EVICT_TO of the cap.
+
+Counters (ScoreCache.stats()): memory hits, disk hits, misses, evictions and
+the overall hit rate, reported by the tools that use the cache.
+
+USAGE:
+  cache = open_score_cache()                       # process-wide instance
+  hype  = score_hype(titles, excerpts, cache=cache)    # lexicon.py
+  print(cache.summary())
+
+  python tools/score_cache.py            # show counters / size of the store
+  python tools/score_cache.py --clear
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import argparse
+from collections import OrderedDict
+
+import numpy as np
+
+ROOT       = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR   = os.path.join(ROOT, "docs", "data")
+CACHE_PATH = os.path.join(DATA_DIR, "score_cache.sqlite")
+
+LRU_SIZE   = 1 << 17          # entries kept in memory
+MAX_BYTES  = 256 << 20        # on-disk cap (live SQLite pages)
+EVICT_TO   = 0.8              # evict down to this fraction of MAX_BYTES
+SQL_CHUNK  = 500              # keys per "IN (...)" lookup (SQLite variable limit)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    ns    TEXT    NOT NULL,
+    key   BLOB    NOT NULL,
+    value REAL    NOT NULL,
+    used  INTEGER NOT NULL,
+    PRIMARY KEY (ns, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scores_used ON scores (used);
+"""
+
+
+def namespace(kind: str, lexicon) -> str:
+    """Cache namespace of one score kind under one lexicon's rules."""
+    fp = hashlib.blake2b(lexicon.fingerprint().encode("utf-8"), digest_size=8).hexdigest()
+    return f"{kind}:{fp}"
+
+
+def text_key(text: str, collapse_ws: bool = True) -> bytes:
+    """Stable 16-byte key of a scored text (lower-cased, whitespace-collapsed if allowed)."""
+    text = (text or "").lower()
+    if collapse_ws:
+        text = " ".join(text.split())
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class ScoreCache:
+    """Two-tier (LRU + SQLite) memo of per-text scores. Not thread-safe."""
+
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = MAX_BYTES, lru_size: int = LRU_SIZE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lru_size = lru_size
+        self._lru = OrderedDict()
+        self.mem_hits = self.disk_hits = self.misses = self.evicted = 0
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, timeout=30)
+            self._db.executescript(_SCHEMA)
+
+    # ── lookup ────────────────────────────────────────────────────────────────
+    def scores(self, kind: str, lexicon, texts: list, compute) -> np.ndarray:
+        """
+        `kind` score of every text in `texts` under `lexicon`, from the cache
+        where possible. `compute(list_of_texts) -> np.ndarray` is called once,
+        on one representative text per distinct missing key.
+        """
+        ns = namespace(kind, lexicon)
+        keys = [text_key(t, lexicon.whitespace_insensitive) for t in texts]
+        first = {}
+        for i, k in enumerate(keys):
+            first.setdefault(k, i)
+        found = {}
+
+        # counters are per text: repeats of a key within the batch are memory hits
+        lru = self._lru
+        for k in first:
+            v = lru.get((ns, k))
+            if v is not None:
+                lru.move_to_end((ns, k))
+                found[k] = v
+        self.mem_hits += len(keys) - len(first) + len(found)
+
+        missing = [k for k in first if k not in found]
+        if missing and self._db is not None:
+            on_disk = self._fetch(ns, missing)
+            self.disk_hits += len(on_disk)
+            found.update(on_disk)
+            self._remember(ns, on_disk)
+            missing = [k for k in missing if k not in on_disk]
+
+        if missing:
+            self.misses += len(missing)
+            fresh = np.asarray(compute([texts[first[k]] for k in missing]), dtype=np.float64).tolist()
+            new = dict(zip(missing, fresh))
+            found.update(new)
+            self._remember(ns, new)
+            self._store(ns, new)
+
+        return np.fromiter((found[k] for k in keys), dtype=np.float64, count=len(keys))
+
+    def _remember(self, ns: str, values: dict):
+        lru = self._lru
+        for k, v in values.items():
+            lru[(ns, k)] = v
+        while len(lru) > self.lru_size:
+            lru.popitem(last=False)
+
+    # ── disk tier ─────────────────────────────────────────────────────────────
+    def _fetch(self, ns: str, keys: list) -> dict:
+        out = {}
+        cur = self._db.cursor()
+        for i in range(0, len(keys), SQL_CHUNK):
+            chunk = keys[i:i + SQL_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            out.update(cur.execute(f"SELECT key, value FROM scores WHERE ns = ? AND key IN ({marks})",
+                                   [ns, *chunk]))
+        if out:
+            now = int(time.time())
+            with self._db:
+                cur.executemany("UPDATE scores SET used = ? WHERE ns = ? AND key = ?",
+                                [(now, ns, k) for k in out])
+        return out
+
+    def _store(self, ns: str, values: dict):
+        if self._db is None or not values:
+            return
+        now = int(time.time())
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO scores (ns, key, value, used) VALUES (?, ?, ?, ?)",
+                                 [(ns, k, v, now) for k, v in values.items()])
+        self._evict()
+
+    def disk_bytes(self) -> int:
+        """Bytes of live (non-free) pages in the SQLite file."""
+        if self._db is None:
+            return 0
+        q = lambda p: self._db.execute(f"PRAGMA {p}").fetchone()[0]
+        return (q("page_count") - q("freelist_count")) * q("page_size")
+
+    def _evict(self):
+        size = self.disk_bytes()
+        if size <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+        drop = rows - int(rows * EVICT_TO * self.max_bytes / size)
+        with self._db:
+            cur = self._db.execute(
+                "DELETE FROM scores WHERE (ns, key) IN "
+                "(SELECT ns, key FROM scores ORDER BY used LIMIT ?)", (drop,))
+        self.evicted += max(cur.rowcount, 0)
+
+    # ── reporting / lifecycle ─────────────────────────────────────────────────
+    def stats(self) -> dict:
+        lookups = self.mem_hits + self.disk_hits + self.misses
+        return {
+            "mem_hits":  self.mem_hits,
+            "disk_hits": self.disk_hits,
+            "misses":    self.misses,
+            "evicted":   self.evicted,
+            "hit_rate":  round((self.mem_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+    def summary(self) -> str:
+        s = self.stats()
+        evicted = f", {s['evicted']} evicted" if s["evicted"] else ""
+        return (f"score cache: {s['hit_rate']:.1%} hit rate ({s['mem_hits']} memory / "
+                f"{s['disk_hits']} disk / {s['misses']} scored{evicted})")
+
+    def clear(self):
+        self._lru.clear()
+        if self._db is not None:
+            with self._db:
+                self._db.execute("DELETE FROM scores")
+            self._db.execute("VACUUM")
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+_shared = {}
+
+
+def open_score_cache(path: str = CACHE_PATH, **kwargs) -> ScoreCache:
+    """Process-wide ScoreCache for `path`, so every tool in one run shares the LRU."""
+    cache = _shared.get(path)
+    if cache is None or (cache._db is None and path):
+        cache = _shared[path] = ScoreCache(path, **kwargs)
+    return cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect / clear the lexicon score cache")
+    parser.add_argument("--path",  default=CACHE_PATH)
+    parser.add_argument("--clear", action="store_true")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"[INFO] No score cache at {args.path}")
+        return
+    cache = ScoreCache(args.path)
+    if args.clear:
+        cache.clear()
+        print(f"[OK] Cleared {args.path}")
+        return
+    rows = cache._db.execute("SELECT ns, COUNT(*) FROM scores GROUP BY ns ORDER BY ns").fetchall()
+    for ns, n in rows:
+        print(f"  {ns:<28} {n:>10} entries")
+    print(f"[OK] {sum(n for _, n in rows)} entries, {cache.disk_bytes() / 1e6:.1f} MB live "
+          f"(cap {cache.max_bytes / 1e6:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+si_store.py  —  Short-Alpha Pod | Columnar Short-Interest Store
+================================================================
+One-time conversion of the vendor file `Stock Short Interest Data.csv`
+into a typed, ticker-partitioned columnar store, plus a loader that reads
+one ticker (or one date range of one ticker) without touching the rest.
+
+Layout (written next to the CSV by default):
+  si_store/
+    manifest.json        source fingerprint, column list, per-ticker index
+    <TICKER>.npz         one partition per ticker, rows sorted by date
+      date               int32   proleptic-Gregorian day ordinal
+      <numeric column>   float64 (NaN where the vendor cell is empty)
+
+Identifier columns (Sedol, ISIN, FIGI, BBGID, Name) are constant per ticker
+and live in the manifest instead of being repeated per row.
+
+The store is refreshed automatically when the CSV's size or mtime no longer
+matches the manifest, so callers can simply use `ensure_store()`. When the
+vendor has only appended rows, just the new tail of the CSV is parsed and
+merged into the partitions of the tickers it touches (`append_store()`);
+any other change rebuilds the store.
+
+USAGE:
+  # Build / refresh the store explicitly
+  python tools/si_store.py --csv "docs/data/Stock Short Interest Data.csv"
+
+  # From code
+  store = ensure_store(CSV_PATH)
+  cols  = load_ticker(store, "TSLA", start="2021-01-01", end="2021-03-31")
+"""
+
+import io
+import os
+import json
+import hashlib
+import argparse
+from datetime import date, datetime
+
+import numpy as np
+
+ROOT     = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT, "docs", "data")
+CSV_PATH = os.path.join(DATA_DIR, "Stock Short Interest Data.csv")
+
+STORE_DIRNAME  = "si_store"
+MANIFEST_NAME  = "manifest.json"
+SCHEMA_VERSION = "1.0"
+PREFIX_WINDOW  = 4096      # bytes at each end of the ingested prefix hashed by _prefix_sha1()
+
+DATE_COL   = "Business Date"
+TICKER_COL = "Ticker"
+META_COLS  = ["Sedol", "ISIN", "FIGI", "BBGID", "Name"]
+
+# Ordinal of 1970-01-01, used to turn datetime64[D] into date ordinals.
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+# ── Date helpers ──────────────────────────────────────────────────────────────
+def parse_business_date(ds: str):
+    """Parse a vendor date ('1/19/21', '01/19/2021' or '2021-01-19') to a date."""
+    for fmt in ("%Y-%m-%d", "%m/%d/%y", "%m/%d/%Y"):
+        try:
+            return datetime.strptime(ds.strip(), fmt).date()
+        except (ValueError, AttributeError):
+            continue
+    return None
+
+
+def to_ordinal(value) -> int:
+    """Accept an ordinal, a date/datetime or a date string; return a day ordinal."""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    parsed = parse_business_date(str(value))
+    if parsed is None:
+        raise ValueError(f"Unrecognised date: {value!r}")
+    return parsed.toordinal()
+
+
+def ordinal_to_iso(ordinal) -> str:
+    return date.fromordinal(int(ordinal)).isoformat()
+
+
+def ordinals_to_datetime64(ordinals):
+    """Vectorised ordinal -> numpy datetime64[D] conversion."""
+    return (np.asarray(ordinals, dtype=np.int64) - _EPOCH_ORDINAL).astype("datetime64[D]")
+
+
+def datetime64_to_ordinals(values):
+    """Vectorised numpy datetime64 (any unit) -> int64 day ordinal conversion."""
+    return np.asarray(values).astype("datetime64[D]").astype(np.int64) + _EPOCH_ORDINAL
+
+
+# ── Build ─────────────────────────────────────────────────────────────────────
+def default_store_dir(csv_path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(csv_path)), STORE_DIRNAME)
+
+
+def _prefix_sha1(csv_path: str, offset: int) -> str:
+    """Hash of the first and last PREFIX_WINDOW bytes of the CSV up to `offset`:
+    a cheap check that a grown file still starts with the rows already stored."""
+    with open(csv_path, "rb") as f:
+        head = f.read(min(offset, PREFIX_WINDOW))
+        f.seek(max(0, offset - PREFIX_WINDOW))
+        tail = f.read(offset - f.tell())
+    return hashlib.sha1(head + tail).hexdigest()
+
+
+def _source_fingerprint(csv_path: str, offset: int = None) -> dict:
+    st = os.stat(csv_path)
+    fp = {"path": os.path.abspath(csv_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if offset is not None:
+        fp.update(offset=offset, prefix_sha1=_prefix_sha1(csv_path, offset))
+    return fp
+
+
+def _parse_rows(source):
+    """Read vendor CSV text into rows sorted by (ticker, date) with an `_ord` day column."""
+    import pandas as pd
+
+    text_cols = [DATE_COL, TICKER_COL] + META_COLS
+    df = pd.read_csv(source, dtype={c: str for c in text_cols})
+    df = df[df[TICKER_COL].notna()]
+
+    parsed = pd.to_datetime(df[DATE_COL], format="%m/%d/%y", errors="coerce")
+    missing = parsed.isna()
+    if missing.any():
+        parsed[missing] = pd.to_datetime(df.loc[missing, DATE_COL], format="mixed", errors="coerce")
+    df = df[parsed.notna()].copy()
+    df["_ord"] = datetime64_to_ordinals(parsed[parsed.notna()].values)
+    df = df.sort_values([TICKER_COL, "_ord"], kind="mergesort")
+
+    numeric_cols = [c for c in df.columns if c not in text_cols and c != "_ord"]
+    for c in numeric_cols:
+        df[c] = pd.to_numeric(df[c], errors="coerce").astype(np.float64)
+    return df, numeric_cols
+
+
+def _ticker_arrays(g, numeric_cols) -> dict:
+    arrays = {"date": g["_ord"].to_numpy(dtype=np.int32)}
+    for c in numeric_cols:
+        arrays[c] = g[c].to_numpy(dtype=np.float64)
+    return arrays
+
+
+def _ticker_meta(g) -> dict:
+    """Identifier columns of a ticker, taken from its earliest row."""
+    import pandas as pd
+
+    first = g.iloc[0]
+    return {c: (None if pd.isna(first.get(c)) else str(first.get(c)))
+            for c in META_COLS if c in g.columns}
+
+
+def _ticker_entry(ticker: str, arrays: dict, meta: dict) -> dict:
+    return {
+        "file":  f"{ticker}.npz",
+        "rows":  int(len(arrays["date"])),
+        "start": ordinal_to_iso(arrays["date"][0]),
+        "end":   ordinal_to_iso(arrays["date"][-1]),
+        "meta":  meta,
+    }
+
+
+def _write_manifest(store_dir: str, csv_path: str, offset: int, numeric_cols: list, tickers: dict) -> dict:
+    manifest = {
+        "schema_version":  SCHEMA_VERSION,
+        "built_at":        datetime.now().isoformat(timespec="seconds"),
+        "source":          _source_fingerprint(csv_path, offset),
+        "date_encoding":   "int32 proleptic-Gregorian ordinal (date.toordinal)",
+        "numeric_columns": numeric_cols,
+        "tickers":         dict(sorted(tickers.items())),
+    }
+    with open(os.path.join(store_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def build_store(csv_path: str = CSV_PATH, store_dir: str = None) -> dict:
+    """Parse the CSV once and write one .npz partition per ticker. Returns the manifest."""
+    store_dir = store_dir or default_store_dir(csv_path)
+    os.makedirs(store_dir, exist_ok=True)
+
+    offset = os.path.getsize(csv_path)
+    df, numeric_cols = _parse_rows(csv_path)
+    tickers = {}
+    for ticker, g in df.groupby(TICKER_COL, sort=True):
+        arrays = _ticker_arrays(g, numeric_cols)
+        np.savez(os.path.join(store_dir, f"{ticker}.npz"), **arrays)
+        tickers[ticker] = _ticker_entry(ticker, arrays, _ticker_meta(g))
+    return _write_manifest(store_dir, csv_path, offset, numeric_cols, tickers)
+
+
+def append_store(csv_path: str = CSV_PATH, store_dir: str = None):
+    """
+    Merge only the rows appended to the CSV since the store was last built or
+    appended to; only the partitions of tickers in those rows are rewritten.
+    Returns the number of new rows, or None when the CSV was not simply
+    appended to (shrunk, rewritten, or no recorded offset) and needs a rebuild.
+    """
+    store_dir = store_dir or default_store_dir(csv_path)
+    try:
+        manifest = read_manifest(store_dir)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    src = manifest.get("source", {})
+    offset = src.get("offset")
+    if (manifest.get("schema_version") != SCHEMA_VERSION or src.get("path") != os.path.abspath(csv_path)
+            or not offset or os.path.getsize(csv_path) < src.get("size", 0)
+            or _prefix_sha1(csv_path, offset) != src.get("prefix_sha1")):
+        return None
+
+    with open(csv_path, "rb") as f:
+        header = f.readline()
+        f.seek(offset - 1)
+        prev, tail = f.read(1), f.read()
+    if tail and prev not in b"\r\n" and tail[:1] not in b"\r\n":
+        return None                     # the old last row had no newline and the new text ran into it
+    df, numeric_cols = _parse_rows(io.BytesIO(header + tail))
+    if numeric_cols != manifest["numeric_columns"]:
+        return None
+
+    # With the manifest gone, an interrupted append reads as a missing store and is rebuilt
+    os.remove(os.path.join(store_dir, MANIFEST_NAME))
+    tickers = manifest["tickers"]
+    for ticker, g in df.groupby(TICKER_COL, sort=True):
+        arrays, meta = _ticker_arrays(g, numeric_cols), _ticker_meta(g)
+        old = tickers.get(ticker)
+        if old:
+            with np.load(os.path.join(store_dir, old["file"])) as part:
+                arrays = {k: np.concatenate([part[k], v]) for k, v in arrays.items()}
+            # stable: same-day rows keep file order, exactly as a full rebuild sorts them
+            order = np.argsort(arrays["date"], kind="stable")
+            arrays = {k: v[order] for k, v in arrays.items()}
+            if g["_ord"].iloc[0] >= to_ordinal(old["start"]):
+                meta = old["meta"]
+        np.savez(os.path.join(store_dir, f"{ticker}.npz"), **arrays)
+        tickers[ticker] = _ticker_entry(ticker, arrays, meta)
+    _write_manifest(store_dir, csv_path, offset + len(tail), numeric_cols, tickers)
+    return len(df)
+
+
+def read_manifest(store_dir: str) -> dict:
+    with open(os.path.join(store_dir, MANIFEST_NAME), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def is_stale(csv_path: str, store_dir: str = None) -> bool:
+    store_dir = store_dir or default_store_dir(csv_path)
+    try:
+        manifest = read_manifest(store_dir)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return True
+    src = manifest.get("source", {})
+    fp  = _source_fingerprint(csv_path)
+    return (manifest.get("schema_version") != SCHEMA_VERSION
+            or src.get("size") != fp["size"] or src.get("mtime_ns") != fp["mtime_ns"])
+
+
+def ensure_store(csv_path: str = CSV_PATH, store_dir: str = None, rebuild: bool = False) -> str:
+    """
+    Return the store directory for `csv_path`, (re)building it if missing or
+    stale; rows appended to the CSV are merged in without a full rebuild.
+    """
+    store_dir = store_dir or default_store_dir(csv_path)
+    if rebuild or is_stale(csv_path, store_dir):
+        added = None if rebuild else append_store(csv_path, store_dir)
+        if added is None:
+            print(f"[INFO] Building columnar store from {csv_path} ...")
+            build_store(csv_path, store_dir)
+        else:
+            print(f"[INFO] Merged {added} appended rows from {csv_path}")
+    return store_dir
+
+
+# ── Load ──────────────────────────────────────────────────────────────────────
+def list_tickers(store_dir: str) -> list:
+    return sorted(read_manifest(store_dir)["tickers"])
+
+
+def load_ticker(store_dir: str, ticker: str, start=None, end=None, columns=None) -> dict:
+    """
+    Load one ticker partition. Returns {"date": int32[], <column>: float64[], ...}
+    restricted to start <= date <= end (inclusive, either bound optional).
+    Only the requested `columns` are decompressed; an unknown ticker yields {}.
+    """
+    path = os.path.join(store_dir, f"{ticker}.npz")
+    if not os.path.exists(path):
+        return {}
+    with np.load(path) as part:
+        dates = part["date"]
+        lo = 0 if start is None else int(np.searchsorted(dates, to_ordinal(start), side="left"))
+        hi = len(dates) if end is None else int(np.searchsorted(dates, to_ordinal(end), side="right"))
+        names = [c for c in part.files if c != "date"] if columns is None else list(columns)
+        out = {"date": dates[lo:hi]}
+        for c in names:
+            out[c] = part[c][lo:hi]
+    return out
+
+
+def load_frame(store_dir: str, tickers=None, start=None, end=None, columns=None):
+    """
+    Load one or more tickers into a long pandas DataFrame with `Ticker`,
+    `Business Date` (datetime64) and the requested numeric columns.
+    `tickers=None` loads every partition in the store.
+    """
+    import pandas as pd
+
+    if tickers is None:
+        tickers = list_tickers(store_dir)
+    elif isinstance(tickers, str):
+        tickers = [tickers]
+
+    frames = []
+    for t in tickers:
+        cols = load_ticker(store_dir, t, start, end, columns)
+        if not cols or len(cols["date"]) == 0:
+            continue
+        data = {TICKER_COL: t, DATE_COL: ordinals_to_datetime64(cols.pop("date"))}
+        data.update(cols)
+        frames.append(pd.DataFrame(data))
+    if not frames:
+        return pd.DataFrame(columns=[TICKER_COL, DATE_COL] + list(columns or []))
+    return pd.concat(frames, ignore_index=True)
+
+
+# ── Main ──────────────────────────────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Build the columnar short-interest store")
+    parser.add_argument("--csv",   default=CSV_PATH, help="Vendor CSV path")
+    parser.add_argument("--out",   default=None,     help="Store directory (default: <csv dir>/si_store)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the store is fresh")
+    args = parser.parse_args()
+
+    store_dir = ensure_store(args.csv, args.out, rebuild=args.force)
+    manifest  = read_manifest(store_dir)
+    rows = sum(t["rows"] for t in manifest["tickers"].values())
+    print(f"[OK] {len(manifest['tickers'])} tickers, {rows} rows in {store_dir}")
+
+
+if __name__ == "__main__":
+    main()
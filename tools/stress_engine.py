@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+stress_engine.py  —  Short-Alpha Pod | Monte Carlo Regime Stress Test
+======================================================================
+Applies every regime of docs/data/regime_catalog.json to each ticker's
+daily series and measures, over thousands of seeded Monte Carlo paths per
+(ticker, regime), what the shock does to the short book:
+
+  drawdown         worst peak-to-trough loss (%) of a short position on the
+                   exposure series over the shock window (the day before
+                   onset through the longest shock's last day); also on the
+                   same window of the paired unshocked path, and the excess
+                   of the two. Exposure: the price (Simulated_Return,
+                   synthetic runs) or the squeeze score's daily change,
+                   rescaled to EXPOSURE_VOL daily σ (historical — the CSV
+                   carries no price, and the raw score moves ~10% a day)
+  corr breakdown   Pearson(noise(t), SI(t+2) - SI(t)) on the unshocked path
+                   minus the same on the shocked path (stage4's 48h lead)
+  reversion days   days after the shock window until the short position is
+                   back to its value at shock onset (NaN if not within the path)
+
+Paths: a circular block bootstrap of the base series' rows (keeps the
+cross- and auto-correlation of SI, noise, news, retail and returns), `horizon`
+days long, with the shock starting at a random day in the middle half.
+
+Shocks: each catalog shock {var, delta, duration_days} adds delta
+standard deviations of its variable for duration_days, then decays at the
+variable's own lag-1 autocorrelation. How a shocked variable feeds the
+other series (SHOCK_MAP):
+  si, squeeze    short interest (the UI's getSynthetic adds both to SI)
+  news, retail   their index, plus stage4's noise weight x |shock| on noise
+  noise          the noise index
+  returns        r·(1 + VOL_GAIN·|s|) + DRIFT·σ_r·s·direction, where the
+                 direction is +1 when the shock pushes the exposure up
+                 (squeeze pressure, hype, noise, good news) and -1 for SI
+                 declines (covering)
+
+Every (ticker, regime, chunk) draws from a Generator seeded with
+(seed, ticker, regime, chunk); chunks run on a process pool and results do
+not depend on the number of workers.
+
+Output:
+  ./artifacts/stress_report.json   distributions per ticker × regime
+  ./artifacts/stress_summary.csv   one row per ticker × regime
+
+USAGE:
+  python tools/stress_engine.py                                  # historical (stage4 merged_daily)
+  python tools/stress_engine.py --source synthetic --paths 10000 --tickers TSLA SQ
+"""
+
+import os
+import json
+import zlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from artifact_store import has_table, read_table
+from lag_scan import forward_delta, lag_correlations
+from significance import auto_block
+from synthetic import SYNTHETIC_DIR, existing_runs
+
+ROOT          = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR      = os.path.join(ROOT, "docs", "data")
+CATALOG_PATH  = os.path.join(DATA_DIR, "regime_catalog.json")
+ARTIFACTS_DIR = os.path.join(".", "artifacts")
+
+SEED         = 20240501
+PATHS        = 5_000
+CHUNK        = 1_000        # paths per pool task
+HORIZON      = 252          # days per path
+VOL_GAIN     = 0.5          # extra return volatility per σ of shock
+DRIFT        = 0.5          # return drift per σ of shock, in σ_r
+EXPOSURE_VOL = 0.02         # daily σ of the historical exposure proxy
+LEAD         = 2            # the 48h lead of stage4
+QUANTILES    = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+VARS = ["si", "noise", "news", "retail", "returns"]
+
+# catalog var -> (series it shocks, noise loading of |shock|, exposure direction)
+SHOCK_MAP = {
+    "si":      ("si",     0.0,  -1),
+    "squeeze": ("si",     0.0,  +1),
+    "news":    ("news",   0.15, +1),
+    "retail":  ("retail", 0.25, +1),
+    "noise":   ("noise",  0.0,  +1),
+}
+
+# base series columns per source
+SOURCE_COLUMNS = {
+    "historical": {"si": "short_interest_pct", "noise": "noise_index", "news": "news_sentiment_index",
+                   "retail": "retail_hype_index", "returns": "squeeze_score"},
+    "synthetic":  {"si": "Synthetic_Short_Interest_Pct", "news": "News_Sentiment_Index",
+                   "retail": "Retail_Hype_Index", "returns": "Simulated_Return"},
+}
+
+
+# ── Base series ───────────────────────────────────────────────────────────────
+def _z(values: np.ndarray) -> np.ndarray:
+    sd = values.std(ddof=1)
+    return (values - values.mean()) / sd if sd > 0 else values * 0
+
+
+def load_base(ticker: str, source: str = "historical", run: int = None,
+              artifacts_dir: str = ARTIFACTS_DIR, synthetic_dir: str = SYNTHETIC_DIR) -> np.ndarray:
+    """(T, len(VARS)) float array of one ticker's base series, or None when unavailable."""
+    cols = SOURCE_COLUMNS[source]
+    if source == "historical":
+        if not has_table("merged_daily", ticker, artifacts_dir):
+            return None
+        frame = read_table("merged_daily", ticker, artifacts_dir, columns=list(cols.values()))
+    else:
+        runs = [run] if run is not None else existing_runs(ticker, synthetic_dir)[::-1]
+        path = None
+        for n in runs:
+            p = os.path.join(synthetic_dir, ticker, str(n), "synthetic.csv")
+            # hand-made runs have no return column
+            if os.path.exists(p) and cols["returns"] in pd.read_csv(p, nrows=0).columns:
+                path = p
+                break
+        if not path:
+            return None
+        frame = pd.read_csv(path, usecols=list(cols.values()))
+
+    base = {v: frame[c].to_numpy(dtype=float) for v, c in cols.items()}
+    if source == "historical":
+        # score points are not a price: demeaned daily change at a stock-like σ
+        change = np.diff(base["returns"], prepend=np.nan)
+        sd = np.nanstd(change, ddof=1)
+        base["returns"] = (change - np.nanmean(change)) / sd * EXPOSURE_VOL if sd > 0 else change * 0
+    if "noise" not in base:
+        # synthetic runs: stage4's news / retail noise terms on what they carry
+        base["noise"] = (SHOCK_MAP["news"][1] * _z(np.abs(base["news"]))
+                         + SHOCK_MAP["retail"][1] * _z(np.abs(base["retail"])))
+    r = base["returns"]
+    base["returns"] = np.clip(np.where(np.isfinite(r), r, 0.0), -1.0, 1.0)
+    out = np.column_stack([base[v] for v in VARS])
+    out = out[np.isfinite(out).all(axis=1)]
+    return out if len(out) > 2 * LEAD + 2 else None
+
+
+def series_stats(base: np.ndarray) -> tuple:
+    """(σ, lag-1 autocorrelation clipped to [0, 0.99]) per column of VARS."""
+    sd = base.std(axis=0, ddof=1)
+    c = base - base.mean(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        phi = (c[1:] * c[:-1]).sum(axis=0) / (c * c).sum(axis=0)
+    return sd, np.clip(np.nan_to_num(phi), 0.0, 0.99)
+
+
+# ── Core (arrays) ─────────────────────────────────────────────────────────────
+def _rng(seed: int, key, chunk: int) -> np.random.Generator:
+    return np.random.default_rng([seed & 0xFFFFFFFF, *(zlib.crc32(str(k).encode("utf-8")) for k in key), chunk])
+
+
+def bootstrap_paths(base: np.ndarray, n_paths: int, horizon: int, rng: np.random.Generator) -> np.ndarray:
+    """(n_paths, horizon, V) circular block bootstrap of the rows of `base`."""
+    T = len(base)
+    block = auto_block(T)
+    k = -(-horizon // block)
+    starts = rng.integers(0, T, size=(n_paths, k))
+    idx = ((starts[:, :, None] + np.arange(block)) % T).reshape(n_paths, k * block)[:, :horizon]
+    return base[idx]
+
+
+def shock_profiles(shocks: list, onset: np.ndarray, horizon: int, phi: np.ndarray) -> dict:
+    """{catalog var: (P, H) shock in σ units}: delta over the window, then decay at that series' φ."""
+    t = np.arange(horizon)[None, :]
+    out = {}
+    for sh in shocks:
+        var = sh["var"]
+        if var not in SHOCK_MAP:
+            continue
+        end = onset[:, None] + int(sh["duration_days"])
+        decay = phi[VARS.index(SHOCK_MAP[var][0])]
+        after = np.clip(t - end + 1, 0, None)
+        s = np.where(t < onset[:, None], 0.0,
+                     np.where(t < end, sh["delta"], sh["delta"] * decay ** after))
+        out[var] = out.get(var, 0.0) + s
+    return out
+
+
+def _short_equity(returns: np.ndarray) -> np.ndarray:
+    """Value of a daily-rebalanced short position, starting at 1."""
+    return np.cumprod(1.0 - returns, axis=-1)
+
+
+def _max_drawdown(equity: np.ndarray, window: np.ndarray) -> np.ndarray:
+    """Worst peak-to-trough loss (%) of each path over the days where `window` is True."""
+    eq = np.where(window, equity, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.nanmin(eq / np.fmax.accumulate(eq, axis=-1) - 1.0, axis=-1) * 100
+
+
+def _lead_corr(noise: np.ndarray, si: np.ndarray) -> np.ndarray:
+    corr, _ = lag_correlations(noise, forward_delta(si, LEAD), max_lag=0)
+    return corr[..., 0]
+
+
+def stress_chunk(base: np.ndarray, shocks: list, n_paths: int, horizon: int, seed: int, key, chunk: int) -> dict:
+    """Per-path metrics of one chunk of paths for one (ticker, regime)."""
+    rng = _rng(seed, key, chunk)
+    horizon = min(horizon, len(base))
+    X = bootstrap_paths(base, n_paths, horizon, rng)
+    sd, phi = series_stats(base)
+    lo = horizon // 4
+    onset = rng.integers(lo, max(lo + 1, horizon // 2), size=n_paths)
+    S = shock_profiles(shocks, onset, horizon, phi)
+
+    i = {v: VARS.index(v) for v in VARS}
+    si, noise, r = X[..., i["si"]].copy(), X[..., i["noise"]].copy(), X[..., i["returns"]]
+    vol_mult = np.ones_like(r)
+    drift = np.zeros_like(r)
+    for var, s in S.items():
+        target, loading, direction = SHOCK_MAP[var]
+        if target == "si":
+            si += s * sd[i["si"]]
+        elif target == "noise":
+            noise += s * sd[i["noise"]]
+        else:
+            noise += loading * np.abs(s)
+        vol_mult += VOL_GAIN * np.abs(s)
+        drift += DRIFT * sd[i["returns"]] * s * direction
+    r_stress = np.clip(r * vol_mult + drift, -1.0, 1.0)
+
+    eq_base, eq_stress = _short_equity(r), _short_equity(r_stress)
+    end = onset + max((int(sh["duration_days"]) for sh in shocks), default=0)
+    rows = np.arange(n_paths)
+    level = np.where(onset > 0, eq_stress[rows, np.maximum(onset - 1, 0)], 1.0)
+    t = np.arange(horizon)[None, :]
+    back = (eq_stress >= level[:, None]) & (t >= end[:, None])
+    reverted = back.any(axis=1)
+    reversion = np.where(reverted, back.argmax(axis=1) - end, np.nan)
+    window = (t >= np.maximum(onset - 1, 0)[:, None]) & (t < end[:, None])
+    dd_stress, dd_base = _max_drawdown(eq_stress, window), _max_drawdown(eq_base, window)
+
+    return {
+        "drawdown":       dd_stress,
+        "drawdown_base":  dd_base,
+        "drawdown_excess": dd_stress - dd_base,
+        "corr_base":      _lead_corr(X[..., i["noise"]], X[..., i["si"]]),
+        "corr_stress":    _lead_corr(noise, si),
+        "reversion_days": reversion.astype(float),
+    }
+
+
+# ── Sweep ─────────────────────────────────────────────────────────────────────
+def _quantiles(values: np.ndarray) -> dict:
+    v = values[np.isfinite(values)]
+    if not len(v):
+        return None
+    q = np.quantile(v, QUANTILES)
+    out = {f"p{int(p * 100)}": round(float(x), 4) for p, x in zip(QUANTILES, q)}
+    out["mean"] = round(float(v.mean()), 4)
+    return out
+
+
+def summarize(metrics: dict, regime: dict) -> dict:
+    breakdown = metrics["corr_base"] - metrics["corr_stress"]
+    rev = metrics["reversion_days"]
+    expected = regime.get("mean_reversion_days")
+    return {
+        "paths":                 int(len(rev)),
+        "drawdown_pct":          _quantiles(metrics["drawdown"]),
+        "drawdown_base_pct":     _quantiles(metrics["drawdown_base"]),
+        "drawdown_excess_pct":   _quantiles(metrics["drawdown_excess"]),
+        "corr_breakdown":        _quantiles(breakdown),
+        "corr_sign_flip_rate":   round(float(np.mean((metrics["corr_base"] > 0) & (metrics["corr_stress"] <= 0))), 4),
+        "reversion_days":        _quantiles(rev),
+        "reverted_rate":         round(float(np.isfinite(rev).mean()), 4),
+        "reverted_within_expected_rate": (round(float(np.mean(rev <= expected)), 4)
+                                          if expected is not None else None),
+        "typical_drawdown_pct":  regime.get("typical_drawdown_pct"),
+        "expected_failure_modes": regime.get("expected_failure_modes", []),
+    }
+
+
+def run_sweep(tickers, regimes: list, source: str = "historical", n_paths: int = PATHS,
+              horizon: int = HORIZON, seed: int = SEED, pool=None, run: int = None) -> dict:
+    """{ticker: {scenario_id: summary}} for every ticker with a base series."""
+    jobs, skipped = [], []
+    for ticker in tickers:
+        base = load_base(ticker, source, run)
+        if base is None:
+            skipped.append(ticker)
+            continue
+        for regime in regimes:
+            for c, start in enumerate(range(0, n_paths, CHUNK)):
+                jobs.append((ticker, regime, (base, regime["shocks"], min(CHUNK, n_paths - start), horizon,
+                                              seed, (ticker, regime["scenario_id"]), c)))
+    if skipped:
+        print(f"[WARN] No {source} series for: {', '.join(skipped)}")
+
+    args = [a for _, _, a in jobs]
+    if pool is None:
+        parts = [stress_chunk(*a) for a in args]
+    else:
+        parts = list(pool.map(stress_chunk, *zip(*args))) if args else []
+
+    grouped = {}
+    for (ticker, regime, _), part in zip(jobs, parts):
+        grouped.setdefault((ticker, regime["scenario_id"]), (regime, []))[1].append(part)
+    report = {}
+    for (ticker, sid), (regime, chunks) in grouped.items():
+        metrics = {k: np.concatenate([c[k] for c in chunks]) for k in chunks[0]}
+        report.setdefault(ticker, {})[sid] = summarize(metrics, regime)
+    return report
+
+
+def summary_frame(report: dict) -> pd.DataFrame:
+    rows = []
+    for ticker, regimes in report.items():
+        for sid, s in regimes.items():
+            q = lambda k, p: (s[k] or {}).get(p)
+            rows.append({
+                "ticker": ticker, "scenario_id": sid, "paths": s["paths"],
+                "drawdown_p50": q("drawdown_pct", "p50"), "drawdown_p5": q("drawdown_pct", "p5"),
+                "drawdown_base_p50": q("drawdown_base_pct", "p50"),
+                "drawdown_excess_p50": q("drawdown_excess_pct", "p50"),
+                "corr_breakdown_p50": q("corr_breakdown", "p50"),
+                "corr_sign_flip_rate": s["corr_sign_flip_rate"],
+                "reversion_p50": q("reversion_days", "p50"), "reverted_rate": s["reverted_rate"],
+                "typical_drawdown_pct": s["typical_drawdown_pct"],
+            })
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo regime stress test (regime_catalog.json)")
+    parser.add_argument("--tickers",  nargs="+", default=None, help="Default: catalog ticker_sector_map")
+    parser.add_argument("--regimes",  nargs="+", default=None, help="scenario_ids (default: all)")
+    parser.add_argument("--source",   choices=list(SOURCE_COLUMNS), default="historical")
+    parser.add_argument("--run",      type=int, default=None, help="Synthetic run (default: latest with returns)")
+    parser.add_argument("--paths",    type=int, default=PATHS)
+    parser.add_argument("--horizon",  type=int, default=HORIZON)
+    parser.add_argument("--seed",     type=int, default=SEED)
+    parser.add_argument("--workers",  type=int, default=os.cpu_count(), help="0 = in-process")
+    parser.add_argument("--catalog",  default=CATALOG_PATH)
+    parser.add_argument("--out",      default=ARTIFACTS_DIR)
+    args = parser.parse_args()
+
+    with open(args.catalog, encoding="utf-8") as f:
+        catalog = json.load(f)
+    regimes = [r for r in catalog["regimes"] if not args.regimes or r["scenario_id"] in args.regimes]
+    tickers = [t.upper() for t in (args.tickers or catalog.get("ticker_sector_map", {}))]
+
+    pool = ProcessPoolExecutor(args.workers) if args.workers and args.workers > 1 else None
+    try:
+        report = run_sweep(tickers, regimes, args.source, args.paths, args.horizon, args.seed, pool, args.run)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if not report:
+        print("[FAIL] No base series to stress")
+        return
+
+    os.makedirs(args.out, exist_ok=True)
+    doc = {"source": args.source, "paths": args.paths, "horizon": args.horizon, "seed": args.seed,
+           "tickers": report}
+    with open(os.path.join(args.out, "stress_report.json"), "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2)
+    summary_frame(report).to_csv(os.path.join(args.out, "stress_summary.csv"), index=False)
+    print(f"[OK] {len(report)} tickers × {len(regimes)} regimes × {args.paths} paths -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
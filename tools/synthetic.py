@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+synthetic.py  —  Short-Alpha Pod | Multi-Scenario Synthetic Generator
+======================================================================
+Vectorized version of stage5's squeeze-path generator: N scenarios ×
+tickers of `days`-long daily series, built as (scenarios, days) arrays per
+batch instead of one path with Python loops.
+
+Model (per scenario; every knob lives in DEFAULT_PARAMS):
+  short interest   base_si + for each event e: a linear buildup of
+                   `buildup_height` over the `buildup_days` before e, then a
+                   `squeeze_days` linear drop starting at e; plus N(0, si_noise),
+                   clipped to si_clip. Event days move by up to ±event_jitter
+                   days and heights by ±height_jitter (fraction) per scenario.
+  news sentiment   N(0, sent_noise) + U(sent_spike) within ±spike_halfwidth of e
+  retail hype      |N(0, hype_noise)| + U(hype_spike) in the same window, clipped to [0, 1]
+  volatility       U(vol_floor) + vol_per_sent·|sentiment| + vol_per_si·si / si_clip max
+  returns          N(0, volatility) + U(squeeze_return) on the `return_days` from e
+
+With the defaults this is exactly stage5's original path (same events,
+ramps and noise levels).
+
+Reproducibility: run n of a ticker draws from its own np.random.Generator
+seeded with (seed, crc32(ticker), n), so a run's content depends only on
+those three values, not on batch size or on which other runs are generated.
+
+Output (streamed one batch at a time):
+  docs/data/synthetic/<TICKER>/<n>/synthetic.csv   (.json too with --json)
+      day, date, Synthetic_Short_Interest_Pct, News_Sentiment_Index,
+      Retail_Hype_Index, Price_Action_Volatility, Simulated_Return
+  docs/data/synthetic/<TICKER>/manifest.json        params sets + per-run seed and events
+
+New runs are numbered after the highest existing run of each ticker, so the
+hand-made runs are never overwritten.
+
+USAGE:
+  python tools/synthetic.py --tickers TSLA SQ --runs 1000
+  python tools/synthetic.py --tickers TSLA --runs 50 --params my_params.json --json
+
+  # From code
+  batch = generate_batch(["TSLA"] * 3, [1, 2, 3])     # {"si": (3, 1095), ...}
+"""
+
+import os
+import json
+import zlib
+import hashlib
+import argparse
+
+import numpy as np
+import pandas as pd
+
+ROOT          = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR      = os.path.join(ROOT, "docs", "data")
+SYNTHETIC_DIR = os.path.join(DATA_DIR, "synthetic")
+
+SEED           = 20240501
+BATCH          = 256          # scenarios generated and written per step
+SCHEMA_VERSION = "1.0"
+
+DEFAULT_PARAMS = {
+    "days":            1095,
+    "start":           "2022-01-01",
+    "base_si":         10.0,
+    "si_clip":         [1.0, 40.0],
+    "si_noise":        0.5,
+    "event_days":      [200, 600, 950],
+    "event_jitter":    0,          # ± days per scenario and event
+    "buildup_days":    100,
+    "buildup_height":  20.0,
+    "height_jitter":   0.0,        # ± fraction of buildup_height per scenario and event
+    "squeeze_days":    10,
+    "sent_noise":      0.1,
+    "sent_spike":      [0.4, 0.8],
+    "spike_halfwidth": 5,
+    "hype_noise":      0.05,
+    "hype_spike":      [0.3, 0.9],
+    "vol_floor":       [0.01, 0.03],
+    "vol_per_sent":    0.1,
+    "vol_per_si":      0.05,
+    "squeeze_return":  [0.05, 0.15],
+    "return_days":     5,
+}
+
+SERIES = ["si", "news_sentiment", "retail_hype", "volatility", "returns"]
+
+# output column -> (series, decimals), in file order
+COLUMNS = {
+    "Synthetic_Short_Interest_Pct": ("si", 2),
+    "News_Sentiment_Index":         ("news_sentiment", 4),
+    "Retail_Hype_Index":            ("retail_hype", 4),
+    "Price_Action_Volatility":      ("volatility", 4),
+    "Simulated_Return":             ("returns", 4),
+}
+
+
+def run_rng(seed: int, ticker: str, run: int) -> np.random.Generator:
+    """The Generator of one (ticker, run); independent of batching."""
+    return np.random.default_rng([seed & 0xFFFFFFFF, zlib.crc32(ticker.encode("utf-8")), int(run)])
+
+
+def merge_params(overrides: dict = None) -> dict:
+    params = dict(DEFAULT_PARAMS)
+    unknown = set(overrides or {}) - set(params)
+    if unknown:
+        raise ValueError(f"Unknown synthetic parameters: {', '.join(sorted(unknown))}")
+    params.update(overrides or {})
+    return params
+
+
+# ── Core (arrays) ─────────────────────────────────────────────────────────────
+def _add_windows(target: np.ndarray, start: np.ndarray, width: int, values: np.ndarray):
+    """target[s, start[s, k] + j] += values[s, k, j] for j < width, dropping columns off the edge."""
+    S, T = target.shape
+    cols = start[:, :, None] + np.arange(width)
+    rows = np.broadcast_to(np.arange(S)[:, None, None], cols.shape)
+    ok = (cols >= 0) & (cols < T)
+    np.add.at(target, (rows[ok], cols[ok]), values[ok])
+
+
+def generate_batch(tickers, runs, params: dict = None, seed: int = SEED) -> dict:
+    """
+    One scenario per (tickers[i], runs[i]). Returns {series: (S, days) float64}
+    for every name in SERIES, plus "event_days" (S, K) int and "heights" (S, K).
+    """
+    p = merge_params(params)
+    S, T, K = len(runs), int(p["days"]), len(p["event_days"])
+    W, R = 2 * int(p["spike_halfwidth"]), int(p["return_days"])
+
+    # per-scenario draws, each from that run's own Generator, in a fixed order
+    offsets = np.zeros((S, K), dtype=np.int64)
+    scale = np.ones((S, K))
+    si_noise, sent, hype, vol, z = (np.empty((S, T)) for _ in range(5))
+    sent_spike, hype_spike = np.empty((S, K, W)), np.empty((S, K, W))
+    ret_spike = np.empty((S, K, R))
+    for s, (ticker, run) in enumerate(zip(tickers, runs)):
+        rng = run_rng(seed, ticker, run)
+        if p["event_jitter"]:
+            offsets[s] = rng.integers(-p["event_jitter"], p["event_jitter"] + 1, size=K)
+        if p["height_jitter"]:
+            scale[s] = rng.uniform(1 - p["height_jitter"], 1 + p["height_jitter"], size=K)
+        si_noise[s] = rng.normal(0, p["si_noise"], T)
+        sent[s] = rng.normal(0, p["sent_noise"], T)
+        sent_spike[s] = rng.uniform(*p["sent_spike"], size=(K, W))
+        hype[s] = np.abs(rng.normal(0, p["hype_noise"], T))
+        hype_spike[s] = rng.uniform(*p["hype_spike"], size=(K, W))
+        vol[s] = rng.uniform(*p["vol_floor"], size=T)
+        z[s] = rng.standard_normal(T)
+        ret_spike[s] = rng.uniform(*p["squeeze_return"], size=(K, R))
+
+    events = np.asarray(p["event_days"], dtype=np.int64)[None, :] + offsets      # (S, K)
+    heights = p["buildup_height"] * scale                                          # (S, K)
+
+    # ramps: rel = day - event, (S, K, T); buildup on [-L, 0), squeeze on [0, Sq)
+    L, Sq = int(p["buildup_days"]), int(p["squeeze_days"])
+    rel = np.arange(T)[None, None, :] - events[:, :, None]
+    h = heights[:, :, None]
+    ramp = (np.where((rel >= -L) & (rel < 0), (rel + L) / L * h, 0.0)
+            - np.where((rel >= 0) & (rel < Sq), rel / Sq * h, 0.0))
+    lo, hi = p["si_clip"]
+    si = np.clip(p["base_si"] + ramp.sum(axis=1) + si_noise, lo, hi)
+
+    _add_windows(sent, events - p["spike_halfwidth"], W, sent_spike)
+    _add_windows(hype, events - p["spike_halfwidth"], W, hype_spike)
+    hype = np.clip(hype, 0.0, 1.0)
+
+    vol += np.abs(sent) * p["vol_per_sent"] + si / hi * p["vol_per_si"]
+    returns = z * vol
+    _add_windows(returns, events, R, ret_spike)
+
+    return {"si": si, "news_sentiment": sent, "retail_hype": hype, "volatility": vol,
+            "returns": returns, "event_days": events, "heights": heights}
+
+
+def batch_dates(params: dict = None) -> np.ndarray:
+    p = merge_params(params)
+    return pd.date_range(p["start"], periods=int(p["days"]), freq="D").strftime("%Y-%m-%d").to_numpy()
+
+
+# ── Write ─────────────────────────────────────────────────────────────────────
+def existing_runs(ticker: str, out_dir: str = SYNTHETIC_DIR) -> list:
+    tdir = os.path.join(out_dir, ticker)
+    if not os.path.isdir(tdir):
+        return []
+    return sorted(int(d) for d in os.listdir(tdir) if d.isdigit())
+
+
+def run_frame(batch: dict, i: int, dates: np.ndarray) -> pd.DataFrame:
+    """Scenario i of a batch as the UI's synthetic.csv / .json table."""
+    frame = pd.DataFrame({"day": np.arange(len(dates)), "date": dates})
+    for col, (series, digits) in COLUMNS.items():
+        frame[col] = np.round(batch[series][i], digits)
+    return frame
+
+
+def write_runs(ticker: str, runs, params: dict = None, seed: int = SEED, out_dir: str = SYNTHETIC_DIR,
+               as_json: bool = False, batch_size: int = BATCH) -> int:
+    """Generate and write `runs` of one ticker, `batch_size` scenarios at a time. Returns runs written."""
+    p = merge_params(params)
+    dates = batch_dates(p)
+    tdir = os.path.join(out_dir, ticker)
+    manifest_path = os.path.join(tdir, "manifest.json")
+    manifest = {"schema_version": SCHEMA_VERSION, "params": {}, "runs": {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    params_id = hashlib.sha1(json.dumps(p, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    manifest["params"][params_id] = p
+
+    runs = list(runs)
+    for i in range(0, len(runs), batch_size):
+        chunk = runs[i:i + batch_size]
+        batch = generate_batch([ticker] * len(chunk), chunk, p, seed)
+        for j, n in enumerate(chunk):
+            rdir = os.path.join(tdir, str(n))
+            os.makedirs(rdir, exist_ok=True)
+            frame = run_frame(batch, j, dates)
+            frame.to_csv(os.path.join(rdir, "synthetic.csv"), index=False)
+            if as_json:
+                with open(os.path.join(rdir, "synthetic.json"), "w", encoding="utf-8") as f:
+                    json.dump(frame.to_dict(orient="records"), f, indent=2)
+            manifest["runs"][str(n)] = {
+                "seed":       seed,
+                "params":     params_id,
+                "event_days": batch["event_days"][j].tolist(),
+                "heights":    np.round(batch["heights"][j], 4).tolist(),
+            }
+        print(f"[INFO] {ticker}: runs {chunk[0]}..{chunk[-1]} written")
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    return len(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate reproducible synthetic squeeze scenarios")
+    parser.add_argument("--tickers", nargs="+", required=True)
+    parser.add_argument("--runs",    type=int, default=100, help="New runs per ticker")
+    parser.add_argument("--first",   type=int, default=None,
+                        help="First run number (default: after the ticker's highest existing run)")
+    parser.add_argument("--seed",    type=int, default=SEED)
+    parser.add_argument("--params",  default=None, help="JSON file overriding DEFAULT_PARAMS")
+    parser.add_argument("--out",     default=SYNTHETIC_DIR)
+    parser.add_argument("--json",    action="store_true", help="Also write synthetic.json per run")
+    parser.add_argument("--batch",   type=int, default=BATCH)
+    args = parser.parse_args()
+
+    params = None
+    if args.params:
+        with open(args.params, encoding="utf-8") as f:
+            params = json.load(f)
+
+    total = 0
+    for ticker in (t.upper() for t in args.tickers):
+        first = args.first if args.first is not None else max(existing_runs(ticker, args.out), default=0) + 1
+        total += write_runs(ticker, range(first, first + args.runs), params, args.seed, args.out,
+                            args.json, args.batch)
+    print(f"[OK] {total} synthetic runs written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,11 @@ URL Integrity Audit for Short-Alpha Pod demo caches.
 Produces docs/data/url_audit.json with per-URL results.
 NewsAPI: NOT called. All evidence is deterministic DEMO mock.
 """
-import json, re, os, sys
+import json, re, os, sys, shutil, tempfile
 from urllib.parse import urlparse
 
+from evidence_store import iter_evidence
+
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 NEWS_CACHE  = os.path.join(ROOT, "docs", "data", "news_demo_cache.json")
 RETAIL_CACHE = os.path.join(ROOT, "docs", "data", "retail_demo_cache.json")
@@ -49,17 +51,21 @@ def classify_url(url, mode, existing_flags):
 
     return "OK", flags
 
-def audit_cache(path, label):
-    items = json.load(open(path, encoding="utf-8"))
-    results = []
+def audit_cache(path, label, spool):
+    """
+    Stream one cache's partitions (label is the evidence kind, "news" / "retail"),
+    writing each per-URL result to `spool` already formatted as an element of the
+    final indented JSON list. Returns (item_count, counts); memory stays constant.
+    """
+    n = 0
     counts = {"EMPTY": 0, "INVALID_SYNTAX": 0, "PLACEHOLDER": 0, "CONSTRUCTED_DEMO": 0, "OK": 0}
-    for item in items:
+    for item in iter_evidence(source=label, cache_path=path):
         url   = item.get("url", "")
         mode  = item.get("mode", "DEMO")
         flags = item.get("quality_flags", [])
         cls, new_flags = classify_url(url, mode, flags)
         counts[cls] = counts.get(cls, 0) + 1
-        results.append({
+        result = {
             "id":         item.get("id"),
             "ticker":     item.get("ticker"),
             "provider":   item.get("provider"),
@@ -67,48 +73,73 @@ def audit_cache(path, label):
             "classification": cls,
             "quality_flags": new_flags,
             "mode":        mode
-        })
-    return results, counts
-
-print("Auditing news cache ...")
-news_results, news_counts = audit_cache(NEWS_CACHE, "news")
-print("Auditing retail cache ...")
-ret_results,  ret_counts  = audit_cache(RETAIL_CACHE, "retail")
-
-# Merge counts
-total_counts = {}
-for k in set(list(news_counts) + list(ret_counts)):
-    total_counts[k] = news_counts.get(k, 0) + ret_counts.get(k, 0)
-
-audit = {
-    "generated_at": "2026-02-27T04:48:56+08:00",
-    "newsapi_called": False,
-    "all_items_mode_demo": True,
-    "summary": {
-        "news_items": len(news_results),
-        "retail_items": len(ret_results),
-        "total": len(news_results) + len(ret_results),
-        "counts_news": news_counts,
-        "counts_retail": ret_counts,
-        "counts_total": total_counts,
-    },
-    "compliance": {
-        "NewsAPI_called": "NO",
-        "Browser_evidence_real": "NO — all items are deterministic DEMO mocks from generate_demo_caches.py",
-        "URLs_externally_verified": "NO",
-        "URL_integrity": "FAIL — all DEMO items have CONSTRUCTED_DEMO or worse URLs"
-    },
-    "news": news_results,
-    "retail": ret_results
-}
-
-with open(OUT_PATH, "w", encoding="utf-8") as f:
-    json.dump(audit, f, indent=2, ensure_ascii=False)
-
-print(f"\nAudit written to {OUT_PATH}")
-print(f"\n=== TOTALS ===")
-for k, v in total_counts.items():
-    print(f"  {k:20s}: {v}")
-print(f"\nNewsAPI called:       NO")
-print(f"Browser evidence real: NO")
-print(f"Total items audited:  {audit['summary']['total']}")
+        }
+        text = json.dumps(result, indent=2, ensure_ascii=False).replace("\n", "\n    ")
+        spool.write((",\n    " if n else "    ") + text)
+        n += 1
+    return n, counts
+
+def write_list(out, key, spool, n, last=False):
+    """Copy a spooled result list into `out` as `"key": [...]` at top-level indent."""
+    if n == 0:
+        out.write(f'  "{key}": []')
+    else:
+        out.write(f'  "{key}": [\n')
+        spool.seek(0)
+        shutil.copyfileobj(spool, out)
+        out.write("\n  ]")
+    out.write("\n" if last else ",\n")
+
+def main():
+    news_spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+    ret_spool  = tempfile.TemporaryFile("w+", encoding="utf-8")
+    print("Auditing news cache ...")
+    news_n, news_counts = audit_cache(NEWS_CACHE, "news", news_spool)
+    print("Auditing retail cache ...")
+    ret_n,  ret_counts  = audit_cache(RETAIL_CACHE, "retail", ret_spool)
+
+    # Merge counts
+    total_counts = {}
+    for k in set(list(news_counts) + list(ret_counts)):
+        total_counts[k] = news_counts.get(k, 0) + ret_counts.get(k, 0)
+
+    audit = {
+        "generated_at": "2026-02-27T04:48:56+08:00",
+        "newsapi_called": False,
+        "all_items_mode_demo": True,
+        "summary": {
+            "news_items": news_n,
+            "retail_items": ret_n,
+            "total": news_n + ret_n,
+            "counts_news": news_counts,
+            "counts_retail": ret_counts,
+            "counts_total": total_counts,
+        },
+        "compliance": {
+            "NewsAPI_called": "NO",
+            "Browser_evidence_real": "NO — all items are deterministic DEMO mocks from generate_demo_caches.py",
+            "URLs_externally_verified": "NO",
+            "URL_integrity": "FAIL — all DEMO items have CONSTRUCTED_DEMO or worse URLs"
+        }
+    }
+
+    # Header fields first, then the two result lists copied from their spools
+    with open(OUT_PATH, "w", encoding="utf-8") as f:
+        f.write(json.dumps(audit, indent=2, ensure_ascii=False)[:-2] + ",\n")
+        write_list(f, "news", news_spool, news_n)
+        write_list(f, "retail", ret_spool, ret_n, last=True)
+        f.write("}")
+    news_spool.close()
+    ret_spool.close()
+
+    print(f"\nAudit written to {OUT_PATH}")
+    print(f"\n=== TOTALS ===")
+    for k, v in total_counts.items():
+        print(f"  {k:20s}: {v}")
+    print(f"\nNewsAPI called:       NO")
+    print(f"Browser evidence real: NO")
+    print(f"Total items audited:  {audit['summary']['total']}")
+
+
+if __name__ == "__main__":
+    main()
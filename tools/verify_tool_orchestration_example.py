@@ -13,17 +13,20 @@ Usage:
 """
 
 import json, math, argparse, os, sys
-from collections import defaultdict
+
+from evidence_store import load_evidence
+from indices import ticker_series
 
 ROOT     = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(ROOT, "docs", "data")
 
-def load_cache(filename):
+def load_cache(filename, kind, ticker):
     path = os.path.join(DATA_DIR, filename)
     if not os.path.exists(path):
         print(f"[WARN] Missing: {path}")
         return []
-    return json.load(open(path, encoding="utf-8"))
+    # Ticker-partitioned store: only this ticker's files are read
+    return load_evidence(kind, ticker, cache_path=path)
 
 def pearson(x, y):
     n = min(len(x), len(y))
@@ -46,85 +49,33 @@ def main():
     spotlight_day = args.day
 
     # ── 1. Load caches ──────────────────────────────────────────────────────
-    news_all   = load_cache("news_demo_cache.json")
-    retail_all = load_cache("retail_demo_cache.json")
-    news   = [x for x in news_all   if x.get("ticker") == ticker]
-    retail = [x for x in retail_all if x.get("ticker") == ticker]
+    news   = load_cache("news_demo_cache.json", "news", ticker)
+    retail = load_cache("retail_demo_cache.json", "retail", ticker)
 
     if not news:
         print(f"[FAIL] No news items for {ticker} in DEMO cache."); sys.exit(1)
 
-    # ── 2. Per-day buckets (mirrors DataHub.computeRealIndices L1066–1088) ──
-    newsCount   = defaultdict(int)
-    newsSentSum = defaultdict(float)
-    newsSentN   = defaultdict(int)
-    retailEngSum  = defaultdict(float)
-    retailHypeSum = defaultdict(float)
-    retailN       = defaultdict(int)
-
-    SWAN_TAGS = {'regulatory','fraud','liquidity','lawsuit','halt','bankruptcy','sec','downgrade'}
-    swanDays  = set()
-
-    for n in news:
-        d = (n.get("published_at_utc",""))[:10]
-        if not d: continue
-        newsCount[d]   += 1
-        s = n.get("metrics",{}).get("sentiment", 0) or 0
-        newsSentSum[d] += s
-        newsSentN[d]   += 1
-        shock = abs(n.get("metrics",{}).get("shock", 0) or 0)
-        tags  = [str(t).lower() for t in n.get("tags",[])]
-        if any(t in SWAN_TAGS for t in tags) or shock > 5:
-            swanDays.add(d)
-
-    for r in retail:
-        d = (r.get("published_at_utc",""))[:10]
-        if not d: continue
-        eng  = r.get("metrics",{}).get("engagement", 1) or 1
-        hype = abs(r.get("metrics",{}).get("sentiment", 0) or 0)
-        retailEngSum[d]  += eng
-        retailHypeSum[d] += hype
-        retailN[d]       += 1
-        tags = [str(t).lower() for t in r.get("tags",[])]
-        if any(t in SWAN_TAGS for t in tags) or hype > 0.9:
-            swanDays.add(d)
-
-    # ── 3. Normalization and z-score (mirrors L1091–1125) ───────────────────
-    all_days_sorted = sorted(set(list(newsCount.keys()) + list(retailEngSum.keys())))
-    maxN = max(newsCount.values(),   default=1)
-    maxR = max(retailEngSum.values(), default=1)
-
-    rawCombined = []
-    for d in all_days_sorted:
-        nv = newsCount[d] / maxN
-        rv = retailEngSum[d] / maxR
-        rawCombined.append(0.6 * nv + 0.4 * rv)
-
-    cMean = sum(rawCombined) / len(rawCombined)
-    cVar  = sum((x-cMean)**2 for x in rawCombined) / len(rawCombined)
-    cStd  = math.sqrt(cVar) or 1
+    # ── 2–3. Per-day buckets, normalization and z-score ─────────────────────
+    # tools/indices.py is the vectorized port of DataHub.computeRealIndices; the
+    # z-score here runs over the days that have evidence rather than CSV days.
+    ix = ticker_series(ticker, news, retail, calendar="evidence")
+    all_days_sorted = ix["d"].tolist()
+    maxN  = ix["max_news_count"].iloc[0]
+    maxR  = ix["max_retail_engagement"].iloc[0]
+    cMean = ix["noise_mean"].iloc[0]
+    cStd  = ix["noise_std"].iloc[0]
+    retailN = dict(zip(ix["d"], ix["rn"].astype(int)))
 
     series = {}
-    for i, d in enumerate(all_days_sorted):
-        nc = newsCount[d]
-        re = retailEngSum[d]
-        nv = nc / maxN
-        rv = re / maxR
-        nsCnt = newsSentN[d]
-        ns = (newsSentSum[d] / nsCnt) if nsCnt > 0 else 0
-        rn = retailN[d]
-        rh = min(1, retailHypeSum[d]/rn) if rn > 0 else 0
-        zNoise   = (rawCombined[i] - cMean) / cStd
-        noiseRaw = max(-5, min(5, zNoise))
-        noise_index = round((noiseRaw + 5) * 10, 2)
-        series[d] = {
-            "nc": nc, "re": re,
-            "nv": round(nv,4), "rv": round(rv,4),
-            "ns": round(ns,4), "rh": round(rh,4),
-            "raw_combined": round(0.6*nv+0.4*rv, 6),
-            "z_noise": round(zNoise, 4),
-            "noise_index": noise_index,
-            "swan": 1 if d in swanDays else 0,
+    for row in ix.itertuples(index=False):
+        series[row.d] = {
+            "nc": int(row.nc), "re": float(row.re),
+            "nv": round(row.news_volume,4), "rv": round(row.retail_chatter_volume,4),
+            "ns": round(row.news_sentiment_index,4), "rh": round(row.retail_hype_index,4),
+            "raw_combined": round(row.raw_combined, 6),
+            "z_noise": round(row.z_noise, 4),
+            "noise_index": float(row.noise_index),
+            "swan": int(row.swan),
         }
 
     # ── 4. Spotlight day ────────────────────────────────────────────────────